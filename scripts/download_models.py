@@ -1,72 +1,132 @@
+"""
+Download the models and convert them into a versioned local bundle.
+
+The bundle holds safetensors weights, the ViT processor config and a
+checksum manifest (see ``src/models/bundle.py``). Point the app at it with
+``APP_MODEL_BUNDLE_DIR`` and it loads the models without network access.
+
+Usage:
+    python scripts/download_models.py --bundle /app/models/bundle --version 2024.06.1
+"""
+
+import argparse
 import logging
 import os
+import shutil
 import sys
+import time
 from pathlib import Path
 
+import torch
+from safetensors.torch import save_model
 from torchvision.models.detection import fasterrcnn_resnet50_fpn_v2
 from transformers import ViTFeatureExtractor, ViTModel
+from transformers import __version__ as transformers_version
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.models.bundle import (  # noqa: E402
+    DETECTOR_WEIGHTS,
+    PROCESSOR_DIR,
+    VIT_DIR,
+    load_manifest,
+    write_manifest,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+VIT_MODEL = "google/vit-base-patch16-224"
+DETECTOR_MODEL = "fasterrcnn_resnet50_fpn_v2"
+
+
+def download_models(cache_dir: str):
+    """Download the pretrained models into the local caches."""
+    cache_path = Path(cache_dir)
+    cache_path.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Downloading models to {cache_dir}")
 
-def download_models():
-    """Download and cache all necessary model files."""
     try:
-        # Set cache directory
-        cache_dir = os.getenv("TRANSFORMERS_CACHE", "/app/models")
-        cache_path = Path(cache_dir)
-        cache_path.mkdir(parents=True, exist_ok=True)
-
-        logger.info(f"Downloading models to {cache_dir}")
-
-        # Download ViT model and feature extractor
-        try:
-            logger.info("Downloading ViT model...")
-            ViTModel.from_pretrained(
-                "google/vit-base-patch16-224",
-                cache_dir=cache_dir,
-                local_files_only=False,
-                force_download=True,
-            )
-            logger.info("ViT model downloaded successfully")
-
-            logger.info("Downloading ViT feature extractor...")
-            ViTFeatureExtractor.from_pretrained(
-                "google/vit-base-patch16-224",
-                cache_dir=cache_dir,
-                local_files_only=False,
-                force_download=True,
-            )
-            logger.info("ViT feature extractor downloaded successfully")
-        except Exception as e:
-            logger.error(f"Error downloading ViT models: {str(e)}")
-            raise
-
-        # Download Faster R-CNN model
-        try:
-            logger.info("Downloading Faster R-CNN model...")
-            fasterrcnn_resnet50_fpn_v2(pretrained=True)
-            logger.info("Faster R-CNN model downloaded successfully")
-        except Exception as e:
-            logger.error(f"Error downloading Faster R-CNN model: {str(e)}")
-            raise
-
-        # Verify models were downloaded
-        model_files = list(cache_path.glob("**/*"))
-        if not model_files:
-            raise RuntimeError("No model files were downloaded")
-        
-        logger.info(f"Found {len(model_files)} model files")
-        for file in model_files:
-            logger.info(f"Model file: {file}")
-
-        logger.info("All models downloaded successfully")
+        logger.info("Downloading ViT model...")
+        vit = ViTModel.from_pretrained(VIT_MODEL, cache_dir=cache_dir)
+        logger.info("Downloading ViT feature extractor...")
+        processor = ViTFeatureExtractor.from_pretrained(VIT_MODEL, cache_dir=cache_dir)
+    except Exception as e:
+        logger.error(f"Error downloading ViT models: {str(e)}")
+        raise
+
+    try:
+        logger.info("Downloading Faster R-CNN model...")
+        detector = fasterrcnn_resnet50_fpn_v2(pretrained=True)
+    except Exception as e:
+        logger.error(f"Error downloading Faster R-CNN model: {str(e)}")
+        raise
 
+    return detector, vit, processor
+
+
+def build_bundle(bundle_dir: str, version: str, cache_dir: str) -> None:
+    """Write a complete bundle to ``bundle_dir``, replacing any previous one."""
+    detector, vit, processor = download_models(cache_dir)
+
+    # Build next to the target and swap it in, so a crash never leaves a
+    # half-written bundle where the app would look for one
+    staging = f"{bundle_dir.rstrip('/')}.partial"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    logger.info("Converting Faster R-CNN weights to safetensors...")
+    save_model(detector, os.path.join(staging, DETECTOR_WEIGHTS))
+    logger.info("Converting ViT weights to safetensors...")
+    vit.save_pretrained(os.path.join(staging, VIT_DIR), safe_serialization=True)
+    processor.save_pretrained(os.path.join(staging, PROCESSOR_DIR))
+
+    manifest = write_manifest(
+        staging,
+        version,
+        metadata={
+            "detector": DETECTOR_MODEL,
+            "vit": VIT_MODEL,
+            "torch": torch.__version__,
+            "transformers": transformers_version,
+        },
+    )
+    load_manifest(staging, verify_checksums=True)
+
+    shutil.rmtree(bundle_dir, ignore_errors=True)
+    os.replace(staging, bundle_dir)
+    size = sum(entry["size"] for entry in manifest["files"].values())
+    logger.info(
+        f"Model bundle {version} written to {bundle_dir} "
+        f"({len(manifest['files'])} files, {size / 1e6:.0f} MB)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--bundle",
+        default=os.getenv("APP_MODEL_BUNDLE_DIR", "/app/models/bundle"),
+        help="directory to write the bundle to",
+    )
+    parser.add_argument(
+        "--version",
+        default=time.strftime("%Y%m%d%H%M%S"),
+        help="bundle version recorded in the manifest (default: build time)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=os.getenv("TRANSFORMERS_CACHE", "/app/models"),
+        help="download cache for the source checkpoints",
+    )
+    args = parser.parse_args()
+
+    try:
+        build_bundle(args.bundle, args.version, args.cache_dir)
     except Exception as e:
-        logger.error(f"Error downloading models: {str(e)}")
+        logger.error(f"Error building model bundle: {str(e)}")
         sys.exit(1)
 
 
 if __name__ == "__main__":
-    download_models()
+    main()
@@ -1,19 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 
-from src.api.schemas import Token, UserCreate, UserLogin, UserResponse
-from src.database.repository import FirebaseRepository
+from src.api.schemas import RefreshRequest, Token, UserCreate, UserLogin, UserResponse
+from src.database.factory import get_repository
 from src.services.auth_service import AuthService
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 # Initialize services
-repository = FirebaseRepository()
+repository = get_repository()
 auth_service = AuthService(repository)
 
 
-@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED
+)
 async def register(user_data: UserCreate):
     """Register a new user."""
     try:
@@ -42,10 +44,27 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     access_token = auth_service.create_access_token(
         data={"sub": user.email, "role": user.role}
     )
+    refresh_token = await auth_service.create_refresh_token(user)
     return {
         "access_token": access_token,
         "token_type": "bearer",
-        "expires_in": 1800  # 30 minutes in seconds
+        "expires_in": 1800,  # 30 minutes in seconds
+        "refresh_token": refresh_token,
+    }
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(request: RefreshRequest):
+    """Exchange a refresh token for a new access token and refresh token."""
+    user, refresh_token = await auth_service.rotate_refresh_token(request.refresh_token)
+    access_token = auth_service.create_access_token(
+        data={"sub": user.email, "role": user.role}
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": 1800,  # 30 minutes in seconds
+        "refresh_token": refresh_token,
     }
 
 
@@ -62,7 +81,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        user = await auth_service.get_user_by_email(email)
+        # Cached with the token, so polling /me does not hit the database
+        user = await auth_service.get_token_user(token)
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -77,4 +97,4 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error retrieving user information",
-        ) 
\ No newline at end of file
+        )
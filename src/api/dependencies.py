@@ -1,19 +1,37 @@
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+import math
+from typing import Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 
 from src.api.schemas import TokenData
-from src.database.repository import FirebaseRepository
+from src.database.factory import get_repository
+from src.services.api_keys import ApiKeyService
 from src.services.auth_service import AuthService
+from src.services.rate_limiter import create_rate_limiter
+from src.services.scheduler import Principal, current_principal
 
 # Initialize services
-repository = FirebaseRepository()
-auth_service = AuthService(repository)
+repository = get_repository()
+api_key_service = ApiKeyService(repository)
+auth_service = AuthService(repository, api_keys=api_key_service)
+rate_limiter = create_rate_limiter()
+
+# Either credential may be sent, so neither scheme rejects a request alone
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
+api_key_scheme = APIKeyHeader(name="X-API-Key", auto_error=False)
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
-    """Get current user from token."""
+async def get_current_user(
+    token: Optional[str] = Depends(oauth2_scheme),
+    api_key: Optional[str] = Depends(api_key_scheme),
+) -> TokenData:
+    """Get current user from an API key or a bearer token."""
+    if api_key:
+        return await get_api_key_user(api_key)
     try:
+        if token is None:
+            raise ValueError("Missing bearer token")
         payload = auth_service.verify_token(token)
         email = payload.get("sub")
         role = payload.get("role")
@@ -23,6 +41,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
                 detail="Could not validate credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        # Charge this request's model calls to the user for fair scheduling
+        current_principal.set(Principal(email, role or "user"))
         return TokenData(email=email, role=role)
     except Exception as e:
         raise HTTPException(
@@ -31,17 +51,78 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-async def get_current_active_user(current_user: TokenData = Depends(get_current_user)) -> TokenData:
+
+async def get_api_key_user(api_key: str) -> TokenData:
+    """Authenticate a service client by API key, without bcrypt or user lookups."""
+    record = await api_key_service.authenticate(api_key)
+    if record is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key",
+        )
+    current_principal.set(Principal(record.email, record.role))
+    return TokenData(email=record.email, role=record.role)
+
+
+async def get_current_active_user(
+    current_user: TokenData = Depends(get_current_user),
+) -> TokenData:
     """Get current active user."""
     if not current_user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive user")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive user"
+        )
     return current_user
 
-async def require_admin(current_user: TokenData = Depends(get_current_user)) -> TokenData:
+
+async def require_admin(
+    current_user: TokenData = Depends(get_current_user),
+) -> TokenData:
     """Require admin role."""
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="The user doesn't have enough privileges"
+            detail="The user doesn't have enough privileges",
         )
-    return current_user 
\ No newline at end of file
+    return current_user
+
+
+def get_client_ip(request: Request) -> str:
+    """Client address used as the rate-limit key."""
+    return request.client.host if request.client else "unknown"
+
+
+async def rate_limit_bucket(request: Request) -> Tuple[str, Optional[int]]:
+    """Rate-limit key and per-minute limit for a request.
+
+    Valid API keys are limited per key, with the key's own limit when it
+    has one. Everyone else is limited per client IP.
+    """
+    api_key = request.headers.get("X-API-Key")
+    if api_key:
+        record = await api_key_service.authenticate(api_key)
+        if record is not None:
+            return f"key:{record.id}", record.requests_per_minute
+    return get_client_ip(request), None
+
+
+async def check_rate_limit(
+    client_key: str, cost: int = 1, requests_per_minute: Optional[int] = None
+) -> None:
+    """Charge ``cost`` requests to the client's rate limit or raise 429."""
+    result = await rate_limiter.hit(
+        client_key, cost=cost, requests_per_minute=requests_per_minute
+    )
+    if not result.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests. Please try again later.",
+            headers={"Retry-After": str(max(1, math.ceil(result.retry_after)))},
+        )
+
+
+async def rate_limit(request: Request) -> str:
+    """Charge one request to the client's rate limit and return the client IP."""
+    bucket, requests_per_minute = await rate_limit_bucket(request)
+    await check_rate_limit(bucket, requests_per_minute=requests_per_minute)
+    return get_client_ip(request)
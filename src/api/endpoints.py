@@ -1,25 +1,50 @@
+import asyncio
+import json
 import logging
+import math
 import time
-from datetime import datetime
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 
-from src.api.dependencies import get_current_active_user, require_admin
+from src.api.dependencies import (
+    api_key_service,
+    auth_service,
+    check_rate_limit,
+    get_client_ip,
+    get_current_active_user,
+    rate_limit,
+    rate_limit_bucket,
+    require_admin,
+)
 from src.api.schemas import (
+    ApiKeyCreate,
+    ApiKeyIssued,
+    ApiKeyResponse,
+    BatchSearchResponse,
     DetectionResult,
     ErrorResponse,
     HealthResponse,
+    JobStatusResponse,
     SearchResponse,
     TokenData,
 )
-from src.database.repository import FirebaseRepository
-from src.models.fashion_detector import FashionDetector
+from src.database.factory import get_repository
 from src.models.similarity_search import SimilaritySearch
+from src.services.admission import AdmissionController, AdmissionRejected
+from src.services.health import HealthMonitor
 from src.services.image_processor import ImageProcessor
+from src.services.inference_client import create_detector
+from src.services.job_queue import JOB_FAILED, InferenceJobQueue, QueueFullError
+from src.services.response_cache import ResponseCache, etag_matches
+from src.services.scheduler import FairScheduler
+from src.services.search_writer import SearchResultWriter
 from src.utils.config import settings
-from src.utils.firebase_config import get_database, get_storage
+from src.utils.metrics import CONTENT_TYPE, REGISTRY
 
 # Configure logging
 logging.basicConfig(level=settings.LOG_LEVEL)
@@ -27,73 +52,161 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Initialize components
-detector = FashionDetector()
-repository = FirebaseRepository()
+# Initialize components. A local detector loads torch and its models on
+# first use; a remote one forwards model calls to inference workers
+detector = create_detector()
+repository = get_repository()
 similarity_search = SimilaritySearch(repository)
-image_processor = ImageProcessor(detector, similarity_search, repository)
+search_writer = SearchResultWriter(repository)
+inference_executor = ThreadPoolExecutor(
+    max_workers=settings.INFERENCE_WORKERS, thread_name_prefix="inference"
+)
+inference_scheduler = FairScheduler(inference_executor)
+image_processor = ImageProcessor(
+    detector,
+    similarity_search,
+    repository,
+    result_writer=search_writer,
+    executor=inference_executor,
+    scheduler=inference_scheduler,
+)
+job_queue = InferenceJobQueue(image_processor)
+admission = AdmissionController()
+search_cache = ResponseCache()
+
+
+async def start_components() -> None:
+    """Load the models and start background workers before serving traffic."""
+    # Model loading (or reaching the workers) blocks, so keep it off the loop
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(inference_executor, detector.load)
+    await similarity_search.start()
+    await search_writer.start()
+    await job_queue.start()
+    await health_monitor.start()
+
+
+async def stop_components() -> None:
+    # Finish queued jobs and flush pending search results before exiting
+    await health_monitor.stop()
+    await job_queue.stop()
+    await search_writer.stop()
+    await similarity_search.stop()
+
+
+async def _check_model() -> Dict[str, Any]:
+    # The probe runs a forward pass, so keep it off the event loop
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(inference_executor, detector.check_status)
+
+
+REGISTRY.gauge(
+    "job_queue_depth",
+    "Async identify jobs waiting for a worker.",
+    function=lambda: job_queue.depth,
+)
+REGISTRY.gauge(
+    "search_writer_pending",
+    "Search results buffered for persistence.",
+    function=lambda: search_writer.pending_count,
+)
+
+REGISTRY.gauge(
+    "admission_in_flight",
+    "Inference requests holding an admission slot.",
+    function=lambda: admission.in_flight,
+)
+REGISTRY.gauge(
+    "admission_queued",
+    "Inference requests waiting for an admission slot.",
+    function=lambda: admission.queued,
+)
+
+health_monitor = HealthMonitor(
+    {
+        "firebase": repository.check_connection,
+        "model": _check_model,
+        "storage": repository.check_storage,
+    }
+)
+
+
+async def _read_image(file: UploadFile) -> bytes:
+    """Validate an uploaded image and return its content."""
+    # Validate file type
+    if not (file.content_type or "").startswith("image/"):
+        raise HTTPException(status_code=400, detail="File must be an image")
 
-# Rate limiting dictionary
-request_counts: Dict[str, Dict[str, Any]] = {}
+    # Read file content
+    content = await file.read()
+
+    # Validate file size
+    if len(content) > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File size exceeds maximum limit of {settings.MAX_UPLOAD_SIZE} bytes",
+        )
+    return content
+
+
+def _busy(e: AdmissionRejected) -> HTTPException:
+    """503 for a request shed by admission control."""
+    logger.warning(f"Shedding request: {str(e)}")
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy. Please try again later.",
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+    )
 
 
 @router.post(
     "/identify",
     response_model=SearchResponse,
     responses={
+        202: {"model": JobStatusResponse},
         400: {"model": ErrorResponse},
         429: {"model": ErrorResponse},
         500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
     },
     summary="Identify fashion items in an image",
-    description="Upload an image containing fashion items to identify and find similar products.",
+    description=(
+        "Upload an image containing fashion items to identify and find similar products. "
+        "With `async=true` the image is queued and a query ID is returned immediately; "
+        "poll `/search/{query_id}` or `/jobs/{query_id}` for the result."
+    ),
 )
 async def identify_fashion(
-    request: Request,
     file: UploadFile = File(..., description="Image file to process"),
-    current_user: TokenData = Depends(get_current_active_user)
+    async_mode: bool = Query(
+        False, alias="async", description="Queue the image and return immediately"
+    ),
+    current_user: TokenData = Depends(get_current_active_user),
+    client_ip: str = Depends(rate_limit),
 ):
     try:
-        # Rate limiting
-        client_ip = request.client.host
-        current_time = time.time()
-
-        # Clean up old entries (older than 1 minute)
-        global request_counts
-        request_counts = {
-            ip: data
-            for ip, data in request_counts.items()
-            if current_time - data["timestamp"] < 60
-        }
+        content = await _read_image(file)
 
-        # Check rate limit
-        if client_ip in request_counts:
-            if request_counts[client_ip]["count"] >= settings.MAX_REQUESTS_PER_MINUTE:
+        if async_mode:
+            try:
+                job = job_queue.submit(content)
+            except QueueFullError:
                 raise HTTPException(
-                    status_code=429, detail="Too many requests. Please try again later."
+                    status_code=503,
+                    detail="Processing queue is full. Please try again later.",
+                    headers={"Retry-After": "1"},
                 )
-            request_counts[client_ip]["count"] += 1
-        else:
-            request_counts[client_ip] = {"count": 1, "timestamp": current_time}
-
-        # Validate file type
-        if not file.content_type.startswith("image/"):
-            raise HTTPException(status_code=400, detail="File must be an image")
-
-        # Read file content
-        content = await file.read()
-
-        # Validate file size
-        if len(content) > settings.MAX_UPLOAD_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File size exceeds maximum limit of {settings.MAX_UPLOAD_SIZE} bytes",
-            )
+            logger.info(f"Queued image {file.filename} as job {job.query_id}")
+            return JSONResponse(status_code=202, content=job.model_dump(mode="json"))
 
         # Process image
         logger.info(f"Processing image: {file.filename}")
         start_time = time.time()
-        result = await image_processor.process_image(content)
+        try:
+            async with admission.admit():
+                result = await image_processor.process_image(content)
+        except AdmissionRejected as e:
+            raise _busy(e)
         processing_time = time.time() - start_time
 
         # Log request details
@@ -112,27 +225,197 @@ async def identify_fashion(
         )
 
 
+@router.post(
+    "/identify/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"application/x-ndjson": {}}},
+        400: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+    },
+    summary="Identify fashion items with streamed partial results",
+    description=(
+        "Streams newline-delimited JSON events: `detections` with the bounding boxes "
+        "as soon as detection finishes, one `match` per detection once the similarity "
+        "search completes, and a final `summary` with the query ID. Failures after "
+        "the stream has started are reported as an `error` event."
+    ),
+)
+async def identify_fashion_stream(
+    file: UploadFile = File(..., description="Image file to process"),
+    current_user: TokenData = Depends(get_current_active_user),
+    client_ip: str = Depends(rate_limit),
+):
+    content = await _read_image(file)
+    try:
+        admitted_at = await admission.acquire()
+    except AdmissionRejected as e:
+        raise _busy(e)
+    logger.info(f"Streaming results for image: {file.filename}")
+
+    released = False
+
+    def release() -> None:
+        # Called from the stream and as a background task, since a client
+        # that disconnects early may never start the stream
+        nonlocal released
+        if not released:
+            released = True
+            admission.release(admitted_at)
+
+    async def events():
+        try:
+            async for event in image_processor.process_image_stream(content):
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            logger.error(f"Error processing image: {str(e)}", exc_info=True)
+            error = {
+                "event": "error",
+                "detail": "An error occurred while processing the image",
+            }
+            yield json.dumps(error) + "\n"
+        finally:
+            release()
+
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(release),
+    )
+
+
+@router.post(
+    "/identify/batch",
+    response_model=BatchSearchResponse,
+    responses={
+        400: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+    },
+    summary="Identify fashion items in several images",
+    description=(
+        f"Upload up to {settings.MAX_BATCH_IMAGES} images in one request. All images "
+        "go through a single batched model pass; results are returned per image, "
+        "in upload order. Each image counts against the rate limit."
+    ),
+)
+async def identify_fashion_batch(
+    files: List[UploadFile] = File(..., description="Image files to process"),
+    current_user: TokenData = Depends(get_current_active_user),
+    client_ip: str = Depends(get_client_ip),
+    bucket: Tuple[str, Optional[int]] = Depends(rate_limit_bucket),
+):
+    try:
+        # Batch limits
+        if len(files) > settings.MAX_BATCH_IMAGES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"A batch may contain at most {settings.MAX_BATCH_IMAGES} images",
+            )
+        client_key, requests_per_minute = bucket
+        await check_rate_limit(
+            client_key, cost=len(files), requests_per_minute=requests_per_minute
+        )
+
+        # Per-image limits
+        images = []
+        for file in files:
+            if not (file.content_type or "").startswith("image/"):
+                raise HTTPException(
+                    status_code=400, detail=f"File {file.filename} must be an image"
+                )
+            content = await file.read()
+            if len(content) > settings.MAX_UPLOAD_SIZE:
+                raise HTTPException(
+                    status_code=400,
+                    detail=(
+                        f"File {file.filename} exceeds maximum limit of "
+                        f"{settings.MAX_UPLOAD_SIZE} bytes"
+                    ),
+                )
+            images.append(content)
+
+        logger.info(f"Processing batch of {len(images)} images")
+        start_time = time.time()
+        try:
+            async with admission.admit():
+                results = await image_processor.process_images(images)
+        except AdmissionRejected as e:
+            raise _busy(e)
+        processing_time = time.time() - start_time
+
+        logger.info(
+            f"Batch completed - IP: {client_ip}, Images: {len(images)}, "
+            f"Time: {processing_time:.2f}s"
+        )
+
+        return BatchSearchResponse(results=results, processing_time=processing_time)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing image batch: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500, detail="An error occurred while processing the images"
+        )
+
+
 @router.get(
     "/search/{query_id}",
     response_model=SearchResponse,
-    responses={404: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
+    responses={
+        202: {"model": JobStatusResponse},
+        304: {"description": "Not modified"},
+        404: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
     summary="Get search results by query ID",
-    description="Retrieve the results of a previous image search by its query ID.",
+    description=(
+        "Retrieve the results of a previous image search by its query ID. "
+        "Returns 202 with the job status while an async job is still pending. "
+        "Stored results never change, so they carry a strong `ETag` and "
+        "`If-None-Match` requests get 304."
+    ),
 )
 async def get_search_results(
     query_id: str,
-    current_user: TokenData = Depends(get_current_active_user)
+    request: Request,
+    current_user: TokenData = Depends(get_current_active_user),
 ):
     try:
-        # Get search results from repository
-        result = await repository.get_search_result(query_id)
-        if not result:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Search results not found for query ID: {query_id}",
-            )
+        cached = search_cache.get(query_id)
+        if cached is None:
+            # Read through the write-behind buffer before hitting the repository
+            result = search_writer.get(query_id)
+            if result is None:
+                result = await repository.get_search_result(query_id)
+            if not result:
+                job = job_queue.get(query_id)
+                if job is not None and job.status == JOB_FAILED:
+                    raise HTTPException(status_code=500, detail=job.error)
+                if job is not None:
+                    return JSONResponse(
+                        status_code=202, content=job.model_dump(mode="json")
+                    )
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Search results not found for query ID: {query_id}",
+                )
+            cached = search_cache.put(query_id, result.model_dump_json().encode())
 
-        return result
+        headers = {
+            "ETag": cached.etag,
+            "Cache-Control": f"private, max-age={settings.SEARCH_CACHE_MAX_AGE}, immutable",
+        }
+        if etag_matches(request.headers.get("if-none-match"), cached.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(
+            content=cached.body, media_type="application/json", headers=headers
+        )
 
     except HTTPException:
         raise
@@ -143,35 +426,83 @@ async def get_search_results(
         )
 
 
+@router.get(
+    "/jobs/{query_id}",
+    response_model=JobStatusResponse,
+    responses={404: {"model": ErrorResponse}},
+    summary="Get async job status",
+    description=(
+        "Return the status of an async identify job. "
+        "Pass `wait` to long-poll until the job finishes."
+    ),
+)
+async def get_job_status(
+    query_id: str,
+    wait: float = Query(0.0, ge=0.0, description="Seconds to wait for completion"),
+    current_user: TokenData = Depends(get_current_active_user),
+):
+    job = await job_queue.wait(query_id, timeout=min(wait, settings.JOB_MAX_WAIT))
+    if job is None:
+        raise HTTPException(
+            status_code=404, detail=f"Job not found for query ID: {query_id}"
+        )
+    return job
+
+
 @router.get(
     "/health",
     response_model=HealthResponse,
     summary="Check system health",
-    description="Returns the current health status of the system and its components.",
+    description=(
+        "Returns the health status of the system and its components as of the "
+        "last background probe."
+    ),
 )
 async def health_check() -> Dict[str, Any]:
-    try:
-        # Check Firebase connection
-        firebase_status = await repository.check_connection()
+    return health_monitor.snapshot()
 
-        # Check model status
-        model_status = detector.check_status()
 
-        # Check storage status
-        storage_status = await repository.check_storage()
+@router.get(
+    "/livez",
+    summary="Liveness probe",
+    description="Returns 200 while the process is serving requests.",
+)
+async def liveness() -> Dict[str, Any]:
+    return {"status": "alive", "timestamp": time.time()}
+
+
+@router.get(
+    "/readyz",
+    response_model=HealthResponse,
+    responses={503: {"model": HealthResponse}},
+    summary="Readiness probe",
+    description=(
+        "Returns 200 when the database, storage and models passed their last "
+        "background check, 503 otherwise."
+    ),
+)
+async def readiness():
+    snapshot = health_monitor.snapshot()
+    if not health_monitor.ready:
+        return JSONResponse(
+            status_code=503, content=HealthResponse(**snapshot).model_dump(mode="json")
+        )
+    return snapshot
+
+
+@router.get(
+    "/metrics",
+    response_class=Response,
+    responses={200: {"content": {CONTENT_TYPE: {}}}},
+    summary="Prometheus metrics",
+    description=(
+        "Per-stage pipeline latency histograms, repository latency, cache hit "
+        "ratios and queue gauges in the Prometheus text format."
+    ),
+)
+async def metrics() -> Response:
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
 
-        return {
-            "status": "healthy",
-            "components": {
-                "firebase": firebase_status,
-                "model": model_status,
-                "storage": storage_status,
-            },
-            "timestamp": time.time(),
-        }
-    except Exception as e:
-        logger.error(f"Health check failed: {str(e)}", exc_info=True)
-        return {"status": "unhealthy", "error": str(e), "timestamp": time.time()}
 
 # Add admin-only endpoints
 @router.get(
@@ -180,7 +511,7 @@ async def health_check() -> Dict[str, Any]:
     description="Get detailed system statistics (admin only).",
 )
 async def get_system_stats(
-    current_user: TokenData = Depends(require_admin)
+    current_user: TokenData = Depends(require_admin),
 ) -> Dict[str, Any]:
     """Get system statistics (admin only)."""
     try:
@@ -191,6 +522,16 @@ async def get_system_stats(
         return {
             "database": db_stats,
             "storage": storage_stats,
+            "job_queue": {
+                "depth": job_queue.depth,
+                "max_size": job_queue.max_size,
+                "workers": job_queue.workers,
+            },
+            "search_cache": search_cache.stats(),
+            "admission": admission.stats(),
+            "scheduler": inference_scheduler.stats(),
+            "token_cache": auth_service.token_cache.stats(),
+            "api_keys": api_key_service.stats(),
             "timestamp": datetime.utcnow().isoformat(),
         }
     except Exception as e:
@@ -199,3 +540,86 @@ async def get_system_stats(
             status_code=500,
             detail="Error getting system statistics",
         )
+
+
+@router.post(
+    "/admin/users/{email}/deactivate",
+    summary="Deactivate a user",
+    description="Deactivate a user and revoke their tokens and API keys (admin only).",
+)
+async def deactivate_user(
+    email: str, current_user: TokenData = Depends(require_admin)
+) -> Dict[str, Any]:
+    """Deactivate a user (admin only)."""
+    if not await auth_service.deactivate_user(email):
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"email": email, "is_active": False}
+
+
+@router.post(
+    "/admin/api-keys",
+    response_model=ApiKeyIssued,
+    status_code=201,
+    summary="Issue an API key",
+    description=(
+        "Issue an API key for a service client (admin only). The key is only "
+        "returned in this response; send it in the X-API-Key header."
+    ),
+)
+async def create_api_key(
+    key_data: ApiKeyCreate, current_user: TokenData = Depends(require_admin)
+) -> ApiKeyIssued:
+    """Issue an API key (admin only)."""
+    user = await auth_service.get_user_by_email(key_data.email)
+    if user is None or not user.is_active:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    expires_at = None
+    if key_data.expires_in_days:
+        expires_at = datetime.utcnow() + timedelta(days=key_data.expires_in_days)
+    api_key, record = await api_key_service.issue(
+        user,
+        name=key_data.name,
+        role=key_data.role,
+        requests_per_minute=key_data.requests_per_minute,
+        expires_at=expires_at,
+    )
+    return ApiKeyIssued(api_key=api_key, **record.model_dump())
+
+
+@router.post(
+    "/admin/api-keys/{key_id}/rotate",
+    response_model=ApiKeyIssued,
+    summary="Rotate an API key",
+    description=(
+        "Issue a replacement key with the same settings (admin only). The old "
+        "key keeps working for the rotation grace period."
+    ),
+)
+async def rotate_api_key(
+    key_id: str, current_user: TokenData = Depends(require_admin)
+) -> ApiKeyIssued:
+    """Rotate an API key (admin only)."""
+    rotated = await api_key_service.rotate(key_id)
+    if rotated is None:
+        raise HTTPException(status_code=404, detail="API key not found")
+    api_key, record = rotated
+    return ApiKeyIssued(api_key=api_key, **record.model_dump())
+
+
+@router.delete(
+    "/admin/api-keys/{key_id}",
+    response_model=ApiKeyResponse,
+    summary="Revoke an API key",
+    description="Revoke an API key immediately (admin only).",
+)
+async def revoke_api_key(
+    key_id: str, current_user: TokenData = Depends(require_admin)
+) -> ApiKeyResponse:
+    """Revoke an API key (admin only)."""
+    if not await api_key_service.revoke(key_id):
+        raise HTTPException(status_code=404, detail="API key not found")
+    record = await api_key_service.get(key_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="API key not found")
+    return ApiKeyResponse(**record.model_dump())
@@ -1,13 +1,26 @@
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, EmailStr, Field
 
+# Search results are persisted as is, so their models live with the database's
+from src.database.models import (  # noqa: F401
+    BoundingBox,
+    DetectionResponse,
+    ProductResponse,
+    SearchResponse,
+)
+
 
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
     expires_in: int
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class TokenData(BaseModel):
@@ -38,6 +51,33 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+class ApiKeyCreate(BaseModel):
+    email: EmailStr  # owner of the key
+    name: str = ""
+    role: Literal["user", "service", "admin"] = "service"
+    requests_per_minute: Optional[int] = Field(default=None, gt=0)
+    expires_in_days: Optional[int] = Field(default=None, gt=0)
+
+
+class ApiKeyResponse(BaseModel):
+    id: str  # SHA-256 digest of the key
+    prefix: str
+    email: EmailStr
+    role: str
+    name: str
+    requests_per_minute: Optional[int] = None
+    expires_at: Optional[datetime] = None
+    revoked: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ApiKeyIssued(ApiKeyResponse):
+    api_key: str  # plaintext key, only returned when issued
+
+
 class FashionItem(BaseModel):
     category: str
     brand: str
@@ -62,35 +102,18 @@ class ErrorResponse(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
-class BoundingBox(BaseModel):
-    x1: float
-    y1: float
-    x2: float
-    y2: float
-
-
-class ProductResponse(BaseModel):
-    id: str
-    brand: str
-    name: str
-    price: float
-    currency: str
-    source_url: str
-    image_url: str
-
-
-class DetectionResponse(BaseModel):
-    product: Optional[ProductResponse] = None
-    similarity_score: float = Field(ge=0.0, le=1.0)
-    bounding_box: BoundingBox
-    confidence: float = Field(ge=0.0, le=1.0)
+class BatchSearchResponse(BaseModel):
+    results: List[SearchResponse]
+    processing_time: float
 
 
-class SearchResponse(BaseModel):
+class JobStatusResponse(BaseModel):
     query_id: str
-    results: List[DetectionResponse]
-    processing_time: float
-    created_at: datetime
+    status: str  # queued, running, completed, failed
+    queue_depth: int
+    submitted_at: datetime
+    completed_at: Optional[datetime] = None
+    error: Optional[str] = None
 
 
 class ComponentStatus(BaseModel):
@@ -0,0 +1,182 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.database.models import (
+    ApiKey,
+    Category,
+    Product,
+    RefreshToken,
+    SearchResponse,
+    Upload,
+    User,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def stack_embeddings(product_ids: List[str], vectors: List[np.ndarray]) -> np.ndarray:
+    """Stack vectors into a float32 matrix, dropping ids whose dimension differs."""
+    if not vectors:
+        return np.empty((0, 0), dtype=np.float32)
+    dim = vectors[0].shape[0]
+    keep = [i for i, vector in enumerate(vectors) if vector.shape[0] == dim]
+    if len(keep) != len(vectors):
+        logger.warning(
+            f"Skipping {len(vectors) - len(keep)} embeddings with unexpected dimension"
+        )
+        product_ids[:] = [product_ids[i] for i in keep]
+    return np.stack([vectors[i] for i in keep]).astype(np.float32, copy=False)
+
+
+class BaseRepository(ABC):
+    """Storage interface shared by the Firebase and local backends."""
+
+    # User operations
+    @abstractmethod
+    async def create_user(self, user: User) -> str:
+        """Create a new user in the database."""
+
+    @abstractmethod
+    async def get_user(self, user_id: str) -> Optional[User]:
+        """Get user by ID from database."""
+
+    @abstractmethod
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        """Get user by email from database."""
+
+    @abstractmethod
+    async def update_user(self, user_id: str, user: User) -> bool:
+        """Update user in database."""
+
+    # API key operations
+    @abstractmethod
+    async def create_api_key(self, api_key: ApiKey) -> str:
+        """Store an API key record under its digest."""
+
+    @abstractmethod
+    async def get_api_key(self, digest: str) -> Optional[ApiKey]:
+        """Get an API key record by the digest of the key."""
+
+    @abstractmethod
+    async def update_api_key(self, digest: str, api_key: ApiKey) -> bool:
+        """Update an API key record."""
+
+    @abstractmethod
+    async def list_user_api_keys(self, user_id: str) -> List[ApiKey]:
+        """Get every API key record issued to a user, revoked ones included."""
+
+    # Refresh token operations
+    @abstractmethod
+    async def create_refresh_token(self, refresh_token: RefreshToken) -> str:
+        """Store a refresh token family."""
+
+    @abstractmethod
+    async def get_refresh_token(self, family_id: str) -> Optional[RefreshToken]:
+        """Get a refresh token family by ID."""
+
+    @abstractmethod
+    async def update_refresh_token(
+        self, family_id: str, refresh_token: RefreshToken
+    ) -> bool:
+        """Update a refresh token family."""
+
+    @abstractmethod
+    async def transact_refresh_token(
+        self,
+        family_id: str,
+        update: Callable[[Optional[RefreshToken]], Optional[RefreshToken]],
+    ) -> Optional[RefreshToken]:
+        """Read-modify-write a refresh token family atomically.
+
+        ``update`` gets the current family (None if missing) and returns the
+        family to store, or None to leave it unchanged. It may be called more
+        than once if the write conflicts, so it must not have side effects
+        beyond recording its outcome. Returns the stored family, or None if
+        nothing was written.
+        """
+
+    # Product operations
+    @abstractmethod
+    async def create_product(self, product: Product) -> str:
+        """Create a new product in the database."""
+
+    @abstractmethod
+    async def get_product(self, product_id: str) -> Optional[Product]:
+        """Get product by ID from database."""
+
+    @abstractmethod
+    async def update_product(self, product_id: str, product: Product) -> bool:
+        """Update product in database."""
+
+    # Category operations
+    @abstractmethod
+    async def create_category(self, category: Category) -> str:
+        """Create a new category in the database."""
+
+    @abstractmethod
+    async def get_category(self, category_id: str) -> Optional[Category]:
+        """Get category by ID from database."""
+
+    # Search operations
+    @abstractmethod
+    async def save_search_result(self, search_result: SearchResponse) -> str:
+        """Save search result to database."""
+
+    @abstractmethod
+    async def save_search_results(
+        self, search_results: List[SearchResponse]
+    ) -> List[str]:
+        """Save a batch of search results."""
+
+    @abstractmethod
+    async def get_search_result(self, query_id: str) -> Optional[SearchResponse]:
+        """Get search result by query ID from database."""
+
+    # Storage operations
+    @abstractmethod
+    async def upload_image(
+        self, file_data: bytes, content_type: Optional[str] = None
+    ) -> Upload:
+        """Store an image keyed by its SHA-256 digest.
+
+        Content that is already stored is not uploaded again; its reference
+        count is incremented instead.
+        """
+
+    @abstractmethod
+    async def get_upload(self, digest: str) -> Optional[Upload]:
+        """Get the manifest entry of a stored upload."""
+
+    @abstractmethod
+    async def release_image(self, digest: str) -> bool:
+        """Drop one reference to an upload, deleting it when none remain."""
+
+    @abstractmethod
+    async def upload_embedding(self, product_id: str, embedding: List[float]) -> str:
+        """Store a product embedding and return its URL."""
+
+    @abstractmethod
+    async def get_embedding(self, product_id: str) -> Optional[List[float]]:
+        """Get a product embedding."""
+
+    @abstractmethod
+    async def get_all_embeddings(self) -> Tuple[List[str], np.ndarray]:
+        """Get every stored embedding as product ids and a float32 matrix."""
+
+    # Query operations
+    @abstractmethod
+    async def search_products(
+        self, query: Dict[str, Any], limit: int = 10
+    ) -> List[Product]:
+        """Search products in database."""
+
+    @abstractmethod
+    async def check_connection(self) -> Dict[str, Any]:
+        """Check database connection."""
+
+    @abstractmethod
+    async def check_storage(self) -> Dict[str, Any]:
+        """Check storage status."""
@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+)
+
+import msgpack  # type: ignore[import-untyped]
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_EPOCH = datetime(1970, 1, 1)
+_MILLISECOND = timedelta(milliseconds=1)
+_object_setattr = object.__setattr__
+
+
+def datetime_to_ms(value: datetime) -> int:
+    """Convert a datetime to epoch milliseconds, treating naive values as UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _MILLISECOND
+
+
+def ms_to_datetime(value: Union[int, float, str, datetime]) -> datetime:
+    """Convert epoch milliseconds (or a legacy ISO string) to a naive UTC datetime."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return _EPOCH + int(value) * _MILLISECOND
+
+
+def _field_kind(annotation: Any) -> Tuple[Optional[str], Optional[Type[BaseModel]]]:
+    """Classify a field annotation as a datetime, nested model or model list."""
+    origin = get_origin(annotation)
+    if origin is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return _field_kind(args[0]) if len(args) == 1 else (None, None)
+    if annotation is datetime:
+        return "datetime", None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return "model", annotation
+    if origin in (list, List):
+        item = get_args(annotation)[0] if get_args(annotation) else None
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            return "model_list", item
+    return None, None
+
+
+class RecordCodec(Generic[ModelT]):
+    """Compact msgpack codec for repository records.
+
+    Timestamps are stored as epoch milliseconds. ``decode`` with
+    ``trusted=True`` builds models with ``model_construct`` and skips
+    validation, which is only safe for records this service wrote itself.
+    """
+
+    def __init__(self, model_cls: Type[ModelT]):
+        self.model_cls = model_cls
+        self._datetime_fields: List[str] = []
+        self._model_fields: List[Tuple[str, "RecordCodec[Any]"]] = []
+        self._model_list_fields: List[Tuple[str, "RecordCodec[Any]"]] = []
+        self._field_names = frozenset(model_cls.model_fields)
+
+        for name, field in model_cls.model_fields.items():
+            kind, nested = _field_kind(field.annotation)
+            if kind == "datetime":
+                self._datetime_fields.append(name)
+            elif kind == "model":
+                self._model_fields.append((name, get_codec(nested)))
+            elif kind == "model_list":
+                self._model_list_fields.append((name, get_codec(nested)))
+
+    # Dict conversion
+    def to_dict(self, model: BaseModel) -> Dict[str, Any]:
+        """Dump a model to plain types with epoch-millisecond timestamps."""
+        return self._encode_dates(model.model_dump())
+
+    def _encode_dates(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        for name in self._datetime_fields:
+            value = data.get(name)
+            if value is not None:
+                data[name] = datetime_to_ms(value)
+        for name, codec in self._model_fields:
+            if data.get(name) is not None:
+                codec._encode_dates(data[name])
+        for name, codec in self._model_list_fields:
+            for item in data.get(name) or ():
+                codec._encode_dates(item)
+        return data
+
+    def from_dict(self, data: Dict[str, Any], trusted: bool = True) -> ModelT:
+        """Build a model from ``to_dict`` output (ISO strings are also accepted)."""
+        if not trusted:
+            return self.model_cls.model_validate(self._decode_dates(dict(data)))
+        return self._construct(data)
+
+    def _decode_dates(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        for name in self._datetime_fields:
+            value = data.get(name)
+            if value.__class__ is int:
+                data[name] = _EPOCH + value * _MILLISECOND
+            elif value is not None:
+                data[name] = ms_to_datetime(value)
+        return data
+
+    def _construct(self, data: Dict[str, Any]) -> ModelT:
+        # The caller's dict (e.g. a Firestore snapshot) is left untouched
+        data = dict(data)
+        if self._datetime_fields:
+            self._decode_dates(data)
+        for name, codec in self._model_fields:
+            if data.get(name) is not None:
+                data[name] = codec._construct(data[name])
+        for name, codec in self._model_list_fields:
+            items = data.get(name)
+            if items:
+                data[name] = [codec._construct(item) for item in items]
+
+        if data.keys() != self._field_names:
+            # Missing fields need defaults filled in
+            return self.model_cls.model_construct(**data)
+
+        # Complete record: set the instance state directly, which is what
+        # model_construct does minus its per-field default handling
+        model = self.model_cls.__new__(self.model_cls)
+        _object_setattr(model, "__dict__", data)
+        _object_setattr(model, "__pydantic_fields_set__", set(self._field_names))
+        _object_setattr(model, "__pydantic_extra__", None)
+        _object_setattr(model, "__pydantic_private__", None)
+        return model
+
+    # Binary encoding
+    def encode(self, model: BaseModel) -> bytes:
+        """Serialize a model to msgpack bytes."""
+        return msgpack.packb(self.to_dict(model), use_bin_type=True)
+
+    def decode(self, data: bytes, trusted: bool = True) -> ModelT:
+        """Deserialize msgpack bytes produced by ``encode``."""
+        return self.from_dict(msgpack.unpackb(data, raw=False), trusted=trusted)
+
+    def encode_many(self, models: Iterable[BaseModel]) -> bytes:
+        """Serialize a stream of models into one msgpack buffer (for exports)."""
+        packer = msgpack.Packer(use_bin_type=True)
+        return b"".join(packer.pack(self.to_dict(model)) for model in models)
+
+    def decode_many(self, data: bytes, trusted: bool = True) -> List[ModelT]:
+        """Deserialize a buffer produced by ``encode_many``."""
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(data)
+        return [self.from_dict(item, trusted=trusted) for item in unpacker]
+
+
+@lru_cache(maxsize=None)
+def get_codec(model_cls: Type[ModelT]) -> RecordCodec[ModelT]:
+    """Return the shared codec for a model class."""
+    return RecordCodec(model_cls)
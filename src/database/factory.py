@@ -0,0 +1,20 @@
+from functools import lru_cache
+
+from src.database.base import BaseRepository
+from src.utils.config import settings
+
+
+@lru_cache(maxsize=None)
+def get_repository() -> BaseRepository:
+    """Return the process-wide repository for the configured storage backend."""
+    # Backends are imported lazily so the local backend never loads firebase_admin
+    if settings.STORAGE_BACKEND == "firebase":
+        from src.database.repository import FirebaseRepository
+
+        return FirebaseRepository()
+    if settings.STORAGE_BACKEND == "local":
+        from src.database.local_repository import LocalRepository
+
+        return LocalRepository(settings.LOCAL_STORAGE_DIR)
+
+    raise ValueError(f"Unknown storage backend: {settings.STORAGE_BACKEND}")
@@ -0,0 +1,548 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar
+
+import numpy as np
+from pydantic import BaseModel
+
+from src.database.base import BaseRepository, stack_embeddings
+from src.database.codec import get_codec
+from src.database.models import (
+    COLLECTIONS,
+    STORAGE_PATHS,
+    ApiKey,
+    Category,
+    Product,
+    RefreshToken,
+    SearchResponse,
+    Upload,
+    User,
+)
+from src.utils.metrics import repository_operation
+from src.utils.mime import detect_content_type
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class LocalRepository(BaseRepository):
+    """Repository backed by SQLite for records and a local directory for blobs.
+
+    Intended for edge deployments and offline benchmarks where a network
+    round trip to Firebase is unwanted.
+    """
+
+    def __init__(self, root_dir: str):
+        self.root = Path(root_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+        for storage_path in STORAGE_PATHS.values():
+            (self.root / storage_path).mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.root / "records.db"), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+    def _create_tables(self) -> None:
+        with self._lock:
+            for collection in COLLECTIONS.values():
+                self._conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {collection} "
+                    "(id TEXT PRIMARY KEY, data BLOB NOT NULL)"
+                )
+            # Users are also looked up by email
+            columns = {
+                row[1]
+                for row in self._conn.execute(
+                    f"PRAGMA table_info({COLLECTIONS['users']})"
+                )
+            }
+            if "email" not in columns:
+                self._conn.execute(
+                    f"ALTER TABLE {COLLECTIONS['users']} ADD COLUMN email TEXT"
+                )
+            self._conn.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email ON {COLLECTIONS['users']} (email)"
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # Record helpers
+    def _put(
+        self, collection: str, record_id: str, model: BaseModel, **columns: Any
+    ) -> None:
+        names = ["id", "data", *columns.keys()]
+        values = [record_id, get_codec(type(model)).encode(model), *columns.values()]
+        placeholders = ", ".join("?" for _ in names)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {collection} ({', '.join(names)}) VALUES ({placeholders})",
+                values,
+            )
+
+    def _get(
+        self, collection: str, record_id: str, model_cls: Type[ModelT]
+    ) -> Optional[ModelT]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT data FROM {collection} WHERE id = ?", (record_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return get_codec(model_cls).decode(row[0])
+
+    # User operations
+    @repository_operation
+    async def create_user(self, user: User) -> str:
+        """Create a new user in the database."""
+        try:
+            self._put(COLLECTIONS["users"], user.id, user, email=user.email)
+            return user.id
+        except Exception as e:
+            logger.error(f"Error creating user: {str(e)}")
+            raise
+
+    @repository_operation
+    async def get_user(self, user_id: str) -> Optional[User]:
+        """Get user by ID from database."""
+        try:
+            return self._get(COLLECTIONS["users"], user_id, User)
+        except Exception as e:
+            logger.error(f"Error getting user: {str(e)}")
+            return None
+
+    @repository_operation
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        """Get user by email from database."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    f"SELECT data FROM {COLLECTIONS['users']} WHERE email = ?", (email,)
+                ).fetchone()
+            if row is None:
+                return None
+            return get_codec(User).decode(row[0])
+        except Exception as e:
+            logger.error(f"Error getting user by email: {str(e)}")
+            return None
+
+    @repository_operation
+    async def update_user(self, user_id: str, user: User) -> bool:
+        """Update user in database."""
+        try:
+            self._put(COLLECTIONS["users"], user_id, user, email=user.email)
+            return True
+        except Exception as e:
+            logger.error(f"Error updating user: {str(e)}")
+            return False
+
+    # API key operations
+    @repository_operation
+    async def create_api_key(self, api_key: ApiKey) -> str:
+        """Store an API key record under its digest."""
+        try:
+            self._put(COLLECTIONS["api_keys"], api_key.id, api_key)
+            return api_key.id
+        except Exception as e:
+            logger.error(f"Error creating API key: {str(e)}")
+            raise
+
+    @repository_operation
+    async def get_api_key(self, digest: str) -> Optional[ApiKey]:
+        """Get an API key record by the digest of the key."""
+        try:
+            return self._get(COLLECTIONS["api_keys"], digest, ApiKey)
+        except Exception as e:
+            logger.error(f"Error getting API key: {str(e)}")
+            return None
+
+    @repository_operation
+    async def update_api_key(self, digest: str, api_key: ApiKey) -> bool:
+        """Update an API key record."""
+        try:
+            self._put(COLLECTIONS["api_keys"], digest, api_key)
+            return True
+        except Exception as e:
+            logger.error(f"Error updating API key: {str(e)}")
+            return False
+
+    @repository_operation
+    async def list_user_api_keys(self, user_id: str) -> List[ApiKey]:
+        """Get every API key record issued to a user, revoked ones included."""
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT data FROM {COLLECTIONS['api_keys']}"
+                ).fetchall()
+            codec = get_codec(ApiKey)
+            api_keys = (codec.decode(row[0]) for row in rows)
+            return [api_key for api_key in api_keys if api_key.user_id == user_id]
+        except Exception as e:
+            logger.error(f"Error listing API keys: {str(e)}")
+            raise
+
+    # Refresh token operations
+    @repository_operation
+    async def create_refresh_token(self, refresh_token: RefreshToken) -> str:
+        """Store a refresh token family."""
+        try:
+            self._put(COLLECTIONS["refresh_tokens"], refresh_token.id, refresh_token)
+            return refresh_token.id
+        except Exception as e:
+            logger.error(f"Error creating refresh token: {str(e)}")
+            raise
+
+    @repository_operation
+    async def get_refresh_token(self, family_id: str) -> Optional[RefreshToken]:
+        """Get a refresh token family by ID."""
+        try:
+            return self._get(COLLECTIONS["refresh_tokens"], family_id, RefreshToken)
+        except Exception as e:
+            logger.error(f"Error getting refresh token: {str(e)}")
+            return None
+
+    @repository_operation
+    async def update_refresh_token(
+        self, family_id: str, refresh_token: RefreshToken
+    ) -> bool:
+        """Update a refresh token family."""
+        try:
+            self._put(COLLECTIONS["refresh_tokens"], family_id, refresh_token)
+            return True
+        except Exception as e:
+            logger.error(f"Error updating refresh token: {str(e)}")
+            return False
+
+    @repository_operation
+    async def transact_refresh_token(
+        self,
+        family_id: str,
+        update: Callable[[Optional[RefreshToken]], Optional[RefreshToken]],
+    ) -> Optional[RefreshToken]:
+        """Read-modify-write a refresh token family in a database transaction."""
+        codec = get_codec(RefreshToken)
+        collection = COLLECTIONS["refresh_tokens"]
+        try:
+            with self._lock:
+                # Takes the write lock up front, so other processes sharing
+                # the database cannot read the family until we commit
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    row = self._conn.execute(
+                        f"SELECT data FROM {collection} WHERE id = ?", (family_id,)
+                    ).fetchone()
+                    written = update(codec.decode(row[0]) if row else None)
+                    if written is not None:
+                        self._conn.execute(
+                            f"INSERT OR REPLACE INTO {collection} (id, data) VALUES (?, ?)",
+                            (family_id, codec.encode(written)),
+                        )
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            return written
+        except Exception as e:
+            logger.error(f"Error updating refresh token: {str(e)}")
+            return None
+
+    # Product operations
+    @repository_operation
+    async def create_product(self, product: Product) -> str:
+        """Create a new product in the database."""
+        try:
+            self._put(COLLECTIONS["products"], product.id, product)
+            return product.id
+        except Exception as e:
+            logger.error(f"Error creating product: {str(e)}")
+            raise
+
+    @repository_operation
+    async def get_product(self, product_id: str) -> Optional[Product]:
+        """Get product by ID from database."""
+        try:
+            return self._get(COLLECTIONS["products"], product_id, Product)
+        except Exception as e:
+            logger.error(f"Error getting product: {str(e)}")
+            return None
+
+    @repository_operation
+    async def update_product(self, product_id: str, product: Product) -> bool:
+        """Update product in database."""
+        try:
+            self._put(COLLECTIONS["products"], product_id, product)
+            return True
+        except Exception as e:
+            logger.error(f"Error updating product: {str(e)}")
+            return False
+
+    # Category operations
+    @repository_operation
+    async def create_category(self, category: Category) -> str:
+        """Create a new category in the database."""
+        try:
+            self._put(COLLECTIONS["categories"], category.id, category)
+            return category.id
+        except Exception as e:
+            logger.error(f"Error creating category: {str(e)}")
+            raise
+
+    @repository_operation
+    async def get_category(self, category_id: str) -> Optional[Category]:
+        """Get category by ID from database."""
+        try:
+            return self._get(COLLECTIONS["categories"], category_id, Category)
+        except Exception as e:
+            logger.error(f"Error getting category: {str(e)}")
+            return None
+
+    # Search operations
+    @repository_operation
+    async def save_search_result(self, search_result: SearchResponse) -> str:
+        """Save search result to database."""
+        try:
+            self._put(COLLECTIONS["searches"], search_result.query_id, search_result)
+            return search_result.query_id
+        except Exception as e:
+            logger.error(f"Error saving search result: {str(e)}")
+            raise
+
+    @repository_operation
+    async def save_search_results(
+        self, search_results: List[SearchResponse]
+    ) -> List[str]:
+        """Save a batch of search results in one transaction."""
+        try:
+            codec = get_codec(SearchResponse)
+            rows = [
+                (search_result.query_id, codec.encode(search_result))
+                for search_result in search_results
+            ]
+            with self._lock:
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.executemany(
+                        f"INSERT OR REPLACE INTO {COLLECTIONS['searches']} (id, data) VALUES (?, ?)",
+                        rows,
+                    )
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            return [row[0] for row in rows]
+        except Exception as e:
+            logger.error(f"Error saving search results batch: {str(e)}")
+            raise
+
+    @repository_operation
+    async def get_search_result(self, query_id: str) -> Optional[SearchResponse]:
+        """Get search result by query ID from database."""
+        try:
+            return self._get(COLLECTIONS["searches"], query_id, SearchResponse)
+        except Exception as e:
+            logger.error(f"Error getting search result: {str(e)}")
+            return None
+
+    # Storage operations
+    def _storage_path(self, storage_key: str, name: str) -> Path:
+        path = (self.root / STORAGE_PATHS[storage_key] / name).resolve()
+        base = (self.root / STORAGE_PATHS[storage_key]).resolve()
+        if base not in path.parents:
+            raise ValueError(f"Invalid storage path: {name}")
+        return path
+
+    @repository_operation
+    async def upload_image(
+        self, file_data: bytes, content_type: Optional[str] = None
+    ) -> Upload:
+        """Store an image under the uploads directory, deduplicated by content hash."""
+        try:
+            return await asyncio.to_thread(self._store_image, file_data, content_type)
+        except Exception as e:
+            logger.error(f"Error uploading image: {str(e)}")
+            raise
+
+    def _store_image(self, file_data: bytes, content_type: Optional[str]) -> Upload:
+        digest = hashlib.sha256(file_data).hexdigest()
+        path = self._storage_path("uploads", digest)
+        codec = get_codec(Upload)
+
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT data FROM {COLLECTIONS['uploads']} WHERE id = ?", (digest,)
+            ).fetchone()
+            if row is not None:
+                upload = codec.decode(row[0])
+                upload.ref_count += 1
+                upload.updated_at = datetime.utcnow()
+            else:
+                if not path.exists():
+                    tmp_path = path.with_name(f".{path.name}.tmp")
+                    tmp_path.write_bytes(file_data)
+                    os.replace(tmp_path, path)
+                upload = Upload(
+                    id=digest,
+                    content_type=detect_content_type(file_data, fallback=content_type),
+                    size=len(file_data),
+                    path=f"{STORAGE_PATHS['uploads']}/{digest}",
+                    url=path.as_uri(),
+                )
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {COLLECTIONS['uploads']} (id, data) VALUES (?, ?)",
+                (digest, codec.encode(upload)),
+            )
+        return upload
+
+    @repository_operation
+    async def get_upload(self, digest: str) -> Optional[Upload]:
+        """Get the manifest entry of a stored upload."""
+        try:
+            return self._get(COLLECTIONS["uploads"], digest, Upload)
+        except Exception as e:
+            logger.error(f"Error getting upload: {str(e)}")
+            return None
+
+    @repository_operation
+    async def release_image(self, digest: str) -> bool:
+        """Drop one reference to an upload, deleting the file when none remain."""
+        try:
+            return await asyncio.to_thread(self._release_image, digest)
+        except Exception as e:
+            logger.error(f"Error releasing upload: {str(e)}")
+            return False
+
+    def _release_image(self, digest: str) -> bool:
+        codec = get_codec(Upload)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT data FROM {COLLECTIONS['uploads']} WHERE id = ?", (digest,)
+            ).fetchone()
+            if row is None:
+                return False
+
+            upload = codec.decode(row[0])
+            if upload.ref_count > 1:
+                upload.ref_count -= 1
+                upload.updated_at = datetime.utcnow()
+                self._conn.execute(
+                    f"UPDATE {COLLECTIONS['uploads']} SET data = ? WHERE id = ?",
+                    (codec.encode(upload), digest),
+                )
+            else:
+                self._conn.execute(
+                    f"DELETE FROM {COLLECTIONS['uploads']} WHERE id = ?", (digest,)
+                )
+                self._storage_path("uploads", digest).unlink(missing_ok=True)
+        return True
+
+    @repository_operation
+    async def upload_embedding(self, product_id: str, embedding: List[float]) -> str:
+        """Store a product embedding as a float32 ``.npy`` file."""
+        try:
+            return await asyncio.to_thread(self._write_embedding, product_id, embedding)
+        except Exception as e:
+            logger.error(f"Error uploading embedding: {str(e)}")
+            raise
+
+    def _write_embedding(self, product_id: str, embedding: List[float]) -> str:
+        path = self._storage_path("embeddings", f"{product_id}.npy")
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.asarray(embedding, dtype=np.float32))
+        os.replace(tmp_path, path)
+        return path.as_uri()
+
+    @repository_operation
+    async def get_embedding(self, product_id: str) -> Optional[List[float]]:
+        """Get a product embedding, memory-mapping the stored file."""
+        try:
+            return await asyncio.to_thread(self._read_embedding, product_id)
+        except Exception as e:
+            logger.error(f"Error retrieving embedding: {str(e)}")
+            return None
+
+    def _read_embedding(self, product_id: str) -> Optional[List[float]]:
+        path = self._storage_path("embeddings", f"{product_id}.npy")
+        if not path.exists():
+            return None
+        return np.load(path, mmap_mode="r").tolist()
+
+    @repository_operation
+    async def get_all_embeddings(self) -> Tuple[List[str], np.ndarray]:
+        """Load every stored embedding from the embeddings directory."""
+        try:
+            return await asyncio.to_thread(self._load_embeddings)
+        except Exception as e:
+            logger.error(f"Error retrieving embeddings: {str(e)}")
+            raise
+
+    def _load_embeddings(self) -> Tuple[List[str], np.ndarray]:
+        product_ids = []
+        vectors = []
+        for path in sorted((self.root / STORAGE_PATHS["embeddings"]).glob("*.npy")):
+            product_ids.append(path.stem)
+            vectors.append(np.load(path))
+        return product_ids, stack_embeddings(product_ids, vectors)
+
+    # Query operations
+    @repository_operation
+    async def search_products(
+        self, query: Dict[str, Any], limit: int = 10
+    ) -> List[Product]:
+        """Search products in database."""
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT data FROM {COLLECTIONS['products']}"
+                ).fetchall()
+
+            codec = get_codec(Product)
+            products = []
+            for (data,) in rows:
+                product = codec.decode(data)
+                if all(getattr(product, k, None) == v for k, v in query.items()):
+                    products.append(product)
+                    if len(products) >= limit:
+                        break
+            return products
+        except Exception as e:
+            logger.error(f"Error searching products: {str(e)}")
+            return []
+
+    @repository_operation
+    async def check_connection(self) -> Dict[str, Any]:
+        """Check database connection."""
+        try:
+            with self._lock:
+                self._conn.execute("SELECT 1").fetchone()
+            return {
+                "status": "connected",
+                "details": {"path": str(self.root / "records.db")},
+            }
+        except Exception as e:
+            return {"status": "disconnected", "error": str(e)}
+
+    @repository_operation
+    async def check_storage(self) -> Dict[str, Any]:
+        """Check local storage status."""
+        try:
+            writable = os.access(self.root, os.W_OK)
+            return {
+                "status": "healthy" if writable else "unhealthy",
+                "details": {"root": str(self.root), "writable": writable},
+            }
+        except Exception as e:
+            return {"status": "unhealthy", "error": str(e)}
@@ -18,6 +18,31 @@ class User(BaseModel):
         from_attributes = True
 
 
+class ApiKey(BaseModel):
+    id: str  # SHA-256 hex digest of the key; the key itself is never stored
+    user_id: str
+    email: EmailStr
+    role: str = "service"
+    name: str = ""
+    prefix: str  # leading characters of the key, to tell keys apart
+    requests_per_minute: Optional[int] = None  # falls back to the global limit
+    expires_at: Optional[datetime] = None
+    revoked: bool = False
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class RefreshToken(BaseModel):
+    id: str  # token family; every rotation of a login shares it
+    user_id: str
+    token_digest: str  # SHA-256 of the only refresh token currently valid
+    generation: int = 0  # rotations so far
+    expires_at: datetime
+    revoked: bool = False
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 class Category(BaseModel):
     id: str
     name: str
@@ -60,6 +85,49 @@ class SearchResult(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+# Search results as returned by the API; stored and cached in this shape
+class BoundingBox(BaseModel):
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+
+
+class ProductResponse(BaseModel):
+    id: str
+    brand: str
+    name: str
+    price: float
+    currency: str
+    source_url: str
+    image_url: str
+
+
+class DetectionResponse(BaseModel):
+    product: Optional[ProductResponse] = None
+    similarity_score: float = Field(ge=0.0, le=1.0)
+    bounding_box: BoundingBox
+    confidence: float = Field(ge=0.0, le=1.0)
+
+
+class SearchResponse(BaseModel):
+    query_id: str
+    results: List[DetectionResponse]
+    processing_time: float
+    created_at: datetime
+
+
+class Upload(BaseModel):
+    id: str  # SHA-256 hex digest of the content
+    content_type: str
+    size: int
+    path: str
+    url: str
+    ref_count: int = 1
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 # Firebase collection names
 COLLECTIONS = {
     "products": "products",
@@ -67,6 +135,9 @@ COLLECTIONS = {
     "attributes": "attributes",
     "searches": "searches",
     "users": "users",
+    "uploads": "uploads",
+    "api_keys": "api_keys",
+    "refresh_tokens": "refresh_tokens",
 }
 
 # Firebase storage paths
@@ -1,26 +1,65 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from starlette.types import Receive, Scope, Send
 
 from src.api.auth import router as auth_router
-from src.api.endpoints import router as api_router
 from src.utils.config import settings
-from src.utils.firebase_config import initialize_firebase
 
-# Initialize Firebase
-if not initialize_firebase():
-    raise RuntimeError("Failed to initialize Firebase")
+PROCESS_ROLES = {"all", "auth"}
+if settings.PROCESS_ROLE not in PROCESS_ROLES:
+    raise ValueError(f"Unknown process role: {settings.PROCESS_ROLE}")
+
+# Auth-only workers never import the inference endpoints, and with them
+# PIL and the model stack. numpy is still imported, by the repositories.
+SERVE_INFERENCE = settings.PROCESS_ROLE == "all"
+if SERVE_INFERENCE:
+    from src.api import endpoints
+
+# Initialize Firebase when it backs the repository
+if settings.STORAGE_BACKEND == "firebase":
+    from src.utils.firebase_config import initialize_firebase
+
+    if not initialize_firebase():
+        raise RuntimeError("Failed to initialize Firebase")
+
+
+class StreamingAwareGZipMiddleware(GZipMiddleware):
+    """GZip that leaves NDJSON streams alone.
+
+    The gzip encoder holds data back until the response ends, which would
+    defeat streaming partial results.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].endswith("/stream"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if SERVE_INFERENCE:
+        await endpoints.start_components()
+    yield
+    if SERVE_INFERENCE:
+        await endpoints.stop_components()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="API for fashion item detection and similarity search",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Add middleware
-app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MIN_SIZE)
+app.add_middleware(StreamingAwareGZipMiddleware, minimum_size=settings.GZIP_MIN_SIZE)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -35,7 +74,8 @@ if settings.ENABLE_HTTPS_REDIRECT:
 
 # Include routers
 app.include_router(auth_router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
-app.include_router(api_router, prefix=settings.API_V1_STR, tags=["api"])
+if SERVE_INFERENCE:
+    app.include_router(endpoints.router, prefix=settings.API_V1_STR, tags=["api"])
 
 
 @app.get("/")
@@ -0,0 +1,131 @@
+"""
+Versioned model bundle: pre-converted weights plus a checksum manifest.
+
+A bundle is a directory built once by ``scripts/download_models.py``:
+
+    manifest.json             format, version and a size/sha256 per file
+    detector.safetensors      Faster R-CNN state dict
+    vit/config.json           ViT config
+    vit/model.safetensors     ViT weights
+    processor/preprocessor_config.json
+
+Weights are safetensors, so loading them maps the files into memory instead
+of unpickling them, and nothing is fetched from the network. This module
+only deals with files and the manifest; it does not import torch.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, Optional
+
+BUNDLE_FORMAT = 1
+MANIFEST_NAME = "manifest.json"
+
+DETECTOR_WEIGHTS = "detector.safetensors"
+VIT_DIR = "vit"
+PROCESSOR_DIR = "processor"
+REQUIRED_FILES = (
+    DETECTOR_WEIGHTS,
+    f"{VIT_DIR}/config.json",
+    f"{VIT_DIR}/model.safetensors",
+    f"{PROCESSOR_DIR}/preprocessor_config.json",
+)
+
+_CHUNK_SIZE = 1 << 20
+
+
+class BundleError(RuntimeError):
+    """Raised when a model bundle is missing, incomplete or corrupted."""
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _bundle_files(bundle_dir: str) -> Iterable[str]:
+    for root, _, names in os.walk(bundle_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, bundle_dir).replace(os.sep, "/")
+            if relative != MANIFEST_NAME:
+                yield relative
+
+
+def write_manifest(
+    bundle_dir: str, version: str, metadata: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Record every file in the bundle with its size and checksum.
+
+    Call this last, once all weights and configs are written.
+    """
+    files = {}
+    for relative in sorted(_bundle_files(bundle_dir)):
+        path = os.path.join(bundle_dir, relative)
+        files[relative] = {"size": os.path.getsize(path), "sha256": file_sha256(path)}
+    if not files:
+        raise BundleError(f"Model bundle {bundle_dir} is empty")
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": version,
+        "created_at": time.time(),
+        "metadata": metadata or {},
+        "files": files,
+    }
+    # Write then rename, so a reader never sees a half-written manifest
+    path = os.path.join(bundle_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+    return manifest
+
+
+def load_manifest(bundle_dir: str, verify_checksums: bool = False) -> Dict[str, Any]:
+    """Read a bundle's manifest and check its files against it.
+
+    Sizes are always checked. Checksums are only checked when asked, because
+    that reads every byte of the weights and would undo the point of mapping
+    them lazily at startup.
+
+    Raises:
+        BundleError: if the bundle is missing, incomplete or does not match
+    """
+    path = os.path.join(bundle_dir, MANIFEST_NAME)
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        raise BundleError(f"No model bundle manifest at {path}")
+    except ValueError as e:
+        raise BundleError(f"Unreadable model bundle manifest {path}: {str(e)}")
+
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise BundleError(
+            f"Model bundle format {manifest.get('format')} is not supported "
+            f"(expected {BUNDLE_FORMAT})"
+        )
+
+    files = manifest.get("files", {})
+    missing = [name for name in REQUIRED_FILES if name not in files]
+    if missing:
+        raise BundleError(f"Model bundle manifest does not list {', '.join(missing)}")
+
+    for relative, expected in files.items():
+        file_path = os.path.join(bundle_dir, relative)
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            raise BundleError(f"Model bundle file {relative} is missing")
+        if size != expected["size"]:
+            raise BundleError(
+                f"Model bundle file {relative} is {size} bytes, expected {expected['size']}"
+            )
+        if verify_checksums and file_sha256(file_path) != expected["sha256"]:
+            raise BundleError(f"Model bundle file {relative} failed its checksum")
+    return manifest
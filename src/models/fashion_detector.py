@@ -11,13 +11,20 @@ import torchvision.models as models
 import torchvision.transforms as T
 import torchvision.transforms.functional as F
 from PIL import Image
+from safetensors.torch import load_model
 from torchvision.models.detection import fasterrcnn_resnet50_fpn_v2
 from transformers import ViTFeatureExtractor, ViTModel
 
+from src.models.bundle import DETECTOR_WEIGHTS, PROCESSOR_DIR, VIT_DIR, load_manifest
 from src.utils.config import settings
+from src.utils.metrics import PIPELINE_STAGE_SECONDS
 
 logger = logging.getLogger(__name__)
 
+DECODE_STAGE = PIPELINE_STAGE_SECONDS.labels("decode")
+DETECTION_STAGE = PIPELINE_STAGE_SECONDS.labels("detection")
+EMBEDDING_STAGE = PIPELINE_STAGE_SECONDS.labels("embedding")
+
 
 class FashionDetector:
     def __init__(self, device=None):
@@ -28,47 +35,17 @@ class FashionDetector:
             else torch.device("cuda" if torch.cuda.is_available() else "cpu")
         )
         logger.info(f"Using device: {self.device}")
+        self._probe_passed = False  # set by the first successful check_status
+        self.bundle_version = None  # set when loaded from a model bundle
 
         try:
-            # Set model cache directory
-            model_path = os.getenv("TRANSFORMERS_CACHE", os.path.join(os.path.dirname(__file__), "huggingface_models"))
-            os.makedirs(model_path, exist_ok=True)
-            logger.info(f"Using model cache directory: {model_path}")
-
-            # Initialize object detection model
-            logger.info("Loading object detection model...")
-            self.detector = fasterrcnn_resnet50_fpn_v2(pretrained=True)
+            if settings.MODEL_BUNDLE_DIR:
+                self._load_bundle(settings.MODEL_BUNDLE_DIR)
+            else:
+                self._load_pretrained()
+
             self.detector.to(self.device)
             self.detector.eval()
-
-            # Initialize feature extractor
-            logger.info("Loading ViT model...")
-            try:
-                # First try to load from cache
-                self.feature_extractor = ViTModel.from_pretrained(
-                    "google/vit-base-patch16-224",
-                    cache_dir=model_path,
-                    local_files_only=True,
-                )
-                self.feature_processor = ViTFeatureExtractor.from_pretrained(
-                    "google/vit-base-patch16-224",
-                    cache_dir=model_path,
-                    local_files_only=True,
-                )
-            except Exception as e:
-                logger.warning(f"Failed to load models from cache: {str(e)}")
-                logger.info("Attempting to download models...")
-                self.feature_extractor = ViTModel.from_pretrained(
-                    "google/vit-base-patch16-224",
-                    cache_dir=model_path,
-                    local_files_only=False,
-                )
-                self.feature_processor = ViTFeatureExtractor.from_pretrained(
-                    "google/vit-base-patch16-224",
-                    cache_dir=model_path,
-                    local_files_only=False,
-                )
-
             self.feature_extractor.to(self.device)
             self.feature_extractor.eval()
 
@@ -87,16 +64,76 @@ class FashionDetector:
             logger.error(f"Error initializing models: {str(e)}")
             raise RuntimeError(f"Failed to initialize models: {str(e)}")
 
-    def preprocess_image(self, image_data):
+    def _load_bundle(self, bundle_dir: str) -> None:
+        """Load both models from a bundle built by scripts/download_models.py.
+
+        Weights are memory-mapped safetensors and nothing is downloaded.
         """
-        Preprocess image for model input.
+        manifest = load_manifest(
+            bundle_dir, verify_checksums=settings.MODEL_BUNDLE_VERIFY
+        )
+        self.bundle_version = manifest["version"]
+        logger.info(f"Loading model bundle {self.bundle_version} from {bundle_dir}")
 
-        Args:
-            image_data: bytes, PIL Image, or numpy array
+        # Build the architecture without weights, then map the bundled ones in
+        logger.info("Loading object detection model...")
+        self.detector = fasterrcnn_resnet50_fpn_v2(weights=None, weights_backbone=None)
+        load_model(self.detector, os.path.join(bundle_dir, DETECTOR_WEIGHTS))
 
-        Returns:
-            torch.Tensor: Preprocessed image tensor
-        """
+        logger.info("Loading ViT model...")
+        self.feature_extractor = ViTModel.from_pretrained(
+            os.path.join(bundle_dir, VIT_DIR), local_files_only=True
+        )
+        self.feature_processor = ViTFeatureExtractor.from_pretrained(
+            os.path.join(bundle_dir, PROCESSOR_DIR), local_files_only=True
+        )
+
+    def _load_pretrained(self) -> None:
+        """Load both models from the hub cache, downloading them if needed."""
+        # Set model cache directory
+        model_path = os.getenv(
+            "TRANSFORMERS_CACHE",
+            os.path.join(os.path.dirname(__file__), "huggingface_models"),
+        )
+        os.makedirs(model_path, exist_ok=True)
+        logger.info(f"Using model cache directory: {model_path}")
+
+        # Initialize object detection model
+        logger.info("Loading object detection model...")
+        self.detector = fasterrcnn_resnet50_fpn_v2(pretrained=True)
+
+        # Initialize feature extractor
+        logger.info("Loading ViT model...")
+        try:
+            # First try to load from cache
+            self.feature_extractor = ViTModel.from_pretrained(
+                "google/vit-base-patch16-224",
+                cache_dir=model_path,
+                local_files_only=True,
+            )
+            self.feature_processor = ViTFeatureExtractor.from_pretrained(
+                "google/vit-base-patch16-224",
+                cache_dir=model_path,
+                local_files_only=True,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to load models from cache: {str(e)}")
+            logger.info("Attempting to download models...")
+            self.feature_extractor = ViTModel.from_pretrained(
+                "google/vit-base-patch16-224",
+                cache_dir=model_path,
+                local_files_only=False,
+            )
+            self.feature_processor = ViTFeatureExtractor.from_pretrained(
+                "google/vit-base-patch16-224",
+                cache_dir=model_path,
+                local_files_only=False,
+            )
+
+    @staticmethod
+    def _load_image(image_data) -> Image.Image:
+        """Decode bytes, PIL Image, or numpy array into an RGB PIL Image."""
+        image: Image.Image
         if isinstance(image_data, bytes):
             image = Image.open(io.BytesIO(image_data))
         elif isinstance(image_data, np.ndarray):
@@ -109,6 +146,19 @@ class FashionDetector:
         # Convert to RGB if needed
         if image.mode != "RGB":
             image = image.convert("RGB")
+        return image
+
+    def preprocess_image(self, image_data):
+        """
+        Preprocess image for model input.
+
+        Args:
+            image_data: bytes, PIL Image, or numpy array
+
+        Returns:
+            torch.Tensor: Preprocessed image tensor
+        """
+        image = self._load_image(image_data)
 
         # Convert to tensor and normalize
         image_tensor = F.to_tensor(image)
@@ -128,19 +178,44 @@ class FashionDetector:
             list: List of detected objects with bounding boxes and scores
         """
         with torch.no_grad():
-            image_tensor = self.preprocess_image(image_data)
-            image_tensor = image_tensor.to(self.device)
-            detections = self.detector(image_tensor)[0]
+            with DECODE_STAGE.time():
+                image_tensor = self.preprocess_image(image_data)
+            with DETECTION_STAGE.time():
+                image_tensor = image_tensor.to(self.device)
+                detections = self.detector(image_tensor)[0]
+                return self._filter_detections(detections)
+
+    def forward_batch(self, images):
+        """
+        Process several images through the object detection model in one pass.
 
-            # Filter detections with confidence > 0.5
-            mask = detections["scores"] > 0.5
-            boxes = detections["boxes"][mask].cpu().numpy()
-            scores = detections["scores"][mask].cpu().numpy()
+        Args:
+            images: list of bytes, PIL Images, or numpy arrays
 
-            results = []
-            for box, score in zip(boxes, scores):
-                results.append({"box": box.tolist(), "confidence": float(score)})
-            return results
+        Returns:
+            list: One list of detected objects per image
+        """
+        if not images:
+            return []
+        with torch.no_grad():
+            # The detector takes a list of variably sized 3D tensors
+            with DECODE_STAGE.time():
+                tensors = [self.preprocess_image(image)[0] for image in images]
+            with DETECTION_STAGE.time():
+                tensors = [tensor.to(self.device) for tensor in tensors]
+                return [self._filter_detections(d) for d in self.detector(tensors)]
+
+    @staticmethod
+    def _filter_detections(detections) -> List[Dict[str, Any]]:
+        # Filter detections with confidence > 0.5
+        mask = detections["scores"] > 0.5
+        boxes = detections["boxes"][mask].cpu().numpy()
+        scores = detections["scores"][mask].cpu().numpy()
+
+        results = []
+        for box, score in zip(boxes, scores):
+            results.append({"box": box.tolist(), "confidence": float(score)})
+        return results
 
     def get_embeddings(self, image_data):
         """
@@ -152,52 +227,75 @@ class FashionDetector:
         Returns:
             list: Feature embeddings as a list of floats
         """
-        if isinstance(image_data, bytes):
-            image = Image.open(io.BytesIO(image_data))
-        elif isinstance(image_data, np.ndarray):
-            image = Image.fromarray(image_data)
-        elif isinstance(image_data, Image.Image):
-            image = image_data
-        else:
-            raise ValueError("image_data must be bytes, PIL Image, or numpy array")
+        with DECODE_STAGE.time():
+            image = self._load_image(image_data)
 
-        # Convert to RGB if needed
-        if image.mode != "RGB":
-            image = image.convert("RGB")
+            # Process image for feature extraction
+            inputs = self.feature_processor(images=image, return_tensors="pt")
 
-        # Process image for feature extraction
-        inputs = self.feature_processor(images=image, return_tensors="pt")
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
-
-        with torch.no_grad():
+        with EMBEDDING_STAGE.time(), torch.no_grad():
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
             outputs = self.feature_extractor(**inputs)
             embeddings = outputs.pooler_output.cpu().numpy()
 
         return embeddings[0].tolist()  # Convert numpy array to list and return
 
+    def get_embeddings_batch(self, images):
+        """
+        Get embeddings for several images in one ViT pass.
+
+        Args:
+            images: list of bytes, PIL Images, or numpy arrays
+
+        Returns:
+            list: One embedding (list of floats) per image
+        """
+        if not images:
+            return []
+        with DECODE_STAGE.time():
+            pil_images = [self._load_image(image) for image in images]
+            inputs = self.feature_processor(images=pil_images, return_tensors="pt")
+
+        with EMBEDDING_STAGE.time(), torch.no_grad():
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            outputs = self.feature_extractor(**inputs)
+            embeddings = outputs.pooler_output.cpu().numpy()
+
+        return embeddings.tolist()
+
     def check_status(self) -> Dict[str, Any]:
-        """Check model status and health."""
+        """Check model status and health.
+
+        Both models run one small forward pass the first time they are
+        found loaded; later checks only confirm they are still loaded.
+        """
         try:
             # Check if models are loaded
-            detector_loaded = hasattr(self, "detector") and self.detector is not None
-            vit_loaded = hasattr(self, "vit_model") and self.vit_model is not None
+            detector_loaded = getattr(self, "detector", None) is not None
+            vit_loaded = getattr(self, "feature_extractor", None) is not None
 
-            # Try a small forward pass
-            if detector_loaded and vit_loaded:
-                test_input = torch.randn(1, 3, 224, 224).to(self.device)
+            if detector_loaded and vit_loaded and not self._probe_passed:
                 with torch.no_grad():
-                    self.detector(test_input)
-                    self.vit_model(test_input)
-
+                    self.detector([torch.rand(3, 224, 224, device=self.device)])
+                    self.feature_extractor(
+                        pixel_values=torch.rand(1, 3, 224, 224, device=self.device)
+                    )
+                self._probe_passed = True
+
+            device = torch.device(self.device)
+            ready = detector_loaded and vit_loaded and self._probe_passed
             return {
-                "status": "healthy",
+                "status": "healthy" if ready else "unhealthy",
                 "details": {
-                    "device": str(self.device),
+                    "device": str(device),
                     "detector_loaded": detector_loaded,
                     "vit_loaded": vit_loaded,
-                    "memory_allocated": torch.cuda.memory_allocated()
-                    if self.device == "cuda"
-                    else 0,
+                    "bundle_version": self.bundle_version,
+                    "memory_allocated": (
+                        torch.cuda.memory_allocated(device)
+                        if device.type == "cuda"
+                        else 0
+                    ),
                 },
             }
         except Exception as e:
@@ -0,0 +1,49 @@
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LazyFashionDetector:
+    """Stands in for ``FashionDetector`` until a model call needs it.
+
+    Importing ``src.models.fashion_detector`` loads torch, torchvision and
+    transformers, and constructing the detector loads both models. Neither
+    happens until ``load`` is called or a detector attribute is first
+    accessed. ``load`` blocks, so call it from a worker thread.
+    """
+
+    def __init__(self, **kwargs: Any):
+        self._kwargs = kwargs
+        self._detector = None
+        self._lock = threading.Lock()
+        self.load_seconds: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._detector is not None
+
+    def load(self):
+        """Import and build the detector if that has not happened yet."""
+        if self._detector is None:
+            with self._lock:
+                if self._detector is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module("src.models.fashion_detector")
+                    self._detector = module.FashionDetector(**self._kwargs)
+                    self.load_seconds = time.perf_counter() - start
+                    logger.info(f"Fashion detector loaded in {self.load_seconds:.1f}s")
+        return self._detector
+
+    def check_status(self) -> Dict[str, Any]:
+        """Model health; loads the detector, so run it in a worker thread."""
+        return self.load().check_status()
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not defined here, i.e. detector methods
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
@@ -1,36 +1,234 @@
-from typing import Any, Dict, List
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
 
 import numpy as np
 
-from src.database.repository import FirebaseRepository
+from src.database.base import BaseRepository
+from src.database.models import Product
+from src.utils.config import settings
+from src.utils.metrics import CACHE_REQUESTS, PIPELINE_STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+SEARCH_STAGE = PIPELINE_STAGE_SECONDS.labels("search")
+HYDRATION_STAGE = PIPELINE_STAGE_SECONDS.labels("hydration")
+PRODUCT_CACHE_HITS = CACHE_REQUESTS.labels("products", "hit")
+PRODUCT_CACHE_MISSES = CACHE_REQUESTS.labels("products", "miss")
 
 
 class SimilaritySearch:
-    def __init__(self, repository: FirebaseRepository):
+    """Cosine similarity search over an in-memory copy of all embeddings.
+
+    Embeddings saved through this instance are searchable immediately.
+    Changes made elsewhere (another worker, an import script) show up after
+    the next refresh, so the index is at most ``refresh_interval`` seconds
+    stale, or until ``invalidate_index`` is called.
+    """
+
+    def __init__(
+        self,
+        repository: BaseRepository,
+        product_cache_size: int = settings.PRODUCT_CACHE_SIZE,
+        refresh_interval: float = settings.SEARCH_INDEX_REFRESH_INTERVAL,
+    ):
         self.repository = repository
+        self.product_cache_size = product_cache_size
+        self.refresh_interval = refresh_interval
+
+        # In-memory vector index: product ids and L2-normalized embeddings.
+        # _index_matrix is a view of the first len(_index_ids) rows of
+        # _index_buffer, which has spare capacity for appends. Nothing is
+        # loaded until _last_refresh is set.
+        self._index_ids: List[str] = []
+        self._index_rows: Dict[str, int] = {}
+        self._index_buffer = np.empty((0, 0), dtype=np.float32)
+        self._index_matrix = self._index_buffer
+        self._index_lock = asyncio.Lock()
+        self._last_refresh: Optional[float] = None
+
+        # Embeddings saved while a refresh is loading, replayed on top of it
+        self._saved_during_refresh: Optional[Dict[str, List[float]]] = None
+        self._refresh_requested = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self._product_cache: "OrderedDict[str, Product]" = OrderedDict()
 
     async def search(
         self, query_embedding: List[float], top_k: int = 10
     ) -> List[Dict[str, Any]]:
-        """Search for similar products using cosine similarity."""
-        # Get all products from the database
-        products = await self.repository.search_products({})
-
-        # Calculate similarities
-        similarities = []
-        for product in products:
-            # Get product embedding from storage
-            embedding = await self._get_product_embedding(product.id)
-            if embedding is None:
+        """Search for similar products using cosine similarity.
+
+        Ranking works on product ids and vectors only; full products are
+        fetched afterwards for the top-k ids.
+        """
+        await self._ensure_index()
+        if not self._index_ids or top_k <= 0:
+            return []
+
+        with SEARCH_STAGE.time():
+            scores = self._cosine_scores(query_embedding)
+            top = self._top_k(scores, top_k)
+
+        ranked_ids = [self._index_ids[i] for i in top]
+        products = await self._hydrate(ranked_ids)
+
+        results = []
+        for i, product in zip(top, products):
+            if product is None:
                 continue
+            results.append({"product": product, "similarity": float(scores[i])})
+        return results
+
+    async def search_many(
+        self, query_embeddings: List[List[float]], top_k: int = 10
+    ) -> List[List[Dict[str, Any]]]:
+        """Search for several queries at once.
+
+        All queries are scored with a single matrix product and the union of
+        their top-k products is hydrated in one pass.
+        """
+        await self._ensure_index()
+        if not query_embeddings:
+            return []
+        if not self._index_ids or top_k <= 0:
+            return [[] for _ in query_embeddings]
+
+        with SEARCH_STAGE.time():
+            scores = self._cosine_scores_many(query_embeddings)
+            tops = [self._top_k(row, top_k) for row in scores]
+
+        # Resolve ids now: a refresh may swap the index while hydrating
+        index_ids = self._index_ids
+        ranked_ids = list(dict.fromkeys(index_ids[i] for top in tops for i in top))
+        products = dict(zip(ranked_ids, await self._hydrate(ranked_ids)))
+
+        results = []
+        for row, top in zip(scores, tops):
+            matches = []
+            for i in top:
+                product = products[index_ids[i]]
+                if product is not None:
+                    matches.append({"product": product, "similarity": float(row[i])})
+            results.append(matches)
+        return results
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, top_k: int) -> np.ndarray:
+        """Indices of the ``top_k`` highest scores, best first."""
+        k = min(top_k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top], kind="stable")]
+
+    @property
+    def last_refresh(self) -> Optional[float]:
+        """Wall-clock time of the last completed index load."""
+        return self._last_refresh
+
+    async def start(self) -> None:
+        """Build the index and keep refreshing it in the background."""
+        try:
+            await self._ensure_index()
+        except Exception as e:
+            # Not fatal: the first search tries again
+            logger.error(f"Error loading similarity index: {str(e)}")
+        if self.refresh_interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="similarity-index")
+            logger.info(
+                f"Similarity index refresh started (interval {self.refresh_interval}s)"
+            )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
 
-            # Calculate cosine similarity
-            similarity = self._cosine_similarity(query_embedding, embedding)
-            similarities.append({"product": product, "similarity": float(similarity)})
+    def invalidate_index(self) -> None:
+        """Ask the background task to reload the index now."""
+        self._refresh_requested.set()
 
-        # Sort by similarity and return top-k results
-        similarities.sort(key=lambda x: x["similarity"], reverse=True)
-        return similarities[:top_k]
+    async def refresh_index(self) -> None:
+        """Reload all embeddings from the repository."""
+        async with self._index_lock:
+            await self._load_index()
+
+    async def _ensure_index(self) -> None:
+        if self._last_refresh is not None:
+            return
+        async with self._index_lock:
+            if self._last_refresh is None:
+                await self._load_index()
+
+    async def _load_index(self) -> None:
+        self._saved_during_refresh = {}
+        try:
+            product_ids, matrix = await self.repository.get_all_embeddings()
+            saved = self._saved_during_refresh
+        finally:
+            self._saved_during_refresh = None
+
+        # Swapped in without awaiting, so searches see the old or new index
+        self._index_ids = list(product_ids)
+        self._index_rows = {pid: row for row, pid in enumerate(self._index_ids)}
+        self._index_buffer = self._normalize(matrix)
+        self._index_matrix = self._index_buffer
+        # The load may have started before these were written
+        for product_id, embedding in saved.items():
+            self._add_to_index(product_id, embedding)
+        self._last_refresh = time.time()
+        logger.info(f"Loaded similarity index with {len(self._index_ids)} embeddings")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._refresh_requested.wait(), timeout=self.refresh_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._refresh_requested.clear()
+            try:
+                await self.refresh_index()
+            except Exception as e:
+                # Keep serving the previous index
+                logger.error(f"Error refreshing similarity index: {str(e)}")
+
+    async def _hydrate(self, product_ids: List[str]) -> List[Optional[Product]]:
+        """Fetch products for the given ids, in order, through the LRU cache."""
+        missing = [pid for pid in product_ids if pid not in self._product_cache]
+        PRODUCT_CACHE_HITS.inc(len(product_ids) - len(missing))
+        PRODUCT_CACHE_MISSES.inc(len(missing))
+
+        with HYDRATION_STAGE.time():
+            fetched = await asyncio.gather(
+                *(self.repository.get_product(pid) for pid in missing)
+            )
+        for pid, product in zip(missing, fetched):
+            if product is not None:
+                self._cache_product(pid, product)
+
+        products = []
+        for pid in product_ids:
+            product = self._product_cache.get(pid)
+            if product is not None:
+                self._product_cache.move_to_end(pid)
+            products.append(product)
+        return products
+
+    def _cache_product(self, product_id: str, product: Product) -> None:
+        if self.product_cache_size <= 0:
+            return
+        self._product_cache[product_id] = product
+        self._product_cache.move_to_end(product_id)
+        while len(self._product_cache) > self.product_cache_size:
+            self._product_cache.popitem(last=False)
+
+    def invalidate_product(self, product_id: str) -> None:
+        """Drop a product from the hydration cache after it changes."""
+        self._product_cache.pop(product_id, None)
 
     async def _get_product_embedding(self, product_id: str) -> List[float]:
         """Get product embedding from storage."""
@@ -40,7 +238,77 @@ class SimilaritySearch:
         self, product_id: str, embedding: List[float]
     ) -> str:
         """Save product embedding to storage."""
-        return await self.repository.upload_embedding(product_id, embedding)
+        url = await self.repository.upload_embedding(product_id, embedding)
+        self._add_to_index(product_id, embedding)
+        return url
+
+    def _add_to_index(self, product_id: str, embedding: List[float]) -> None:
+        """Insert or replace a vector in the loaded index."""
+        if self._saved_during_refresh is not None:
+            self._saved_during_refresh[product_id] = embedding
+        if self._last_refresh is None:
+            return
+        row = self._normalize(np.asarray(embedding, dtype=np.float32)[None, :])[0]
+        if self._index_matrix.size and row.shape[0] != self._index_matrix.shape[1]:
+            logger.warning(
+                f"Not indexing embedding for {product_id}: dimension mismatch"
+            )
+            return
+
+        position = self._index_rows.get(product_id)
+        if position is not None:
+            self._index_buffer[position] = row
+            return
+
+        size = len(self._index_ids)
+        if not self._index_matrix.size:
+            self._index_buffer = np.empty((1, row.shape[0]), dtype=np.float32)
+        elif size == self._index_buffer.shape[0]:
+            # Grow geometrically so appends are amortized O(dim)
+            grown = np.empty((2 * size, row.shape[0]), dtype=np.float32)
+            grown[:size] = self._index_buffer[:size]
+            self._index_buffer = grown
+        self._index_buffer[size] = row
+        self._index_ids.append(product_id)
+        self._index_rows[product_id] = size
+        self._index_matrix = self._index_buffer[: size + 1]
+
+    def _cosine_scores(self, query_embedding: List[float]) -> np.ndarray:
+        """Cosine similarity of the query against every indexed vector, in [0, 1]."""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        matrix = self._index_matrix
+
+        # Ensure embeddings have the same dimension
+        if query.shape[0] != matrix.shape[1]:
+            min_dim = min(query.shape[0], matrix.shape[1])
+            query = query[:min_dim]
+            matrix = self._normalize(matrix[:, :min_dim])
+
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return np.zeros(matrix.shape[0], dtype=np.float32)
+
+        scores = matrix @ (query / norm)
+        return np.clip(scores, 0.0, 1.0)
+
+    def _cosine_scores_many(self, query_embeddings: List[List[float]]) -> np.ndarray:
+        """Cosine similarity of each query against every indexed vector, one row per query."""
+        dims = {len(query) for query in query_embeddings}
+        if dims != {self._index_matrix.shape[1]}:
+            return np.stack([self._cosine_scores(query) for query in query_embeddings])
+
+        # Zero queries stay zero after normalization and score 0 everywhere
+        queries = self._normalize(np.asarray(query_embeddings, dtype=np.float32))
+        return np.clip(queries @ self._index_matrix.T, 0.0, 1.0)
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if matrix.size == 0:
+            return matrix
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
 
     def _cosine_similarity(self, emb1: List[float], emb2: List[float]) -> float:
         """Calculate cosine similarity between two embeddings."""
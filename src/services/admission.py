@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict
+
+from src.utils.config import settings
+from src.utils.metrics import REGISTRY
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+ADMISSION_REJECTED = REGISTRY.counter(
+    "admission_rejected_total",
+    "Inference requests shed by admission control, by reason.",
+    ["reason"],
+)
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram(
+    "admission_wait_seconds",
+    "Time admitted requests spent waiting for a slot.",
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of queued."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounded in-flight limit with a short FIFO wait queue.
+
+    Requests beyond ``max_in_flight`` wait in line. They are rejected
+    immediately when the line is full, or when their expected wait exceeds
+    ``max_wait``. The expected wait comes from an exponentially weighted
+    moving average of recent service times.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = settings.ADMISSION_MAX_IN_FLIGHT,
+        max_queue: int = settings.ADMISSION_MAX_QUEUE,
+        max_wait: float = settings.ADMISSION_MAX_WAIT,
+        initial_service_time: float = 1.0,
+        smoothing: float = 0.2,
+    ):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.smoothing = smoothing
+
+        self._service_time = initial_service_time
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def service_time(self) -> float:
+        """Smoothed service time of recent requests, in seconds."""
+        return self._service_time
+
+    def estimated_wait(self, position: int) -> float:
+        """Expected seconds until the request at ``position`` in line gets a slot."""
+        return (position + 1) * self._service_time / self.max_in_flight
+
+    async def acquire(self) -> float:
+        """Take a slot, waiting in line if needed.
+
+        Returns:
+            float: Admission time, to be passed back to ``release``
+
+        Raises:
+            AdmissionRejected: if the request is shed
+        """
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            return time.monotonic()
+
+        position = len(self._waiters)
+        estimate = self.estimated_wait(position)
+        if position >= self.max_queue:
+            ADMISSION_REJECTED.labels("queue_full").inc()
+            raise AdmissionRejected("Admission queue is full", estimate)
+        if estimate > self.max_wait:
+            ADMISSION_REJECTED.labels("expected_wait").inc()
+            raise AdmissionRejected(
+                f"Expected wait of {estimate:.1f}s exceeds {self.max_wait}s", estimate
+            )
+
+        start = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self._release_slot()
+            else:
+                waiter.cancel()
+                self._remove_waiter(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                ADMISSION_REJECTED.labels("timeout").inc()
+                raise AdmissionRejected(
+                    "Timed out waiting for capacity", self.estimated_wait(self.queued)
+                )
+            raise
+
+        ADMISSION_WAIT_SECONDS.observe(time.monotonic() - start)
+        return time.monotonic()
+
+    def release(self, admitted_at: float) -> None:
+        """Return a slot and record how long the request held it."""
+        elapsed = time.monotonic() - admitted_at
+        self._service_time += self.smoothing * (elapsed - self._service_time)
+        self._release_slot()
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        admitted_at = await self.acquire()
+        try:
+            yield
+        finally:
+            self.release(admitted_at)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self._in_flight,
+            "queued": len(self._waiters),
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "service_time": round(self._service_time, 4),
+        }
+
+    def _release_slot(self) -> None:
+        # Hand the slot straight to the next waiter so it cannot be taken by
+        # a newcomer on the fast path
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def _remove_waiter(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
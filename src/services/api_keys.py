@@ -0,0 +1,205 @@
+import hashlib
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.database.base import BaseRepository
+from src.database.models import ApiKey, User
+from src.utils.config import settings
+from src.utils.metrics import CACHE_REQUESTS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+API_KEY_PREFIX = "gr_"
+
+
+def generate_api_key() -> str:
+    return API_KEY_PREFIX + secrets.token_urlsafe(32)
+
+
+def api_key_digest(api_key: str) -> str:
+    """Storage key of an API key; only the digest is ever persisted."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+class ApiKeyService:
+    """Issue, rotate, revoke and check API keys for service clients.
+
+    Checking a key costs one SHA-256 and, on a cache miss, keyed
+    repository reads of the key and its owner. Records (including misses)
+    and owners' active flags are cached for ``cache_ttl`` seconds, which
+    bounds how long a revocation or deactivation made by another process
+    takes to apply here.
+    """
+
+    def __init__(
+        self,
+        repository: BaseRepository,
+        cache_ttl: float = settings.API_KEY_CACHE_TTL,
+        max_entries: int = settings.API_KEY_CACHE_SIZE,
+        rotation_grace: int = settings.API_KEY_ROTATION_GRACE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.repository = repository
+        self.cache_ttl = cache_ttl
+        self.max_entries = max_entries
+        self.rotation_grace = timedelta(seconds=rotation_grace)
+        self.clock = clock
+        self._hit_counter = CACHE_REQUESTS.labels("api_keys", "hit")
+        self._miss_counter = CACHE_REQUESTS.labels("api_keys", "miss")
+
+        self._cache: "OrderedDict[str, Tuple[Optional[ApiKey], float]]" = OrderedDict()
+        self._owners: "OrderedDict[str, Tuple[bool, float]]" = OrderedDict()
+
+    async def issue(
+        self,
+        user: User,
+        name: str = "",
+        role: str = "service",
+        requests_per_minute: Optional[int] = None,
+        expires_at: Optional[datetime] = None,
+    ) -> Tuple[str, ApiKey]:
+        """Create a key for ``user``.
+
+        Returns:
+            Tuple[str, ApiKey]: The plaintext key, shown only this once,
+            and its stored record
+        """
+        api_key = generate_api_key()
+        record = ApiKey(
+            id=api_key_digest(api_key),
+            user_id=user.id,
+            email=user.email,
+            role=role,
+            name=name,
+            prefix=api_key[: len(API_KEY_PREFIX) + 6],
+            requests_per_minute=requests_per_minute,
+            expires_at=expires_at,
+        )
+        await self.repository.create_api_key(record)
+
+        # Point the user at their newest key
+        user.api_key = record.id
+        user.updated_at = datetime.utcnow()
+        await self.repository.update_user(user.id, user)
+        return api_key, record
+
+    async def authenticate(self, api_key: str) -> Optional[ApiKey]:
+        """The record of a valid key, or None.
+
+        A key is invalid when unknown, revoked, expired or its owner is
+        deactivated.
+        """
+        if not api_key.startswith(API_KEY_PREFIX):
+            return None
+        record = await self.get(api_key_digest(api_key))
+        if record is None or record.revoked:
+            return None
+        if record.expires_at is not None and record.expires_at <= datetime.utcnow():
+            return None
+        if not await self._owner_active(record.user_id):
+            return None
+        return record
+
+    async def get(self, digest: str) -> Optional[ApiKey]:
+        """Key record by digest, from the cache when fresh."""
+        cached = self._cache.get(digest)
+        if cached is not None and self.clock() - cached[1] < self.cache_ttl:
+            self._hit_counter.inc()
+            self._cache.move_to_end(digest)
+            return cached[0]
+
+        self._miss_counter.inc()
+        record = await self.repository.get_api_key(digest)
+        self._remember(digest, record)
+        return record
+
+    async def rotate(self, digest: str) -> Optional[Tuple[str, ApiKey]]:
+        """Issue a replacement key with the same settings.
+
+        The old key keeps working for the rotation grace period so clients
+        can switch over without downtime.
+        """
+        old = await self.get(digest)
+        if old is None or old.revoked:
+            return None
+        user = await self.repository.get_user(old.user_id)
+        if user is None:
+            return None
+
+        api_key, record = await self.issue(
+            user,
+            name=old.name,
+            role=old.role,
+            requests_per_minute=old.requests_per_minute,
+            expires_at=old.expires_at,
+        )
+        grace_end = datetime.utcnow() + self.rotation_grace
+        if old.expires_at is None or old.expires_at > grace_end:
+            old.expires_at = grace_end
+        old.updated_at = datetime.utcnow()
+        await self.repository.update_api_key(digest, old)
+        self._cache.pop(digest, None)
+        return api_key, record
+
+    async def revoke(self, digest: str) -> bool:
+        """Disable a key immediately."""
+        record = await self.get(digest)
+        if record is None:
+            return False
+        record.revoked = True
+        record.updated_at = datetime.utcnow()
+        if not await self.repository.update_api_key(digest, record):
+            return False
+        self._cache.pop(digest, None)
+        logger.info(f"Revoked API key {record.prefix}... for {record.email}")
+        return True
+
+    async def revoke_user_keys(self, user_id: str) -> int:
+        """Disable every key of a user, e.g. when the user is deactivated.
+
+        Returns the number of keys revoked.
+        """
+        self._owners.pop(user_id, None)
+        revoked = 0
+        for record in await self.repository.list_user_api_keys(user_id):
+            self._cache.pop(record.id, None)
+            if record.revoked:
+                continue
+            record.revoked = True
+            record.updated_at = datetime.utcnow()
+            if await self.repository.update_api_key(record.id, record):
+                revoked += 1
+        if revoked:
+            logger.info(f"Revoked {revoked} API keys of user {user_id}")
+        return revoked
+
+    def stats(self) -> Dict[str, Any]:
+        return {"cached": len(self._cache), "owners_cached": len(self._owners)}
+
+    async def _owner_active(self, user_id: str) -> bool:
+        cached = self._owners.get(user_id)
+        if cached is not None and self.clock() - cached[1] < self.cache_ttl:
+            self._owners.move_to_end(user_id)
+            return cached[0]
+
+        user = await self.repository.get_user(user_id)
+        active = user is not None and user.is_active
+        if self.max_entries > 0:
+            self._owners[user_id] = (active, self.clock())
+            self._owners.move_to_end(user_id)
+            while len(self._owners) > self.max_entries:
+                self._owners.popitem(last=False)
+        return active
+
+    def _remember(self, digest: str, record: Optional[ApiKey]) -> None:
+        if self.max_entries <= 0:
+            return
+        self._cache[digest] = (record, self.clock())
+        self._cache.move_to_end(digest)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
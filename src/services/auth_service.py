@@ -1,14 +1,19 @@
+import hashlib
+import hmac
 import logging
+import secrets
 import uuid
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
-import bcrypt
 from fastapi import HTTPException, status
 from jose import JWTError, jwt
 
-from src.database.models import User
-from src.database.repository import FirebaseRepository
+from src.database.base import BaseRepository
+from src.database.models import RefreshToken, User
+from src.services.api_keys import ApiKeyService
+from src.services.password_hasher import PasswordHasher, PasswordHasherBusy
+from src.services.token_cache import CachedToken, TokenCache
 from src.utils.config import settings
 
 # Configure logging
@@ -18,11 +23,53 @@ logger = logging.getLogger(__name__)
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
+
+# Shared by every AuthService so the worker cap and revocations apply
+# process-wide
+password_hasher = PasswordHasher()
+token_cache = TokenCache()
+
+
+def _credentials_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _refresh_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+    )
+
+
+def _secret_digest(secret: str) -> str:
+    return hashlib.sha256(secret.encode("utf-8")).hexdigest()
+
+
+def _hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy. Please try again shortly.",
+        headers={"Retry-After": "1"},
+    )
 
 
 class AuthService:
-    def __init__(self, repository: FirebaseRepository):
+    def __init__(
+        self,
+        repository: BaseRepository,
+        hasher: Optional[PasswordHasher] = None,
+        tokens: Optional[TokenCache] = None,
+        api_keys: Optional[ApiKeyService] = None,
+    ):
         self.repository = repository
+        self.hasher = hasher or password_hasher
+        self.token_cache = tokens if tokens is not None else token_cache
+        self.api_keys = api_keys if api_keys is not None else ApiKeyService(repository)
 
     async def create_user(self, user_data: dict) -> User:
         """Create a new user with hashed password."""
@@ -36,9 +83,7 @@ class AuthService:
                 )
 
             # Hash password
-            hashed_password = bcrypt.hashpw(
-                user_data["password"].encode("utf-8"), bcrypt.gensalt()
-            ).decode("utf-8")
+            hashed_password = await self.hasher.hash(user_data["password"])
 
             # Create user object
             user = User(
@@ -54,6 +99,10 @@ class AuthService:
             await self.repository.create_user(user)
             return user
 
+        except HTTPException:
+            raise
+        except PasswordHasherBusy:
+            raise _hashing_busy()
         except Exception as e:
             logger.error(f"Error creating user: {str(e)}")
             raise HTTPException(
@@ -65,56 +114,169 @@ class AuthService:
         """Authenticate user and return user object if valid."""
         try:
             user = await self.get_user_by_email(email)
-            if not user:
+            if not user or not user.is_active:
                 return None
 
-            if not bcrypt.checkpw(
-                password.encode("utf-8"), user.hashed_password.encode("utf-8")
-            ):
+            if not await self.hasher.verify(password, user.hashed_password):
                 return None
 
+            if self.hasher.needs_rehash(user.hashed_password):
+                await self._rehash_password(user, password)
             return user
 
+        except PasswordHasherBusy:
+            raise _hashing_busy()
         except Exception as e:
             logger.error(f"Error authenticating user: {str(e)}")
             return None
 
+    async def _rehash_password(self, user: User, password: str) -> None:
+        """Move a stored hash to the configured work factor after a login."""
+        try:
+            user.hashed_password = await self.hasher.hash(password)
+            user.updated_at = datetime.utcnow()
+            await self.repository.update_user(user.id, user)
+        except Exception as e:
+            logger.warning(f"Could not rehash password for {user.email}: {str(e)}")
+
     async def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email from database."""
         try:
-            users_ref = self.repository.db.reference("users")
-            users = users_ref.get()
-            if not users:
-                return None
-
-            for user_id, user_data in users.items():
-                if user_data.get("email") == email:
-                    # Convert ISO format strings back to datetime objects
-                    user_data["created_at"] = datetime.fromisoformat(user_data["created_at"])
-                    user_data["updated_at"] = datetime.fromisoformat(user_data["updated_at"])
-                    return User(**user_data)
-            return None
-
+            return await self.repository.get_user_by_email(email)
         except Exception as e:
             logger.error(f"Error getting user by email: {str(e)}")
             return None
 
+    async def deactivate_user(self, email: str) -> bool:
+        """Deactivate a user and revoke every token and API key issued to them."""
+        user = await self.get_user_by_email(email)
+        if user is None:
+            return False
+        user.is_active = False
+        user.updated_at = datetime.utcnow()
+        if not await self.repository.update_user(user.id, user):
+            return False
+        self.revoke_user(email)
+        await self.api_keys.revoke_user_keys(user.id)
+        return True
+
+    def revoke_user(self, email: str) -> int:
+        """Refuse all tokens issued to a user so far; returns tokens evicted."""
+        evicted = self.token_cache.revoke_user(email)
+        logger.info(f"Revoked tokens for {email} ({evicted} cached)")
+        return evicted
+
+    def revoke_token(self, token: str) -> None:
+        """Refuse a single token until it expires."""
+        entry = self._verify(token)
+        self.token_cache.revoke_token(token, entry.expires_at)
+
+    async def create_refresh_token(self, user: User) -> str:
+        """Start a refresh token family for a password login.
+
+        Refresh tokens have the form ``<family id>.<secret>``. Only the
+        digest of the family's current secret is stored.
+        """
+        secret = secrets.token_urlsafe(32)
+        refresh_token = RefreshToken(
+            id=uuid.uuid4().hex,
+            user_id=user.id,
+            token_digest=_secret_digest(secret),
+            expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+        await self.repository.create_refresh_token(refresh_token)
+        return f"{refresh_token.id}.{secret}"
+
+    async def rotate_refresh_token(self, token: str) -> Tuple[User, str]:
+        """Exchange a refresh token for its user and the family's next token.
+
+        Each refresh token works once. Presenting one that was already
+        rotated means it was leaked or replayed, so the whole family is
+        revoked and the client must log in again.
+        """
+        family_id, _, secret = token.partition(".")
+        if not secret:
+            raise _refresh_error()
+        presented = _secret_digest(secret)
+        new_secret = secrets.token_urlsafe(32)
+        outcome = "invalid"
+
+        def rotate(family: Optional[RefreshToken]) -> Optional[RefreshToken]:
+            # Runs inside the repository transaction, so two requests
+            # presenting the same token cannot both rotate it
+            nonlocal outcome
+            now = datetime.utcnow()
+            if family is None or family.revoked or family.expires_at <= now:
+                outcome = "invalid"
+                return None
+            family.updated_at = now
+            if not hmac.compare_digest(family.token_digest, presented):
+                outcome = "reused"
+                family.revoked = True
+                return family
+            outcome = "rotated"
+            family.token_digest = _secret_digest(new_secret)
+            family.generation += 1
+            return family
+
+        family = await self.repository.transact_refresh_token(family_id, rotate)
+        if outcome == "reused" and family is not None:
+            logger.warning(
+                f"Refresh token reuse detected for user {family.user_id}; family revoked"
+            )
+        if outcome != "rotated" or family is None:
+            raise _refresh_error()
+
+        # Keyed lookup, unlike the email scan a password login needs
+        user = await self.repository.get_user(family.user_id)
+        if user is None or not user.is_active:
+            raise _refresh_error()
+        return user, f"{family.id}.{new_secret}"
+
     def create_access_token(self, data: dict) -> str:
         """Create JWT access token."""
         to_encode = data.copy()
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        to_encode.update({"exp": expire})
+        now = datetime.utcnow()
+        expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        to_encode.update({"exp": expire, "iat": now})
         encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
         return encoded_jwt
 
     def verify_token(self, token: str) -> dict:
-        """Verify JWT token and return payload."""
+        """Verify JWT token and return payload.
+
+        Verified claims are cached until the token expires, so repeated
+        calls with the same token skip signature checks. The returned
+        dict is shared and must not be modified.
+        """
+        return self._verify(token).claims
+
+    async def get_token_user(self, token: str) -> Optional[User]:
+        """Resolve a token to its active user, caching the lookup with the token."""
+        entry = self._verify(token)
+        if entry.user is not None:
+            return entry.user
+
+        email = entry.claims.get("sub")
+        if not email:
+            return None
+        user = await self.get_user_by_email(email)
+        if user is None or not user.is_active:
+            return None
+        self.token_cache.attach_user(token, user)
+        return user
+
+    def _verify(self, token: str) -> CachedToken:
+        entry = self.token_cache.get(token)
+        if entry is not None:
+            return entry
+
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            return payload
         except JWTError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            ) 
\ No newline at end of file
+            raise _credentials_error()
+        if self.token_cache.is_revoked(token, payload):
+            raise _credentials_error()
+
+        self.token_cache.put(token, payload)
+        return CachedToken(payload, float(payload.get("exp") or 0))
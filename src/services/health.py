@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from src.utils.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+HealthCheck = Callable[[], Awaitable[Dict[str, Any]]]
+
+# Component statuses that count as up
+HEALTHY_STATUSES = {"healthy", "connected"}
+
+
+class HealthMonitor:
+    """Background prober that keeps the latest component status in memory.
+
+    Health endpoints read the cached state, so probing cost depends on the
+    refresh interval rather than on how often load balancers ask.
+    """
+
+    def __init__(
+        self,
+        checks: Dict[str, HealthCheck],
+        critical: Optional[Iterable[str]] = None,
+        interval: float = settings.HEALTH_CHECK_INTERVAL,
+        timeout: float = settings.HEALTH_CHECK_TIMEOUT,
+    ):
+        self.checks = checks
+        self.critical = set(checks if critical is None else critical)
+        self.interval = interval
+        self.timeout = timeout
+
+        self._components: Dict[str, Dict[str, Any]] = {}
+        self._last_refresh: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def last_refresh(self) -> Optional[float]:
+        """Wall-clock time of the last completed refresh."""
+        return self._last_refresh
+
+    @property
+    def stale(self) -> bool:
+        """True when no refresh has completed within a few intervals."""
+        if self._last_refresh is None:
+            return True
+        return time.time() - self._last_refresh > 3 * self.interval + self.timeout
+
+    @property
+    def ready(self) -> bool:
+        """True when every critical component passed its last check."""
+        if self.stale:
+            return False
+        return all(
+            self._components.get(name, {}).get("status") in HEALTHY_STATUSES
+            for name in self.critical
+        )
+
+    async def start(self) -> None:
+        """Start probing in the background."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run(), name="health-monitor")
+        logger.info(f"Health monitor started (interval {self.interval}s)")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        logger.info("Health monitor stopped")
+
+    async def refresh(self) -> None:
+        """Run every check concurrently and store the results."""
+        names = list(self.checks)
+        results = await asyncio.gather(*(self._check(name) for name in names))
+        self._components = dict(zip(names, results))
+        self._last_refresh = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cached health state in the shape of ``HealthResponse``."""
+        if self._last_refresh is None:
+            status = "starting"
+        elif self.ready:
+            status = "healthy"
+        else:
+            status = "unhealthy"
+        return {
+            "status": status,
+            "components": dict(self._components),
+            "timestamp": self._last_refresh or time.time(),
+        }
+
+    async def _check(self, name: str) -> Dict[str, Any]:
+        try:
+            return await asyncio.wait_for(self.checks[name](), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Health check {name} timed out after {self.timeout}s")
+            return {"status": "unhealthy", "error": f"Timed out after {self.timeout}s"}
+        except Exception as e:
+            logger.error(f"Health check {name} failed: {str(e)}")
+            return {"status": "unhealthy", "error": str(e)}
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
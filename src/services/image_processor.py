@@ -1,107 +1,298 @@
+import asyncio
 import io
 import logging
 import uuid
+from concurrent.futures import Executor
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional
 
 import numpy as np
 from PIL import Image
 
 from src.api.schemas import DetectionResponse, ProductResponse, SearchResponse
+from src.database.base import BaseRepository
 from src.database.models import Category, Product
-from src.database.repository import FirebaseRepository
-from src.models.fashion_detector import FashionDetector
 from src.models.similarity_search import SimilaritySearch
+from src.services.scheduler import FairScheduler
+from src.services.search_writer import SearchResultWriter
+from src.utils.metrics import (
+    PIPELINE_IMAGES,
+    PIPELINE_IN_FLIGHT,
+    PIPELINE_SECONDS,
+    PIPELINE_STAGE_SECONDS,
+)
+
+if TYPE_CHECKING:
+    # Importing the detector loads torch; at runtime it arrives lazily
+    from src.models.fashion_detector import FashionDetector
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+PERSISTENCE_STAGE = PIPELINE_STAGE_SECONDS.labels("persistence")
+
 
 class ImageProcessor:
     def __init__(
         self,
-        fashion_detector: FashionDetector,
+        fashion_detector: "FashionDetector",
         similarity_search: SimilaritySearch,
-        repository: FirebaseRepository,
+        repository: BaseRepository,
+        result_writer: Optional[SearchResultWriter] = None,
+        executor: Optional[Executor] = None,
+        scheduler: Optional[FairScheduler] = None,
     ):
         self.fashion_detector = fashion_detector
         self.similarity_search = similarity_search
         self.repository = repository
+        self.result_writer = result_writer
+        self.executor = executor
+        self.scheduler = scheduler
+
+    async def _run_model(self, func, *args):
+        """Run a blocking model call in the inference executor.
+
+        With a scheduler, calls from different users are queued fairly
+        instead of first come, first served.
+        """
+        if self.scheduler is not None:
+            return await self.scheduler.run(func, *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
 
-    async def process_image(self, image_data: bytes) -> SearchResponse:
+    async def process_image(
+        self, image_data: bytes, query_id: Optional[str] = None
+    ) -> SearchResponse:
         """
         Process an image to detect fashion items and find similar products.
 
         Args:
             image_data: bytes of the image file
+            query_id: ID to store the result under (generated if omitted)
 
         Returns:
             SearchResponse: Object containing detection results and similar products
         """
+        in_flight = PIPELINE_IN_FLIGHT.labels("single")
+        in_flight.inc()
         try:
             start_time = datetime.now()
 
             # Get detections from fashion detector
-            detections = self.fashion_detector.forward(image_data)
+            detections = await self._run_model(
+                self.fashion_detector.forward, image_data
+            )
 
             # Get embeddings for the whole image
-            embeddings = self.fashion_detector.get_embeddings(image_data)
+            embeddings = await self._run_model(
+                self.fashion_detector.get_embeddings, image_data
+            )
 
             # Search for similar products
             similar_products = await self.similarity_search.search(embeddings)
 
-            # Create detection results
+            search_result = self._build_response(
+                detections, similar_products, query_id, start_time
+            )
+
+            await self._save_results([search_result])
+
+            PIPELINE_SECONDS.labels("single").observe(search_result.processing_time)
+            PIPELINE_IMAGES.labels("single", "ok").inc()
+            return search_result
+
+        except Exception as e:
+            PIPELINE_IMAGES.labels("single", "error").inc()
+            logger.error(f"Error processing image: {str(e)}")
+            raise
+        finally:
+            in_flight.dec()
+
+    async def process_images(self, images: List[bytes]) -> List[SearchResponse]:
+        """
+        Process several images with one batched model pass per stage.
+
+        Args:
+            images: list of image bytes
+
+        Returns:
+            List[SearchResponse]: One result per image, in input order
+        """
+        in_flight = PIPELINE_IN_FLIGHT.labels("batch")
+        in_flight.inc()
+        try:
+            start_time = datetime.now()
+
+            detections = await self._run_model(
+                self.fashion_detector.forward_batch, images
+            )
+            embeddings = await self._run_model(
+                self.fashion_detector.get_embeddings_batch, images
+            )
+            similar_products = await self.similarity_search.search_many(embeddings)
+
+            search_results = [
+                self._build_response(image_detections, matches, None, start_time)
+                for image_detections, matches in zip(detections, similar_products)
+            ]
+
+            await self._save_results(search_results)
+
+            PIPELINE_SECONDS.labels("batch").observe(
+                (datetime.now() - start_time).total_seconds()
+            )
+            PIPELINE_IMAGES.labels("batch", "ok").inc(len(images))
+            return search_results
+
+        except Exception as e:
+            PIPELINE_IMAGES.labels("batch", "error").inc(len(images))
+            logger.error(f"Error processing image batch: {str(e)}")
+            raise
+        finally:
+            in_flight.dec()
+
+    async def process_image_stream(
+        self, image_data: bytes, query_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process an image, yielding partial results as each stage finishes.
+
+        Yields a ``detections`` event with the bounding boxes as soon as the
+        detector returns, a ``match`` event per detection once the similarity
+        search completes, and a final ``summary`` event after the result is
+        persisted.
+
+        Args:
+            image_data: bytes of the image file
+            query_id: ID to store the result under (generated if omitted)
+        """
+        in_flight = PIPELINE_IN_FLIGHT.labels("stream")
+        in_flight.inc()
+        try:
+            start_time = datetime.now()
+            query_id = query_id or str(uuid.uuid4())
+
+            detections = await self._run_model(
+                self.fashion_detector.forward, image_data
+            )
+            yield {
+                "event": "detections",
+                "query_id": query_id,
+                "detections": [
+                    {
+                        "index": index,
+                        "bounding_box": self._bounding_box(detection["box"]),
+                        "confidence": detection["confidence"],
+                    }
+                    for index, detection in enumerate(detections)
+                ],
+            }
+
+            embeddings = await self._run_model(
+                self.fashion_detector.get_embeddings, image_data
+            )
+            similar_products = await self.similarity_search.search(embeddings)
+            best_match = similar_products[0] if similar_products else None
+
             detection_results = []
-            for detection in detections:
-                box = detection["box"]
-                confidence = detection["confidence"]
-
-                # Get the most similar product for this detection
-                product = similar_products[0] if similar_products else None
-                similarity_score = (
-                    product.get("similarity_score", 0.0) if product else 0.0
-                )
-
-                # Convert product dict to ProductResponse if exists
-                product_response = None
-                if product:
-                    product_response = ProductResponse(
-                        id=product.get("id", ""),
-                        brand=product.get("brand", ""),
-                        name=product.get("name", ""),
-                        price=product.get("price", 0.0),
-                        currency=product.get("currency", "USD"),
-                        source_url=product.get("source_url", ""),
-                        image_url=product.get("image_url", ""),
-                    )
-
-                detection_results.append(
-                    DetectionResponse(
-                        product=product_response,
-                        similarity_score=similarity_score,
-                        bounding_box={
-                            "x1": box[0],
-                            "y1": box[1],
-                            "x2": box[2],
-                            "y2": box[3],
-                        },
-                        confidence=confidence,
-                    )
-                )
-
-            # Create search result
+            for index, detection in enumerate(detections):
+                detection_result = self._build_detection(detection, best_match)
+                detection_results.append(detection_result)
+                yield {
+                    "event": "match",
+                    "index": index,
+                    "result": detection_result.model_dump(mode="json"),
+                }
+
             search_result = SearchResponse(
-                query_id=str(uuid.uuid4()),
+                query_id=query_id,
                 results=detection_results,
                 processing_time=(datetime.now() - start_time).total_seconds(),
                 created_at=datetime.now(),
             )
+            await self._save_results([search_result])
+            PIPELINE_SECONDS.labels("stream").observe(search_result.processing_time)
+            PIPELINE_IMAGES.labels("stream", "ok").inc()
 
-            # Save search result
-            await self.repository.save_search_result(search_result)
+            yield {
+                "event": "summary",
+                "query_id": query_id,
+                "detections": len(detection_results),
+                "processing_time": search_result.processing_time,
+                "created_at": search_result.created_at.isoformat(),
+            }
+        except Exception:
+            PIPELINE_IMAGES.labels("stream", "error").inc()
+            raise
+        finally:
+            in_flight.dec()
 
-            return search_result
+    async def _save_results(self, search_results: List[SearchResponse]) -> None:
+        """Persist search results.
 
-        except Exception as e:
-            logger.error(f"Error processing image: {str(e)}")
-            raise
+        The write-behind queue, when configured, keeps the database round
+        trip off the response path. Without it, several results go to the
+        repository in one batched write.
+        """
+        with PERSISTENCE_STAGE.time():
+            if self.result_writer is not None:
+                for search_result in search_results:
+                    await self.result_writer.enqueue(search_result)
+            elif len(search_results) == 1:
+                await self.repository.save_search_result(search_results[0])
+            else:
+                await self.repository.save_search_results(search_results)
+
+    def _build_response(
+        self,
+        detections: List[Dict[str, Any]],
+        similar_products: List[Dict[str, Any]],
+        query_id: Optional[str],
+        start_time: datetime,
+    ) -> SearchResponse:
+        """Combine detections and similar products into a search result."""
+        # Every detection gets the most similar product for the image
+        best_match = similar_products[0] if similar_products else None
+        detection_results = [
+            self._build_detection(detection, best_match) for detection in detections
+        ]
+
+        # Create search result
+        return SearchResponse(
+            query_id=query_id or str(uuid.uuid4()),
+            results=detection_results,
+            processing_time=(datetime.now() - start_time).total_seconds(),
+            created_at=datetime.now(),
+        )
+
+    def _build_detection(
+        self, detection: Dict[str, Any], best_match: Optional[Dict[str, Any]]
+    ) -> DetectionResponse:
+        """Build the response for one detection and its matched product."""
+        similarity_score = best_match["similarity"] if best_match else 0.0
+
+        # Convert product to ProductResponse if exists
+        product_response = None
+        if best_match:
+            product = best_match["product"]
+            product_response = ProductResponse(
+                id=product.id,
+                brand=product.brand,
+                name=product.name,
+                price=product.price,
+                currency=product.currency,
+                source_url=product.source_url,
+                image_url=product.image_url,
+            )
+
+        return DetectionResponse(
+            product=product_response,
+            similarity_score=similarity_score,
+            bounding_box=self._bounding_box(detection["box"]),
+            confidence=detection["confidence"],
+        )
+
+    @staticmethod
+    def _bounding_box(box: List[float]) -> Dict[str, float]:
+        x1, y1, x2, y2 = (float(v) for v in box)
+        return {"x1": x1, "y1": y1, "x2": x2, "y2": y2}
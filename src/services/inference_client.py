@@ -0,0 +1,192 @@
+import itertools
+import logging
+import queue
+import socket
+import threading
+from typing import Any, Dict, List, Sequence, Tuple
+
+from src.services.inference_ipc import (
+    OP_DETECT,
+    OP_EMBED,
+    OP_STATUS,
+    InferenceError,
+    decode_embeddings,
+    encode_image,
+    recv_message,
+    send_message,
+)
+from src.utils.config import settings
+from src.utils.metrics import REGISTRY
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+INFERENCE_RPC_SECONDS = REGISTRY.histogram(
+    "inference_rpc_seconds",
+    "Round trip of model calls to inference workers, by operation.",
+    ["op"],
+)
+INFERENCE_RPC_ERRORS = REGISTRY.counter(
+    "inference_rpc_errors_total",
+    "Model calls to inference workers that failed, by operation.",
+    ["op"],
+)
+
+
+class _WorkerUnreachable(ConnectionError):
+    """The request never reached a live worker, so another one may take it."""
+
+
+class _Endpoint:
+    """Idle connections to one worker socket."""
+
+    def __init__(self, path: str, timeout: float):
+        self.path = path
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[socket.socket]" = queue.LifoQueue()
+
+    def acquire(self) -> Tuple[socket.socket, bool]:
+        """A connection, and whether it was reused from the pool."""
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            pass
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+        except (ConnectionRefusedError, FileNotFoundError) as e:
+            sock.close()
+            raise _WorkerUnreachable(f"{self.path}: {str(e)}") from e
+        except OSError:
+            sock.close()
+            raise
+        return sock, False
+
+    def release(self, sock: socket.socket) -> None:
+        self._idle.put(sock)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class RemoteFashionDetector:
+    """``FashionDetector`` stand-in that runs the models in inference workers.
+
+    Images are decoded here and sent as raw pixels. Calls are blocking, like
+    the local detector's, and are spread round-robin over the worker
+    sockets. If a worker cannot be reached, the next one is tried. Any other
+    failure, a timeout included, is raised: the worker may still be running
+    the request, and retrying it elsewhere would only pile more work on a
+    slow fleet.
+    """
+
+    def __init__(
+        self,
+        socket_paths: Sequence[str] = settings.INFERENCE_SOCKETS,
+        timeout: float = settings.INFERENCE_RPC_TIMEOUT,
+    ):
+        if not socket_paths:
+            raise ValueError("At least one inference socket is required")
+        self._endpoints = [_Endpoint(path, timeout) for path in socket_paths]
+        self._next = itertools.cycle(range(len(self._endpoints)))
+        self._lock = threading.Lock()
+        self._request_ids = itertools.count()
+
+    def load(self) -> None:
+        """Check a worker is reachable; the models live in the workers."""
+        try:
+            self._call(OP_STATUS, {})
+        except Exception as e:
+            logger.warning(f"Inference workers not reachable yet: {str(e)}")
+
+    def close(self) -> None:
+        for endpoint in self._endpoints:
+            endpoint.close()
+
+    def forward(self, image_data) -> List[Dict[str, Any]]:
+        return self.forward_batch([image_data])[0]
+
+    def forward_batch(self, images) -> List[List[Dict[str, Any]]]:
+        if not images:
+            return []
+        return self._call(
+            OP_DETECT, {"images": [encode_image(image) for image in images]}
+        )
+
+    def get_embeddings(self, image_data) -> List[float]:
+        return self.get_embeddings_batch([image_data])[0]
+
+    def get_embeddings_batch(self, images) -> List[List[float]]:
+        if not images:
+            return []
+        payloads = self._call(
+            OP_EMBED, {"images": [encode_image(image) for image in images]}
+        )
+        return decode_embeddings(payloads)
+
+    def check_status(self) -> Dict[str, Any]:
+        try:
+            return self._call(OP_STATUS, {})
+        except Exception as e:
+            return {"status": "unhealthy", "error": str(e)}
+
+    def _call(self, op: str, message: Dict[str, Any]) -> Any:
+        with self._lock:
+            first = next(self._next)
+        request = dict(message, op=op, id=next(self._request_ids))
+
+        with INFERENCE_RPC_SECONDS.labels(op).time():
+            last_error: Exception = ConnectionError("No inference workers")
+            for attempt in range(len(self._endpoints)):
+                endpoint = self._endpoints[(first + attempt) % len(self._endpoints)]
+                try:
+                    response = self._round_trip(endpoint, request)
+                except _WorkerUnreachable as e:
+                    last_error = e
+                    logger.warning(f"Inference worker unreachable: {str(e)}")
+                    continue
+                except OSError:
+                    INFERENCE_RPC_ERRORS.labels(op).inc()
+                    raise
+                if not response.get("ok"):
+                    INFERENCE_RPC_ERRORS.labels(op).inc()
+                    raise InferenceError(response.get("error") or "Inference failed")
+                return response["result"]
+
+        INFERENCE_RPC_ERRORS.labels(op).inc()
+        raise last_error
+
+    @staticmethod
+    def _round_trip(endpoint: _Endpoint, request: Dict[str, Any]) -> Dict[str, Any]:
+        sock, pooled = endpoint.acquire()
+        try:
+            send_message(sock, request)
+            response = recv_message(sock)
+        except BaseException as e:
+            # The stream may be mid-message; never reuse it
+            sock.close()
+            if pooled and isinstance(e, ConnectionError):
+                # The worker closed this idle connection, e.g. on restart;
+                # the rest of the pool is just as stale
+                endpoint.close()
+                raise _WorkerUnreachable(f"{endpoint.path}: {str(e)}") from e
+            raise
+        endpoint.release(sock)
+        return response
+
+
+def create_detector():
+    """Detector for the configured inference mode."""
+    mode = settings.INFERENCE_MODE.lower()
+    if mode == "local":
+        from src.models.lazy_detector import LazyFashionDetector
+
+        return LazyFashionDetector()
+    if mode == "remote":
+        return RemoteFashionDetector()
+    raise ValueError(f"Unknown inference mode: {settings.INFERENCE_MODE}")
@@ -0,0 +1,100 @@
+"""
+Wire format shared by the API processes and the inference workers.
+
+Messages are msgpack maps sent over a Unix socket, each prefixed with its
+length as a 4-byte big-endian integer. Images travel decoded: as raw RGB
+``uint8`` pixels plus their shape. The workers therefore spend their
+CPU on the models alone.
+"""
+
+import asyncio
+import io
+import socket
+import struct
+from typing import Any, Dict, List
+
+import msgpack  # type: ignore[import-untyped]
+import numpy as np
+from PIL import Image
+
+# Operations
+OP_DETECT = "detect"
+OP_EMBED = "embed"
+OP_STATUS = "status"
+
+MAX_FRAME_SIZE = 512 * 1024 * 1024
+_HEADER = struct.Struct(">I")
+
+
+class InferenceError(RuntimeError):
+    """Raised by the client when a worker reports a failed model call."""
+
+
+def pack(message: Dict[str, Any]) -> bytes:
+    payload = msgpack.packb(message, use_bin_type=True)
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ValueError(f"Message of {len(payload)} bytes exceeds {MAX_FRAME_SIZE}")
+    return _HEADER.pack(len(payload)) + payload
+
+
+def unpack(payload: bytes) -> Dict[str, Any]:
+    return msgpack.unpackb(payload, raw=False)
+
+
+def send_message(sock: socket.socket, message: Dict[str, Any]) -> None:
+    sock.sendall(pack(message))
+
+
+def recv_message(sock: socket.socket) -> Dict[str, Any]:
+    (size,) = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))
+    if size > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {size} bytes exceeds {MAX_FRAME_SIZE}")
+    return unpack(_recv_exactly(sock, size))
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:], size - received)
+        if count == 0:
+            raise ConnectionError("Inference worker closed the connection")
+        received += count
+    return bytes(buffer)
+
+
+async def read_message(reader: asyncio.StreamReader) -> Dict[str, Any]:
+    (size,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    if size > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {size} bytes exceeds {MAX_FRAME_SIZE}")
+    return unpack(await reader.readexactly(size))
+
+
+def encode_image(image_data) -> Dict[str, Any]:
+    """Decode image bytes (or take an array) into a pixel payload."""
+    if isinstance(image_data, np.ndarray):
+        pixels = image_data
+    else:
+        image = (
+            Image.open(io.BytesIO(image_data))
+            if isinstance(image_data, bytes)
+            else image_data
+        )
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        pixels = np.asarray(image)
+    pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+    return {"shape": list(pixels.shape), "data": pixels.tobytes()}
+
+
+def decode_image(payload: Dict[str, Any]) -> np.ndarray:
+    return np.frombuffer(payload["data"], dtype=np.uint8).reshape(payload["shape"])
+
+
+def encode_embeddings(embeddings: List[List[float]]) -> List[bytes]:
+    return [np.asarray(e, dtype=np.float32).tobytes() for e in embeddings]
+
+
+def decode_embeddings(payloads: List[bytes]) -> List[List[float]]:
+    return [np.frombuffer(p, dtype=np.float32).tolist() for p in payloads]
@@ -0,0 +1,243 @@
+"""
+Inference worker: serves the detection and embedding models over a Unix socket.
+
+Run one per model box (or per GPU) and point the API processes at it with
+``APP_INFERENCE_MODE=remote`` and ``APP_INFERENCE_SOCKETS``. Requests from
+all connected API processes are coalesced into batched model passes.
+
+Usage:
+    python -m src.services.inference_worker --socket /tmp/gate-release-inference.sock
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from src.services.inference_ipc import (
+    OP_DETECT,
+    OP_EMBED,
+    OP_STATUS,
+    decode_image,
+    encode_embeddings,
+    pack,
+    read_message,
+)
+from src.utils.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class _Pending:
+    __slots__ = ("images", "future")
+
+    def __init__(self, images: List[Any], future: asyncio.Future):
+        self.images = images
+        self.future = future
+
+
+class InferenceWorker:
+    """Unix socket server batching model calls from many clients.
+
+    Each operation has its own queue. A batch closes when it holds
+    ``max_batch_size`` images or ``max_batch_wait`` seconds after its first
+    request, whichever comes first. Model calls run one at a time on a
+    dedicated thread.
+    """
+
+    def __init__(
+        self,
+        detector,
+        socket_path: str,
+        max_batch_size: int = settings.INFERENCE_BATCH_SIZE,
+        max_batch_wait: float = settings.INFERENCE_BATCH_WAIT,
+    ):
+        self.detector = detector
+        self.socket_path = socket_path
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_batch_wait = max_batch_wait
+        self.batches = 0
+        self.images = 0
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model")
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        if os.path.exists(self.socket_path):
+            # Left behind by a previous run
+            os.unlink(self.socket_path)
+        self._queues = {OP_DETECT: asyncio.Queue(), OP_EMBED: asyncio.Queue()}
+        self._tasks = [
+            asyncio.create_task(self._batch_loop(op), name=f"inference-batch-{op}")
+            for op in self._queues
+        ]
+        self._server = await asyncio.start_unix_server(
+            self._handle, path=self.socket_path
+        )
+        logger.info(f"Inference worker listening on {self.socket_path}")
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._executor.shutdown(wait=True)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        logger.info("Inference worker stopped")
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            if self._server is not None:
+                await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "images": self.images,
+            "queued": {op: queue.qsize() for op, queue in self._queues.items()},
+        }
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                try:
+                    request = await read_message(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                response = await self._dispatch(request)
+                writer.write(pack(response))
+                await writer.drain()
+        except Exception as e:
+            logger.error(f"Inference connection failed: {str(e)}")
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get("op")
+        try:
+            if op == OP_STATUS:
+                loop = asyncio.get_running_loop()
+                status = await loop.run_in_executor(
+                    self._executor, self.detector.check_status
+                )
+                return {"id": request.get("id"), "ok": True, "result": status}
+            if op not in self._queues:
+                raise ValueError(f"Unknown operation: {op}")
+
+            images = [decode_image(image) for image in request["images"]]
+            pending = _Pending(images, asyncio.get_running_loop().create_future())
+            await self._queues[op].put(pending)
+            return {"id": request.get("id"), "ok": True, "result": await pending.future}
+        except Exception as e:
+            return {"id": request.get("id"), "ok": False, "error": str(e)}
+
+    async def _batch_loop(self, op: str) -> None:
+        queue = self._queues[op]
+        while True:
+            batch = [await queue.get()]
+            size = len(batch[0].images)
+            deadline = time.monotonic() + self.max_batch_wait
+            while size < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    pending = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(pending)
+                size += len(pending.images)
+            await self._run_batch(op, batch)
+
+    async def _run_batch(self, op: str, batch: List[_Pending]) -> None:
+        try:
+            await self._run_model(op, batch)
+            return
+        except Exception as e:
+            if len(batch) == 1:
+                logger.error(f"{op} of {len(batch[0].images)} images failed: {str(e)}")
+                self._fail(batch[0], e)
+                return
+            logger.warning(
+                f"Batched {op} of {len(batch)} requests failed, retrying one by one: {str(e)}"
+            )
+
+        # One bad image should only fail the request that sent it
+        for pending in batch:
+            try:
+                await self._run_model(op, [pending])
+            except Exception as e:
+                logger.error(f"{op} of {len(pending.images)} images failed: {str(e)}")
+                self._fail(pending, e)
+
+    async def _run_model(self, op: str, batch: List[_Pending]) -> None:
+        """Run one model pass over ``batch`` and resolve each request's future."""
+        images = [image for pending in batch for image in pending.images]
+        model_call = self._detect if op == OP_DETECT else self._embed
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(self._executor, model_call, images)
+
+        self.batches += 1
+        self.images += len(images)
+        offset = 0
+        for pending in batch:
+            count = len(pending.images)
+            if not pending.future.done():
+                pending.future.set_result(results[offset : offset + count])
+            offset += count
+
+    @staticmethod
+    def _fail(pending: _Pending, error: Exception) -> None:
+        if not pending.future.done():
+            pending.future.set_exception(error)
+
+    def _detect(self, images: List[Any]) -> List[Any]:
+        return self.detector.forward_batch(images)
+
+    def _embed(self, images: List[Any]) -> List[bytes]:
+        return encode_embeddings(self.detector.get_embeddings_batch(images))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--socket", default=settings.INFERENCE_SOCKETS[0])
+    parser.add_argument("--batch-size", type=int, default=settings.INFERENCE_BATCH_SIZE)
+    parser.add_argument(
+        "--batch-wait", type=float, default=settings.INFERENCE_BATCH_WAIT
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=settings.LOG_LEVEL)
+
+    # The model stack is only imported in worker processes
+    from src.models.fashion_detector import FashionDetector
+
+    worker = InferenceWorker(
+        FashionDetector(),
+        args.socket,
+        max_batch_size=args.batch_size,
+        max_batch_wait=args.batch_wait,
+    )
+    try:
+        asyncio.run(worker.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional
+
+from src.api.schemas import JobStatusResponse
+from src.services.scheduler import current_principal
+from src.utils.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at capacity."""
+
+
+class _Job:
+    __slots__ = (
+        "query_id",
+        "image_data",
+        "status",
+        "submitted_at",
+        "completed_at",
+        "error",
+        "done",
+        "principal",
+    )
+
+    def __init__(self, query_id: str, image_data: bytes):
+        self.query_id = query_id
+        self.image_data: Optional[bytes] = image_data
+        self.status = JOB_QUEUED
+        self.submitted_at = datetime.utcnow()
+        self.completed_at: Optional[datetime] = None
+        self.error: Optional[str] = None
+        self.done = asyncio.Event()
+        self.principal = current_principal.get()
+
+
+class InferenceJobQueue:
+    """Bounded in-process queue drained by a pool of inference workers.
+
+    Results are persisted by the image processor under the job's query ID,
+    so finished jobs are read back through the regular search endpoint.
+    """
+
+    def __init__(
+        self,
+        image_processor,
+        max_size: int = settings.JOB_QUEUE_MAX_SIZE,
+        workers: int = settings.INFERENCE_WORKERS,
+        retention: int = settings.JOB_RETENTION,
+    ):
+        self.image_processor = image_processor
+        self.max_size = max_size
+        self.workers = max(1, workers)
+        self.retention = retention
+
+        self._queue: "asyncio.Queue[_Job]" = asyncio.Queue(maxsize=max_size)
+        self._jobs: "OrderedDict[str, _Job]" = OrderedDict()
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def depth(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return self._queue.qsize()
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    async def start(self) -> None:
+        """Start the worker pool."""
+        if self.running:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"inference-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Inference job queue started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        """Finish queued jobs, then stop the workers."""
+        if self.running:
+            await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Inference job queue stopped")
+
+    def submit(self, image_data: bytes) -> JobStatusResponse:
+        """Queue an image for processing and return its initial status."""
+        job = _Job(str(uuid.uuid4()), image_data)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Job queue is full ({self.max_size} jobs)")
+
+        self._jobs[job.query_id] = job
+        self._evict_finished()
+        return self._status(job)
+
+    def get(self, query_id: str) -> Optional[JobStatusResponse]:
+        """Return the status of a job, if it is still tracked."""
+        job = self._jobs.get(query_id)
+        return self._status(job) if job else None
+
+    async def wait(self, query_id: str, timeout: float) -> Optional[JobStatusResponse]:
+        """Long-poll a job until it finishes or ``timeout`` seconds pass."""
+        job = self._jobs.get(query_id)
+        if job is None:
+            return None
+        if timeout > 0 and not job.done.is_set():
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self._status(job)
+
+    def _status(self, job: _Job) -> JobStatusResponse:
+        return JobStatusResponse(
+            query_id=job.query_id,
+            status=job.status,
+            queue_depth=self.depth,
+            submitted_at=job.submitted_at,
+            completed_at=job.completed_at,
+            error=job.error,
+        )
+
+    def _evict_finished(self) -> None:
+        """Forget the oldest finished jobs beyond the retention limit."""
+        # Jobs are tracked in submission order, so the oldest are at the front
+        while len(self._jobs) > self.retention:
+            query_id, job = next(iter(self._jobs.items()))
+            if not job.done.is_set():
+                break
+            del self._jobs[query_id]
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            # Model calls are charged to whoever submitted the job
+            token = current_principal.set(job.principal)
+            try:
+                job.status = JOB_RUNNING
+                await self.image_processor.process_image(
+                    job.image_data, query_id=job.query_id
+                )
+                job.status = JOB_COMPLETED
+            except Exception as e:
+                logger.error(f"Job {job.query_id} failed: {str(e)}", exc_info=True)
+                job.status = JOB_FAILED
+                job.error = "An error occurred while processing the image"
+            finally:
+                job.image_data = None
+                job.completed_at = datetime.utcnow()
+                job.done.set()
+                current_principal.reset(token)
+                self._queue.task_done()
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+from src.utils.config import settings
+from src.utils.metrics import REGISTRY
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+PASSWORD_HASH_SECONDS = REGISTRY.histogram(
+    "password_hash_seconds",
+    "Time to hash or verify a password, including the wait for a worker.",
+    ["operation"],
+)
+PASSWORD_HASH_REJECTED = REGISTRY.counter(
+    "password_hash_rejected_total",
+    "Password operations shed because too many were waiting.",
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password operations are already waiting."""
+
+
+class PasswordHasher:
+    """Bcrypt hashing on a small dedicated thread pool.
+
+    bcrypt releases the GIL, so running it off the event loop keeps other
+    requests responsive. ``workers`` bounds how many cores a login storm can
+    take, and at most ``max_pending`` operations may wait for them.
+    """
+
+    def __init__(
+        self,
+        rounds: int = settings.BCRYPT_ROUNDS,
+        workers: int = settings.PASSWORD_HASH_WORKERS,
+        max_pending: int = settings.PASSWORD_HASH_MAX_PENDING,
+    ):
+        self.rounds = rounds
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="password-hash"
+        )
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Operations running or waiting for a worker."""
+        return self._pending
+
+    async def hash(self, password: str) -> str:
+        """Hash a password with the configured work factor."""
+        hashed = await self._run("hash", self._hash, password.encode("utf-8"))
+        return hashed.decode("utf-8")
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Check a password against a stored bcrypt hash."""
+        return await self._run(
+            "verify",
+            bcrypt.checkpw,
+            password.encode("utf-8"),
+            hashed_password.encode("utf-8"),
+        )
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """True when a stored hash uses a different work factor."""
+        return hash_rounds(hashed_password) != self.rounds
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False)
+
+    def _hash(self, password: bytes) -> bytes:
+        return bcrypt.hashpw(password, bcrypt.gensalt(rounds=self.rounds))
+
+    async def _run(self, operation: str, func, *args):
+        if self._pending >= self.workers + self.max_pending:
+            PASSWORD_HASH_REJECTED.inc()
+            raise PasswordHasherBusy("Too many password operations in progress")
+
+        self._pending += 1
+        try:
+            with PASSWORD_HASH_SECONDS.labels(operation).time():
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self._pending -= 1
+
+
+def hash_rounds(hashed_password: str) -> Optional[int]:
+    """Work factor of a ``$2b$12$...`` style bcrypt hash."""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
@@ -0,0 +1,158 @@
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, List, NamedTuple, Optional
+
+from src.utils.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: float  # seconds until the request would be allowed
+
+
+class RateLimitBackend(ABC):
+    """Storage strategy for rate-limit state."""
+
+    @abstractmethod
+    async def consume(
+        self, key: str, cost: int, rate: float, capacity: int
+    ) -> RateLimitResult:
+        """Try to take ``cost`` units for ``key``.
+
+        Args:
+            key: client identifier
+            cost: units this request consumes
+            rate: units replenished per second
+            capacity: maximum burst size
+        """
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process token buckets with amortized O(1) updates and lazy expiry.
+
+    Buckets are kept in least-recently-used order, so idle buckets (which
+    would be full again anyway) are dropped from the front as we go.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def consume(
+        self, key: str, cost: int, rate: float, capacity: int
+    ) -> RateLimitResult:
+        now = self.clock()
+        self._expire(now, idle_after=capacity / rate)
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(capacity), now]
+        else:
+            tokens, updated = bucket
+            bucket[0] = min(float(capacity), tokens + (now - updated) * rate)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return RateLimitResult(True, int(bucket[0]), 0.0)
+        return RateLimitResult(False, int(bucket[0]), (cost - bucket[0]) / rate)
+
+    def _expire(self, now: float, idle_after: float) -> None:
+        while self._buckets:
+            key, (_, updated) = next(iter(self._buckets.items()))
+            if now - updated < idle_after:
+                break
+            del self._buckets[key]
+
+
+class SharedStoreRateLimitBackend(RateLimitBackend):
+    """Sliding-window counters in a shared key-value store.
+
+    Works with any async client exposing Redis-style ``incrby``, ``decrby``,
+    ``expire`` and ``get`` (e.g. ``redis.asyncio.Redis``), so every worker
+    sharing the store enforces the same limit.
+    """
+
+    def __init__(
+        self,
+        client,
+        prefix: str = "ratelimit",
+        clock: Callable[[], float] = time.time,
+    ):
+        self.client = client
+        self.prefix = prefix
+        self.clock = clock
+
+    async def consume(
+        self, key: str, cost: int, rate: float, capacity: int
+    ) -> RateLimitResult:
+        window = capacity / rate
+        now = self.clock()
+        index = int(now // window)
+        elapsed = (now % window) / window
+
+        current_key = f"{self.prefix}:{key}:{index}"
+        previous = await self.client.get(f"{self.prefix}:{key}:{index - 1}")
+        previous_count = int(previous or 0)
+
+        # Increment first so concurrent workers see each other's requests,
+        # then refund if the request is over the limit
+        current_count = await self.client.incrby(current_key, cost)
+        if current_count == cost:
+            await self.client.expire(current_key, int(math.ceil(window * 2)))
+
+        estimated = previous_count * (1 - elapsed) + current_count
+        if estimated <= capacity:
+            return RateLimitResult(True, int(capacity - estimated), 0.0)
+
+        await self.client.decrby(current_key, cost)
+        return RateLimitResult(False, 0, window * (1 - elapsed))
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        requests_per_minute: int = settings.MAX_REQUESTS_PER_MINUTE,
+    ):
+        self.backend = backend
+        self.capacity = requests_per_minute
+        self.rate = requests_per_minute / 60.0
+
+    async def hit(
+        self, key: str, cost: int = 1, requests_per_minute: Optional[int] = None
+    ) -> RateLimitResult:
+        """Record a request of ``cost`` units for ``key``."""
+        capacity = requests_per_minute or self.capacity
+        rate = capacity / 60.0 if requests_per_minute else self.rate
+        try:
+            return await self.backend.consume(key, cost, rate, capacity)
+        except Exception as e:
+            # Fail open: an unavailable store must not take the API down
+            logger.error(f"Rate limit backend error: {str(e)}")
+            return RateLimitResult(True, capacity, 0.0)
+
+
+def create_rate_limiter() -> RateLimiter:
+    """Build the rate limiter for the configured backend."""
+    backend = settings.RATE_LIMIT_BACKEND.lower()
+    if backend == "memory":
+        return RateLimiter(InMemoryRateLimitBackend())
+    if backend == "redis":
+        # Imported lazily: the default in-memory backend never needs it
+        import redis.asyncio as redis
+
+        client = redis.from_url(settings.RATE_LIMIT_STORE_URL)
+        return RateLimiter(SharedStoreRateLimitBackend(client))
+    raise ValueError(f"Unknown rate limit backend: {settings.RATE_LIMIT_BACKEND}")
@@ -0,0 +1,104 @@
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional
+
+from src.utils.config import settings
+from src.utils.metrics import CACHE_REQUESTS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def make_etag(body: bytes) -> str:
+    """Strong entity tag for a response body."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an ``If-None-Match`` header against an entity tag.
+
+    Uses the weak comparison RFC 9110 prescribes for ``If-None-Match``.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class ResponseCache:
+    """LRU of serialized, immutable responses bounded by count and size."""
+
+    def __init__(
+        self,
+        max_entries: int = settings.SEARCH_CACHE_SIZE,
+        max_bytes: int = settings.SEARCH_CACHE_MAX_BYTES,
+        name: str = "search_results",
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._hit_counter = CACHE_REQUESTS.labels(name, "hit")
+        self._miss_counter = CACHE_REQUESTS.labels(name, "miss")
+
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            self._miss_counter.inc()
+            return None
+        self.hits += 1
+        self._hit_counter.inc()
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, body: bytes) -> CachedResponse:
+        """Store a serialized body and return it with its ETag."""
+        entry = CachedResponse(body, make_etag(body))
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return entry
+
+        self.invalidate(key)
+        self._entries[key] = entry
+        self._size += len(body)
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.body)
+        return entry
+
+    def invalidate(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry.body)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
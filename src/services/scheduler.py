@@ -0,0 +1,260 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import Executor
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, NamedTuple, Optional, Tuple
+
+from src.utils.config import settings
+from src.utils.metrics import REGISTRY
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+SCHEDULER_COMPUTE_SECONDS = REGISTRY.counter(
+    "scheduler_compute_seconds_total",
+    "Model compute time consumed, by role.",
+    ["role"],
+)
+SCHEDULER_WAIT_SECONDS = REGISTRY.histogram(
+    "scheduler_wait_seconds",
+    "Time model calls waited for an inference worker, by role.",
+    ["role"],
+)
+
+
+class Principal(NamedTuple):
+    tenant: str  # user email or service identity
+    role: str
+
+
+ANONYMOUS = Principal("anonymous", "user")
+
+# Who the current request's model calls are charged to
+current_principal: ContextVar[Optional[Principal]] = ContextVar(
+    "current_principal", default=None
+)
+
+
+class _WorkItem:
+    __slots__ = ("func", "args", "future", "enqueued_at")
+
+    def __init__(self, func: Callable, args: Tuple, future: asyncio.Future):
+        self.func = func
+        self.args = args
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class _Tenant:
+    __slots__ = (
+        "principal",
+        "weight",
+        "priority",
+        "queue",
+        "deficit",
+        "estimate",
+        "active",
+        "running",
+    )
+
+    def __init__(
+        self, principal: Principal, weight: float, priority: int, estimate: float
+    ):
+        self.principal = principal
+        self.weight = weight
+        self.priority = priority
+        self.queue: Deque[_WorkItem] = deque()
+        self.deficit = 0.0  # seconds of compute this tenant may still use
+        self.estimate = estimate  # smoothed compute time of its model calls
+        self.active = False
+        self.running = 0
+
+
+def _timed_call(func: Callable, args: Tuple) -> Tuple[bool, Any, float]:
+    start = time.perf_counter()
+    try:
+        result = func(*args)
+        return True, result, time.perf_counter() - start
+    except Exception as e:
+        return False, e, time.perf_counter() - start
+
+
+class FairScheduler:
+    """Weighted fair queuing of model calls in front of the inference executor.
+
+    Tenants (users or services) are served by deficit round-robin within
+    strict priority classes derived from their role. Deficits are measured
+    in seconds of compute: a call is charged its tenant's expected cost when
+    dispatched and corrected to the measured time when it finishes, so a
+    tenant sending heavy calls gets fewer of them. Calls from lower classes
+    that have waited longer than ``max_starvation`` are served regardless of
+    priority.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[Executor],
+        workers: int = settings.INFERENCE_WORKERS,
+        quantum: float = settings.SCHEDULER_QUANTUM,
+        role_weights: Optional[Dict[str, float]] = None,
+        role_priorities: Optional[Dict[str, int]] = None,
+        max_starvation: float = settings.SCHEDULER_MAX_STARVATION,
+        initial_estimate: float = 0.1,
+        smoothing: float = 0.2,
+    ):
+        self.executor = executor
+        self.workers = max(1, workers)
+        self.quantum = max(quantum, 1e-3)
+        self.role_weights = role_weights or settings.SCHEDULER_ROLE_WEIGHTS
+        self.role_priorities = role_priorities or settings.SCHEDULER_ROLE_PRIORITIES
+        self.max_starvation = max_starvation
+        self.initial_estimate = initial_estimate
+        self.smoothing = smoothing
+
+        self._tenants: Dict[Principal, _Tenant] = {}
+        self._rings: Dict[int, Deque[_Tenant]] = {}
+        self._running = 0
+
+    @property
+    def running(self) -> int:
+        """Model calls currently executing."""
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        """Model calls waiting for a worker."""
+        return sum(len(t.queue) for ring in self._rings.values() for t in ring)
+
+    async def run(self, func: Callable, *args) -> Any:
+        """Run ``func(*args)`` on the executor when the scheduler allows it.
+
+        The call is charged to the principal in ``current_principal``.
+        """
+        principal = current_principal.get() or ANONYMOUS
+        tenant = self._tenant(principal)
+        item = _WorkItem(func, args, asyncio.get_running_loop().create_future())
+        tenant.queue.append(item)
+        if not tenant.active:
+            tenant.active = True
+            self._rings.setdefault(tenant.priority, deque()).append(tenant)
+
+        self._dispatch()
+        # A cancelled caller leaves its future done; the dispatcher skips it
+        return await item.future
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._running,
+            "queued": self.queued,
+            "workers": self.workers,
+            "tenants": len(self._tenants),
+        }
+
+    def _tenant(self, principal: Principal) -> _Tenant:
+        tenant = self._tenants.get(principal)
+        if tenant is None:
+            tenant = _Tenant(
+                principal,
+                weight=float(self.role_weights.get(principal.role, 1.0)),
+                priority=int(self.role_priorities.get(principal.role, 0)),
+                estimate=self.initial_estimate,
+            )
+            self._tenants[principal] = tenant
+        return tenant
+
+    def _dispatch(self) -> None:
+        while self._running < self.workers:
+            picked = self._next()
+            if picked is None:
+                return
+            tenant, item = picked
+            self._running += 1
+            tenant.running += 1
+            tenant.deficit -= tenant.estimate
+            asyncio.ensure_future(self._execute(tenant, item))
+
+    def _next(self) -> Optional[Tuple[_Tenant, _WorkItem]]:
+        starved = self._starved()
+        if starved is not None:
+            return starved, starved.queue.popleft()
+
+        for priority in sorted(self._rings):
+            ring = self._rings[priority]
+            while ring:
+                tenant = ring[0]
+                self._drop_cancelled(tenant)
+                if not tenant.queue:
+                    ring.popleft()
+                    tenant.active = False
+                    self._maybe_forget(tenant)
+                    continue
+                if tenant.deficit > 0:
+                    return tenant, tenant.queue.popleft()
+                # Out of credit: top up and let the next tenant go
+                tenant.deficit += self.quantum * tenant.weight
+                ring.rotate(-1)
+            del self._rings[priority]
+        return None
+
+    def _starved(self) -> Optional[_Tenant]:
+        """A lower-priority tenant whose oldest call has waited too long."""
+        if len(self._rings) < 2:
+            return None
+        deadline = time.monotonic() - self.max_starvation
+        oldest = None
+        for priority in sorted(self._rings)[1:]:
+            for tenant in self._rings[priority]:
+                self._drop_cancelled(tenant)
+                if tenant.queue and tenant.queue[0].enqueued_at < deadline:
+                    if (
+                        oldest is None
+                        or tenant.queue[0].enqueued_at < oldest.queue[0].enqueued_at
+                    ):
+                        oldest = tenant
+        return oldest
+
+    @staticmethod
+    def _drop_cancelled(tenant: _Tenant) -> None:
+        while tenant.queue and tenant.queue[0].future.done():
+            tenant.queue.popleft()
+
+    def _maybe_forget(self, tenant: _Tenant) -> None:
+        if tenant.active or tenant.running:
+            return
+        # As in standard DRR, a tenant with nothing queued or running keeps
+        # neither credit nor debt, so it can be dropped and rebuilt on demand
+        tenant.deficit = 0.0
+        self._tenants.pop(tenant.principal, None)
+
+    async def _execute(self, tenant: _Tenant, item: _WorkItem) -> None:
+        role = tenant.principal.role
+        try:
+            SCHEDULER_WAIT_SECONDS.labels(role).observe(
+                time.monotonic() - item.enqueued_at
+            )
+            loop = asyncio.get_running_loop()
+            ok, value, elapsed = await loop.run_in_executor(
+                self.executor, _timed_call, item.func, item.args
+            )
+
+            # Replace the estimate charged at dispatch with the measured cost
+            tenant.deficit += tenant.estimate - elapsed
+            tenant.estimate += self.smoothing * (elapsed - tenant.estimate)
+            SCHEDULER_COMPUTE_SECONDS.labels(role).inc(elapsed)
+
+            if not item.future.done():
+                if ok:
+                    item.future.set_result(value)
+                else:
+                    item.future.set_exception(value)
+        except Exception as e:
+            logger.error(f"Scheduled model call failed: {str(e)}")
+            if not item.future.done():
+                item.future.set_exception(e)
+        finally:
+            self._running -= 1
+            tenant.running -= 1
+            self._maybe_forget(tenant)
+            self._dispatch()
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from itertools import islice
+from typing import List, Optional
+
+from src.database.base import BaseRepository
+from src.database.models import SearchResponse
+from src.utils.config import settings
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class SearchResultWriter:
+    """Write-behind buffer that persists search results in background batches.
+
+    Results stay readable through ``get`` until they have been written, so
+    callers can serve them before the database round trip completes.
+    """
+
+    def __init__(
+        self,
+        repository: BaseRepository,
+        batch_size: int = settings.SEARCH_WRITE_BATCH_SIZE,
+        max_pending: int = settings.SEARCH_WRITE_MAX_PENDING,
+        flush_interval: float = settings.SEARCH_WRITE_FLUSH_INTERVAL,
+        max_retries: int = settings.SEARCH_WRITE_MAX_RETRIES,
+        retry_backoff: float = settings.SEARCH_WRITE_RETRY_BACKOFF,
+        max_backoff: float = settings.SEARCH_WRITE_MAX_BACKOFF,
+    ):
+        self.repository = repository
+        self.batch_size = max(1, batch_size)
+        self.max_pending = max(self.batch_size, max_pending)
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+
+        self._pending: "OrderedDict[str, SearchResponse]" = OrderedDict()
+        self._space_available = asyncio.Condition()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def start(self) -> None:
+        """Start the background flush task."""
+        if self.running:
+            return
+        self._closing = False
+        self._task = asyncio.create_task(self._run(), name="search-result-writer")
+        logger.info("Search result writer started")
+
+    async def stop(self) -> None:
+        """Flush everything still pending and stop the background task."""
+        if not self.running:
+            await self.flush()
+            return
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+        self._task = None
+        logger.info("Search result writer stopped")
+
+    async def enqueue(self, search_result: SearchResponse) -> None:
+        """Queue a search result for persistence.
+
+        Waits for buffer space when ``max_pending`` results are already
+        queued. Without a running writer the result is written directly.
+        """
+        if not self.running:
+            await self.repository.save_search_result(search_result)
+            return
+
+        async with self._space_available:
+            await self._space_available.wait_for(
+                lambda: len(self._pending) < self.max_pending
+            )
+            self._pending[search_result.query_id] = search_result
+
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def get(self, query_id: str) -> Optional[SearchResponse]:
+        """Return a search result that has not been persisted yet."""
+        return self._pending.get(query_id)
+
+    async def flush(self) -> None:
+        """Write all pending results now."""
+        async with self._flush_lock:
+            while self._pending:
+                batch = list(islice(self._pending.values(), self.batch_size))
+                await self._write_batch(batch)
+
+                for search_result in batch:
+                    if self._pending.get(search_result.query_id) is search_result:
+                        del self._pending[search_result.query_id]
+                async with self._space_available:
+                    self._space_available.notify_all()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Unexpected error flushing search results: {str(e)}")
+
+            if self._closing and not self._pending:
+                return
+
+    async def _write_batch(self, batch: List[SearchResponse]) -> bool:
+        """Write one batch, retrying with exponential backoff."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.repository.save_search_results(batch)
+                return True
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error(
+                        f"Dropping {len(batch)} search results after "
+                        f"{attempt + 1} attempts: {str(e)}"
+                    )
+                    return False
+                delay = min(self.retry_backoff * (2**attempt), self.max_backoff)
+                logger.warning(
+                    f"Error saving search results (attempt {attempt + 1}), "
+                    f"retrying in {delay:.2f}s: {str(e)}"
+                )
+                await asyncio.sleep(delay)
+        return False
@@ -0,0 +1,139 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from src.database.models import User
+from src.utils.config import settings
+from src.utils.metrics import CACHE_REQUESTS
+
+
+class CachedToken(NamedTuple):
+    claims: Dict[str, Any]
+    expires_at: float
+    user: Optional[User] = None
+
+
+def token_digest(token: str) -> str:
+    """Cache key for a bearer token, so raw tokens are not kept in memory."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class TokenCache:
+    """Verified JWT claims, and the user they resolve to, until the token expires.
+
+    Also tracks revocations. Revoked tokens, and tokens issued to a revoked
+    user before the revocation, are evicted and refused by ``is_revoked``
+    even though their signature is still valid.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.TOKEN_CACHE_SIZE,
+        max_token_lifetime: float = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_entries = max_entries
+        self.max_token_lifetime = max_token_lifetime
+        self.clock = clock
+        self._hit_counter = CACHE_REQUESTS.labels("tokens", "hit")
+        self._miss_counter = CACHE_REQUESTS.labels("tokens", "miss")
+
+        self._entries: "OrderedDict[str, CachedToken]" = OrderedDict()
+        self._revoked_tokens: Dict[str, float] = {}  # digest -> token expiry
+        self._revoked_users: Dict[str, float] = {}  # email -> revocation time
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> Optional[CachedToken]:
+        """Cached entry for a token, or None if unknown or expired."""
+        digest = token_digest(token)
+        entry = self._entries.get(digest)
+        if entry is None:
+            self._miss_counter.inc()
+            return None
+        if entry.expires_at <= self.clock():
+            del self._entries[digest]
+            self._miss_counter.inc()
+            return None
+        self._hit_counter.inc()
+        self._entries.move_to_end(digest)
+        return entry
+
+    def put(
+        self, token: str, claims: Dict[str, Any], user: Optional[User] = None
+    ) -> None:
+        """Cache verified claims until the token's ``exp``."""
+        expires_at = float(claims.get("exp") or 0)
+        if self.max_entries <= 0 or expires_at <= self.clock():
+            return
+        digest = token_digest(token)
+        self._entries[digest] = CachedToken(claims, expires_at, user)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def attach_user(self, token: str, user: User) -> None:
+        """Remember the user a cached token resolved to."""
+        digest = token_digest(token)
+        entry = self._entries.get(digest)
+        if entry is not None:
+            self._entries[digest] = entry._replace(user=user)
+
+    def is_revoked(self, token: str, claims: Dict[str, Any]) -> bool:
+        """True if the token, or every token its user held, was revoked."""
+        if token_digest(token) in self._revoked_tokens:
+            return True
+        subject = claims.get("sub")
+        revoked_at = self._revoked_users.get(subject) if subject else None
+        return revoked_at is not None and float(claims.get("iat") or 0) < revoked_at
+
+    def revoke_token(self, token: str, expires_at: float) -> None:
+        """Refuse a single token until it expires."""
+        self._prune_revocations()
+        digest = token_digest(token)
+        self._revoked_tokens[digest] = expires_at
+        self._entries.pop(digest, None)
+
+    def revoke_user(self, email: str) -> int:
+        """Refuse every token issued to ``email`` so far.
+
+        Returns:
+            int: Number of cached tokens evicted
+        """
+        self._prune_revocations()
+        self._revoked_users[email] = self.clock()
+        stale = [
+            digest
+            for digest, entry in self._entries.items()
+            if entry.claims.get("sub") == email
+        ]
+        for digest in stale:
+            del self._entries[digest]
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "revoked_tokens": len(self._revoked_tokens),
+            "revoked_users": len(self._revoked_users),
+        }
+
+    def _prune_revocations(self) -> None:
+        # Revocations only matter while the affected tokens can still be valid
+        now = self.clock()
+        self._revoked_tokens = {
+            digest: expires_at
+            for digest, expires_at in self._revoked_tokens.items()
+            if expires_at > now
+        }
+        cutoff = now - self.max_token_lifetime
+        self._revoked_users = {
+            email: revoked_at
+            for email, revoked_at in self._revoked_users.items()
+            if revoked_at > cutoff
+        }
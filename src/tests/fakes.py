@@ -0,0 +1,221 @@
+"""
+In-memory stand-ins for the Firebase Realtime Database and Storage SDKs,
+for a Redis-style shared key-value store and for the clock, plus a
+throwaway local repository.
+"""
+
+import copy
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from src.database.local_repository import LocalRepository
+
+
+def _prune(value: Any) -> Any:
+    """Drop None values and empty containers like the Realtime Database does."""
+    if isinstance(value, dict):
+        pruned = {k: _prune(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if v is not None} or None
+    if isinstance(value, (list, tuple)):
+        items = [_prune(v) for v in value]
+        return items if any(v is not None for v in items) else None
+    return value
+
+
+class FakeReference:
+    def __init__(self, database: "FakeDatabase", path: str):
+        self._database = database
+        self.path = path.strip("/")
+
+    @property
+    def _keys(self):
+        return [key for key in self.path.split("/") if key]
+
+    def child(self, path: str) -> "FakeReference":
+        return FakeReference(self._database, f"{self.path}/{path}")
+
+    def get(self, shallow: bool = False) -> Any:
+        with self._database.lock:
+            node = self._database.root
+            for key in self._keys:
+                if not isinstance(node, dict) or key not in node:
+                    return None
+                node = node[key]
+            if shallow and isinstance(node, dict):
+                return {key: True for key in node}
+            return copy.deepcopy(node)
+
+    def set(self, value: Any) -> None:
+        with self._database.lock:
+            self._database.write(self._keys, _prune(copy.deepcopy(value)))
+
+    def update(self, value: Dict[str, Any]) -> None:
+        with self._database.lock:
+            for path, child_value in value.items():
+                keys = self._keys + [key for key in path.split("/") if key]
+                self._database.write(keys, _prune(copy.deepcopy(child_value)))
+
+    def delete(self) -> None:
+        with self._database.lock:
+            self._database.write(self._keys, None)
+
+    def transaction(self, transaction_update):
+        with self._database.lock:
+            node = self.get()
+            new_value = transaction_update(node)
+            self._database.write(self._keys, _prune(copy.deepcopy(new_value)))
+            return new_value
+
+
+class FakeDatabase:
+    """Stand-in for ``firebase_admin.db``."""
+
+    def __init__(self):
+        self.root: Dict[str, Any] = {}
+        self.lock = threading.RLock()
+
+    def reference(self, path: str = "/") -> FakeReference:
+        return FakeReference(self, path)
+
+    def write(self, keys, value) -> None:
+        if not keys:
+            self.root = value if isinstance(value, dict) else {}
+            return
+        node = self.root
+        for key in keys[:-1]:
+            if not isinstance(node.get(key), dict):
+                node[key] = {}
+            node = node[key]
+        if value is None:
+            node.pop(keys[-1], None)
+        else:
+            node[keys[-1]] = value
+
+
+class FakeBlob:
+    def __init__(self, bucket: "FakeBucket", name: str):
+        self.bucket = bucket
+        self.name = name
+        self.content_type: Optional[str] = None
+        self.metadata: Optional[Dict[str, str]] = None
+
+    @property
+    def public_url(self) -> str:
+        return f"https://storage.googleapis.com/{self.bucket.name}/{self.name}"
+
+    @property
+    def size(self) -> Optional[int]:
+        data = self.bucket.objects.get(self.name)
+        return None if data is None else len(data)
+
+    def upload_from_string(self, data, content_type: Optional[str] = None) -> None:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self.bucket.objects[self.name] = bytes(data)
+        self.bucket.content_types[self.name] = (
+            content_type or "application/octet-stream"
+        )
+        self.bucket.uploads += 1
+
+    def exists(self) -> bool:
+        return self.name in self.bucket.objects
+
+    def download_as_bytes(self) -> bytes:
+        return self.bucket.objects[self.name]
+
+    def delete(self) -> None:
+        self.bucket.objects.pop(self.name)
+        self.bucket.content_types.pop(self.name, None)
+
+    def reload(self) -> None:
+        self.content_type = self.bucket.content_types.get(self.name)
+
+
+class FakeBucket:
+    def __init__(self, name: str = "test-bucket"):
+        self.name = name
+        self.objects: Dict[str, bytes] = {}
+        self.content_types: Dict[str, str] = {}
+        self.uploads = 0
+
+    def blob(self, name: str) -> FakeBlob:
+        return FakeBlob(self, name)
+
+    def get_blob(self, name: str) -> Optional[FakeBlob]:
+        if name not in self.objects:
+            return None
+        blob = FakeBlob(self, name)
+        blob.reload()
+        return blob
+
+    def list_blobs(self, prefix: str = "", max_results: Optional[int] = None):
+        names = sorted(name for name in self.objects if name.startswith(prefix))
+        if max_results is not None:
+            names = names[:max_results]
+        return [self.get_blob(name) for name in names]
+
+
+class FakeStorage:
+    """Stand-in for ``firebase_admin.storage``."""
+
+    def __init__(self):
+        self._bucket = FakeBucket()
+
+    def bucket(self, name: Optional[str] = None) -> FakeBucket:
+        return self._bucket
+
+
+class FakeKeyValueStore:
+    """Stand-in for an async Redis client (the subset the rate limiter uses)."""
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.values: Dict[str, int] = {}
+        self.expiry: Dict[str, float] = {}
+
+    def _purge(self, key: str) -> None:
+        if key in self.expiry and self.expiry[key] <= self.clock():
+            self.values.pop(key, None)
+            self.expiry.pop(key, None)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        self._purge(key)
+        value = self.values.get(key)
+        return None if value is None else str(value).encode()
+
+    async def incrby(self, key: str, amount: int) -> int:
+        self._purge(key)
+        self.values[key] = self.values.get(key, 0) + amount
+        return self.values[key]
+
+    async def decrby(self, key: str, amount: int) -> int:
+        return await self.incrby(key, -amount)
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        if key not in self.values:
+            return False
+        self.expiry[key] = self.clock() + seconds
+        return True
+
+
+class FakeClock:
+    """Clock that only moves when a test sets ``now``."""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@contextmanager
+def local_repository(tmp_path: Path) -> Iterator[LocalRepository]:
+    """A LocalRepository under ``tmp_path``, closed on exit."""
+    repo = LocalRepository(str(tmp_path / "storage"))
+    try:
+        yield repo
+    finally:
+        repo.close()
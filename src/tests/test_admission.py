@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from src.services.admission import AdmissionController, AdmissionRejected
+
+
+async def hold(controller, release: asyncio.Event, admitted: list, name: str):
+    async with controller.admit():
+        admitted.append(name)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_limits_in_flight_and_admits_waiters_in_order():
+    """Test requests beyond the limit wait and are admitted first come, first served."""
+    controller = AdmissionController(max_in_flight=2, max_queue=5, max_wait=5)
+    release = asyncio.Event()
+    admitted = []
+
+    tasks = [
+        asyncio.create_task(hold(controller, release, admitted, f"r{i}"))
+        for i in range(4)
+    ]
+    await asyncio.sleep(0.01)
+    assert admitted == ["r0", "r1"]
+    assert controller.in_flight == 2
+    assert controller.queued == 2
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert admitted == ["r0", "r1", "r2", "r3"]
+    assert controller.in_flight == 0
+    assert controller.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_fast_when_queue_is_full():
+    """Test a full wait queue sheds new requests with a retry hint."""
+    controller = AdmissionController(max_in_flight=1, max_queue=1, max_wait=5)
+    release = asyncio.Event()
+    admitted = []
+    tasks = [
+        asyncio.create_task(hold(controller, release, admitted, f"r{i}"))
+        for i in range(2)
+    ]
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        await controller.acquire()
+    assert exc_info.value.retry_after > 0
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_expected_wait_is_too_long():
+    """Test the service-time estimate sheds requests that would wait too long."""
+    controller = AdmissionController(
+        max_in_flight=1, max_queue=10, max_wait=0.5, initial_service_time=2.0
+    )
+    admitted_at = await controller.acquire()
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        await controller.acquire()
+    assert exc_info.value.retry_after == pytest.approx(2.0)
+    assert controller.queued == 0
+
+    controller.release(admitted_at)
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_waiter_times_out_and_frees_its_place():
+    """Test a waiter that exceeds max_wait is rejected and leaves the queue."""
+    controller = AdmissionController(
+        max_in_flight=1, max_queue=10, max_wait=0.05, initial_service_time=0.01
+    )
+    admitted_at = await controller.acquire()
+
+    with pytest.raises(AdmissionRejected):
+        await controller.acquire()
+    assert controller.queued == 0
+
+    controller.release(admitted_at)
+    assert controller.in_flight == 0
+    await controller.acquire()
+    assert controller.in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot():
+    """Test cancelling a queued request leaves the accounting intact."""
+    controller = AdmissionController(max_in_flight=1, max_queue=10, max_wait=5)
+    admitted_at = await controller.acquire()
+
+    waiter = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    controller.release(admitted_at)
+    assert controller.in_flight == 0
+    assert controller.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_service_time_tracks_recent_requests():
+    """Test the moving average follows observed service times."""
+    controller = AdmissionController(initial_service_time=1.0, smoothing=0.5)
+
+    for _ in range(10):
+        async with controller.admit():
+            pass
+
+    assert controller.service_time < 0.01
@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from pydantic import ValidationError
+
+from src.api.schemas import ApiKeyCreate
+from src.database.models import User
+from src.services.api_keys import ApiKeyService, api_key_digest
+from src.services.auth_service import AuthService
+from src.services.password_hasher import PasswordHasher
+from src.tests.fakes import FakeClock, local_repository
+
+
+@pytest.fixture
+def repository(tmp_path):
+    with local_repository(tmp_path) as repo:
+        yield repo
+
+
+@pytest_asyncio.fixture
+async def owner(repository):
+    user = User(
+        id="service-1", email="indexer@example.com", hashed_password="x", role="user"
+    )
+    await repository.create_user(user)
+    return user
+
+
+@pytest.mark.asyncio
+async def test_only_the_digest_is_stored(repository, owner):
+    """Test issued keys authenticate and are persisted as digests only."""
+    service = ApiKeyService(repository)
+    api_key, record = await service.issue(
+        owner, name="indexer", requests_per_minute=600
+    )
+
+    assert record.id == api_key_digest(api_key)
+    assert record.role == "service"
+    assert api_key.encode() not in (repository.root / "records.db").read_bytes()
+    assert (await repository.get_user(owner.id)).api_key == record.id
+
+    authenticated = await service.authenticate(api_key)
+    assert authenticated.email == owner.email
+    assert authenticated.requests_per_minute == 600
+    assert await service.authenticate("gr_unknown") is None
+    assert await service.authenticate("not-a-key") is None
+
+
+@pytest.mark.asyncio
+async def test_lookups_are_cached(repository, owner, monkeypatch):
+    """Test repeated checks of one key read the repository once per TTL."""
+    clock = FakeClock()
+    service = ApiKeyService(repository, cache_ttl=60, clock=clock)
+    api_key, _ = await service.issue(owner)
+    reads = []
+    get_api_key = repository.get_api_key
+
+    async def counting_get(digest):
+        reads.append(digest)
+        return await get_api_key(digest)
+
+    monkeypatch.setattr(repository, "get_api_key", counting_get)
+    for _ in range(5):
+        assert await service.authenticate(api_key) is not None
+        assert await service.authenticate("gr_unknown") is None
+    assert len(reads) == 2
+
+    clock.now = 61
+    await service.authenticate(api_key)
+    assert len(reads) == 3
+
+
+@pytest.mark.asyncio
+async def test_revoked_and_expired_keys_are_refused(repository, owner):
+    """Test revocation applies immediately and expired keys stop working."""
+    service = ApiKeyService(repository)
+    api_key, record = await service.issue(owner)
+    assert await service.authenticate(api_key) is not None
+
+    assert await service.revoke(record.id)
+    assert await service.authenticate(api_key) is None
+    assert not await service.revoke("missing")
+
+    expired_key, _ = await service.issue(
+        owner, expires_at=datetime.utcnow() - timedelta(seconds=1)
+    )
+    assert await service.authenticate(expired_key) is None
+
+
+@pytest.mark.asyncio
+async def test_rotation_keeps_the_old_key_for_the_grace_period(repository, owner):
+    """Test rotation issues a like-for-like key and retires the old one."""
+    service = ApiKeyService(repository, rotation_grace=3600)
+    old_key, old_record = await service.issue(
+        owner, name="indexer", requests_per_minute=120
+    )
+
+    new_key, new_record = await service.rotate(old_record.id)
+    assert new_key != old_key
+    assert new_record.name == "indexer"
+    assert new_record.requests_per_minute == 120
+    assert await service.authenticate(new_key) is not None
+
+    # Still valid during the grace period, but now scheduled to expire
+    old = await service.authenticate(old_key)
+    assert old is not None
+    assert old.expires_at <= datetime.utcnow() + timedelta(seconds=3600)
+
+    immediate = ApiKeyService(repository, rotation_grace=0)
+    _, newest = await immediate.rotate(new_record.id)
+    assert await immediate.authenticate(new_key) is None
+    assert await immediate.rotate("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_deactivating_a_user_revokes_their_keys(repository, owner):
+    """Test a deactivated user's keys stop working, cached or not."""
+    service = ApiKeyService(repository, cache_ttl=60)
+    auth = AuthService(repository, hasher=PasswordHasher(rounds=4), api_keys=service)
+    first_key, _ = await service.issue(owner)
+    second_key, _ = await service.issue(owner, name="backup")
+    assert await service.authenticate(first_key) is not None
+    assert await service.authenticate(second_key) is not None
+
+    assert await auth.deactivate_user(owner.email)
+
+    assert await service.authenticate(first_key) is None
+    assert await service.authenticate(second_key) is None
+    records = await repository.list_user_api_keys(owner.id)
+    assert len(records) == 2
+    assert all(record.revoked for record in records)
+
+
+@pytest.mark.asyncio
+async def test_keys_of_inactive_owners_are_refused(repository, owner):
+    """Test the owner's status is checked even if the key was never revoked."""
+    clock = FakeClock()
+    service = ApiKeyService(repository, cache_ttl=60, clock=clock)
+    api_key, _ = await service.issue(owner)
+    assert await service.authenticate(api_key) is not None
+
+    # Deactivated by another process: the key record itself is untouched
+    owner = await repository.get_user(owner.id)
+    owner.is_active = False
+    await repository.update_user(owner.id, owner)
+
+    clock.now = 61
+    assert await service.authenticate(api_key) is None
+
+
+def test_api_key_role_is_restricted():
+    """Test keys can only be issued for known roles."""
+    assert ApiKeyCreate(email="a@example.com", role="admin").role == "admin"
+    with pytest.raises(ValidationError):
+        ApiKeyCreate(email="a@example.com", role="superuser")
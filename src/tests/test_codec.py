@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta, timezone
+
+from src.api.schemas import (
+    BoundingBox,
+    DetectionResponse,
+    ProductResponse,
+    SearchResponse,
+)
+from src.database.codec import datetime_to_ms, get_codec, ms_to_datetime
+from src.database.models import Attribute, Product, User
+
+
+def make_product() -> Product:
+    return Product(
+        id="product-1",
+        brand="Test Brand",
+        name="Test Product",
+        category_id="tops",
+        price=99.99,
+        source_url="https://example.com",
+        image_url="https://example.com/image.jpg",
+        attributes=[Attribute(id="a1", name="color", type="color", value="red")],
+        created_at=datetime(2024, 5, 1, 12, 30, 15, 123000),
+        updated_at=datetime(2024, 5, 2, 8, 0),
+    )
+
+
+def test_timestamps_are_epoch_milliseconds():
+    """Test naive datetimes are treated as UTC and truncated to milliseconds."""
+    value = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    ms = datetime_to_ms(value)
+
+    assert ms == 1714566615123
+    assert ms_to_datetime(ms) == value.replace(microsecond=123000)
+    assert (
+        datetime_to_ms(value.replace(tzinfo=timezone(timedelta(hours=2))))
+        == ms - 7200000
+    )
+    assert ms_to_datetime(value.isoformat()) == value
+
+
+def test_product_round_trip_trusted_and_validated():
+    """Test both decode paths rebuild nested models."""
+    codec = get_codec(Product)
+    product = make_product()
+    data = codec.encode(product)
+
+    trusted = codec.decode(data)
+    validated = codec.decode(data, trusted=False)
+
+    assert trusted == product
+    assert validated == product
+    assert isinstance(trusted.attributes[0], Attribute)
+    assert isinstance(trusted.created_at, datetime)
+
+
+def test_to_dict_accepts_legacy_iso_records():
+    """Test records written with ISO strings still decode."""
+    user = User(
+        id="user-1",
+        email="user@example.com",
+        hashed_password="hashed",
+        created_at=datetime(2024, 5, 1, 12, 30, 15, 123456),
+        updated_at=datetime(2024, 5, 1, 12, 30, 15, 123456),
+    )
+    legacy = user.model_dump()
+    legacy["created_at"] = legacy["created_at"].isoformat()
+    legacy["updated_at"] = legacy["updated_at"].isoformat()
+
+    assert get_codec(User).from_dict(legacy) == user
+
+
+def test_from_dict_leaves_the_input_untouched():
+    """Test decoding does not rewrite the caller's dict or its nested records."""
+    codec = get_codec(Product)
+    data = codec.to_dict(make_product())
+    snapshot = {**data, "attributes": [dict(item) for item in data["attributes"]]}
+
+    product = codec.from_dict(data)
+
+    assert data == snapshot
+    assert isinstance(data["created_at"], int)
+    assert isinstance(data["attributes"][0], dict)
+    assert product == make_product()
+
+
+def test_search_response_round_trip():
+    """Test nested optional models and model lists."""
+    response = SearchResponse(
+        query_id="query-1",
+        results=[
+            DetectionResponse(
+                product=ProductResponse(
+                    id="product-1",
+                    brand="b",
+                    name="n",
+                    price=1.0,
+                    currency="USD",
+                    source_url="s",
+                    image_url="i",
+                ),
+                similarity_score=0.9,
+                bounding_box=BoundingBox(x1=0, y1=0, x2=1, y2=1),
+                confidence=0.8,
+            ),
+            DetectionResponse(
+                similarity_score=0.0,
+                bounding_box=BoundingBox(x1=1, y1=1, x2=2, y2=2),
+                confidence=0.6,
+            ),
+        ],
+        processing_time=0.5,
+        created_at=datetime(2024, 5, 1, 12, 0),
+    )
+    codec = get_codec(SearchResponse)
+
+    decoded = codec.decode(codec.encode(response))
+    assert decoded == response
+    assert isinstance(decoded.results[0].product, ProductResponse)
+    assert decoded.results[1].product is None
+
+
+def test_encode_many_round_trip():
+    """Test streaming export buffers."""
+    codec = get_codec(Product)
+    products = [make_product() for _ in range(3)]
+
+    assert codec.decode_many(codec.encode_many(products)) == products
@@ -72,10 +72,10 @@ async def test_storage_operations():
     try:
         # Test uploading a small text file
         test_content = b"Hello, Firebase Storage!"
-        file_path = "test/test.txt"
 
-        url = await repo.upload_image(file_path, test_content)
-        print(f"Uploaded file to: {url}")
+        upload = await repo.upload_image(test_content, content_type="text/plain")
+        print(f"Uploaded file to: {upload.url}")
+        await repo.release_image(upload.id)
         return True
     except Exception as e:
         print(f"Error during storage operations: {e}")
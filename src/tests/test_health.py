@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from src.services.health import HealthMonitor
+
+
+def make_check(result=None, delay=0.0, error=None):
+    calls = []
+
+    async def check():
+        calls.append(1)
+        if delay:
+            await asyncio.sleep(delay)
+        if error:
+            raise error
+        return result or {"status": "healthy"}
+
+    check.calls = calls
+    return check
+
+
+@pytest.mark.asyncio
+async def test_not_ready_before_first_refresh():
+    """Test readiness waits for the first probe."""
+    monitor = HealthMonitor({"db": make_check()}, interval=10, timeout=1)
+
+    assert not monitor.ready
+    assert monitor.snapshot()["status"] == "starting"
+
+    await monitor.refresh()
+    assert monitor.ready
+    assert monitor.snapshot()["status"] == "healthy"
+
+
+@pytest.mark.asyncio
+async def test_snapshot_reads_cached_state():
+    """Test reading health does not run the checks again."""
+    check = make_check({"status": "connected"})
+    monitor = HealthMonitor({"db": check}, interval=10, timeout=1)
+    await monitor.refresh()
+
+    for _ in range(5):
+        monitor.snapshot()
+        assert monitor.ready
+    assert len(check.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_failures_and_timeouts_mark_components_unhealthy():
+    """Test errors and slow checks are reported without raising."""
+    monitor = HealthMonitor(
+        {
+            "db": make_check(error=ConnectionError("refused")),
+            "model": make_check(delay=1.0),
+            "storage": make_check(),
+        },
+        interval=10,
+        timeout=0.05,
+    )
+    await monitor.refresh()
+
+    components = monitor.snapshot()["components"]
+    assert components["db"] == {"status": "unhealthy", "error": "refused"}
+    assert components["model"]["status"] == "unhealthy"
+    assert components["storage"]["status"] == "healthy"
+    assert not monitor.ready
+
+
+@pytest.mark.asyncio
+async def test_only_critical_components_gate_readiness():
+    """Test non-critical components can fail while the service stays ready."""
+    monitor = HealthMonitor(
+        {"db": make_check(), "storage": make_check({"status": "unhealthy"})},
+        critical=["db"],
+        interval=10,
+        timeout=1,
+    )
+    await monitor.refresh()
+    assert monitor.ready
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_and_staleness():
+    """Test the prober refreshes on its interval and stale state is not ready."""
+    check = make_check()
+    monitor = HealthMonitor({"db": check}, interval=0.01, timeout=0.01)
+    await monitor.start()
+    await asyncio.sleep(0.1)
+    await monitor.stop()
+
+    assert len(check.calls) > 1
+    assert monitor.ready
+
+    monitor._last_refresh -= 1
+    assert monitor.stale
+    assert not monitor.ready
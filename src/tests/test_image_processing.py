@@ -136,6 +136,55 @@ async def test_image_processor(image_processor, sample_image):
     assert hasattr(result, "processing_time")
 
 
+@pytest.mark.asyncio
+async def test_fashion_detector_batch(fashion_detector, sample_image):
+    """Test batched detection and embeddings match the per-image calls."""
+    img_array = np.array(sample_image)
+
+    detections = fashion_detector.forward_batch([img_array, img_array])
+    assert len(detections) == 2
+    assert detections[0] == fashion_detector.forward(img_array)
+
+    embeddings = fashion_detector.get_embeddings_batch([img_array, img_array])
+    assert len(embeddings) == 2
+    assert np.allclose(
+        embeddings[0], fashion_detector.get_embeddings(img_array), atol=1e-4
+    )
+
+
+@pytest.mark.asyncio
+async def test_image_processor_batch(image_processor, sample_image):
+    """Test a batch returns one result per image, in order."""
+    img_byte_arr = io.BytesIO()
+    sample_image.save(img_byte_arr, format="PNG")
+    image_bytes = img_byte_arr.getvalue()
+
+    results = await image_processor.process_images([image_bytes] * 3)
+
+    assert len(results) == 3
+    assert len({result.query_id for result in results}) == 3
+    for result in results:
+        assert isinstance(result.results, list)
+
+
+@pytest.mark.asyncio
+async def test_image_processor_stream(image_processor, sample_image):
+    """Test streamed events arrive as detections, matches, then a summary."""
+    img_byte_arr = io.BytesIO()
+    sample_image.save(img_byte_arr, format="PNG")
+    image_bytes = img_byte_arr.getvalue()
+
+    events = [
+        event async for event in image_processor.process_image_stream(image_bytes)
+    ]
+
+    assert events[0]["event"] == "detections"
+    assert events[-1]["event"] == "summary"
+    matches = [event for event in events if event["event"] == "match"]
+    assert len(matches) == len(events[0]["detections"]) == events[-1]["detections"]
+    assert events[0]["query_id"] == events[-1]["query_id"]
+
+
 @pytest.mark.asyncio
 async def test_end_to_end(image_processor, sample_image):
     """Test the entire image processing pipeline."""
@@ -0,0 +1,205 @@
+import asyncio
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from typing import List
+
+import numpy as np
+import pytest
+import pytest_asyncio
+
+from src.services.inference_client import RemoteFashionDetector
+from src.services.inference_ipc import InferenceError
+from src.services.inference_worker import InferenceWorker
+
+
+class FakeDetector:
+    """Records batch sizes; embeds an image as its mean pixel value."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.batch_sizes: List[int] = []
+        self._lock = threading.Lock()
+
+    def forward_batch(self, images):
+        self._record(images)
+        return [
+            [{"box": [0, 0, image.shape[1], image.shape[0]], "confidence": 0.9}]
+            for image in images
+        ]
+
+    def get_embeddings_batch(self, images):
+        self._record(images)
+        if any(image.shape[0] == 1 for image in images):
+            raise RuntimeError("image too small")
+        return [[float(image.mean()), 1.0] for image in images]
+
+    def check_status(self):
+        return {"status": "healthy", "batches": len(self.batch_sizes)}
+
+    def _record(self, images):
+        time.sleep(self.delay)
+        with self._lock:
+            self.batch_sizes.append(len(images))
+
+
+def pixels(value: int, height: int = 4, width: int = 6) -> np.ndarray:
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+@pytest.fixture
+def socket_dir():
+    # Unix socket paths are limited to ~100 bytes, so keep them short
+    path = tempfile.mkdtemp(prefix="gr")
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest_asyncio.fixture
+async def worker(socket_dir):
+    server = InferenceWorker(
+        FakeDetector(delay=0.02),
+        os.path.join(socket_dir, "a.sock"),
+        max_batch_size=64,
+        max_batch_wait=0.01,
+    )
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_round_trip(worker):
+    client = RemoteFashionDetector([worker.socket_path], timeout=5)
+    try:
+        detections = await asyncio.to_thread(client.forward, pixels(10))
+        embedding = await asyncio.to_thread(client.get_embeddings, pixels(10))
+        status = await asyncio.to_thread(client.check_status)
+    finally:
+        client.close()
+
+    assert detections == [{"box": [0, 0, 6, 4], "confidence": 0.9}]
+    assert embedding == pytest.approx([10.0, 1.0])
+    assert status["status"] == "healthy"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_are_batched(worker):
+    client = RemoteFashionDetector([worker.socket_path], timeout=5)
+    try:
+        results = await asyncio.gather(
+            *(asyncio.to_thread(client.get_embeddings, pixels(i)) for i in range(12))
+        )
+    finally:
+        client.close()
+
+    assert [r[0] for r in results] == pytest.approx([float(i) for i in range(12)])
+    assert sum(worker.detector.batch_sizes) == 12
+    assert len(worker.detector.batch_sizes) < 12
+
+
+@pytest.mark.asyncio
+async def test_model_errors_reach_the_caller(worker):
+    client = RemoteFashionDetector([worker.socket_path], timeout=5)
+    try:
+        with pytest.raises(InferenceError, match="too small"):
+            await asyncio.to_thread(client.get_embeddings, pixels(1, height=1))
+        # The connection stays usable after an error response
+        assert await asyncio.to_thread(
+            client.get_embeddings, pixels(3)
+        ) == pytest.approx([3.0, 1.0])
+    finally:
+        client.close()
+
+
+@pytest.mark.asyncio
+async def test_bad_image_only_fails_its_own_request(socket_dir):
+    """Test a request batched with a bad image still gets its result."""
+    # A long batch window so both clients' requests share one model pass
+    server = InferenceWorker(
+        FakeDetector(), os.path.join(socket_dir, "b.sock"), max_batch_wait=0.2
+    )
+    await server.start()
+    good = RemoteFashionDetector([server.socket_path], timeout=5)
+    bad = RemoteFashionDetector([server.socket_path], timeout=5)
+    try:
+        results = await asyncio.gather(
+            asyncio.to_thread(good.get_embeddings, pixels(7)),
+            asyncio.to_thread(bad.get_embeddings, pixels(1, height=1)),
+            return_exceptions=True,
+        )
+    finally:
+        good.close()
+        bad.close()
+        await server.stop()
+
+    assert results[0] == pytest.approx([7.0, 1.0])
+    assert isinstance(results[1], InferenceError)
+    assert "too small" in str(results[1])
+    # One failed batch of two, then each request retried alone
+    assert server.detector.batch_sizes == [2, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_fails_over_to_next_worker(worker, socket_dir):
+    missing = os.path.join(socket_dir, "missing.sock")
+    client = RemoteFashionDetector([missing, worker.socket_path], timeout=5)
+    try:
+        for _ in range(3):
+            assert await asyncio.to_thread(client.forward, pixels(5))
+    finally:
+        client.close()
+
+    down = RemoteFashionDetector([missing], timeout=5)
+    with pytest.raises(OSError):
+        await asyncio.to_thread(down.forward, pixels(5))
+    assert down.check_status()["status"] == "unhealthy"
+
+
+@pytest.mark.asyncio
+async def test_timeouts_are_not_retried_elsewhere(socket_dir):
+    slow = InferenceWorker(
+        FakeDetector(delay=0.5),
+        os.path.join(socket_dir, "slow.sock"),
+        max_batch_wait=0.0,
+    )
+    fast = InferenceWorker(
+        FakeDetector(), os.path.join(socket_dir, "fast.sock"), max_batch_wait=0.0
+    )
+    await slow.start()
+    await fast.start()
+    client = RemoteFashionDetector([slow.socket_path, fast.socket_path], timeout=0.1)
+    try:
+        with pytest.raises(TimeoutError):
+            await asyncio.to_thread(client.forward, pixels(5))
+        assert fast.detector.batch_sizes == []
+        # Let the slow batch finish so the worker stops cleanly
+        await asyncio.sleep(0.5)
+    finally:
+        client.close()
+        await slow.stop()
+        await fast.stop()
+
+
+@pytest.mark.asyncio
+async def test_stale_pooled_connection_fails_over(socket_dir):
+    first = InferenceWorker(FakeDetector(), os.path.join(socket_dir, "a.sock"))
+    second = InferenceWorker(FakeDetector(), os.path.join(socket_dir, "b.sock"))
+    await first.start()
+    await second.start()
+    client = RemoteFashionDetector([first.socket_path, second.socket_path], timeout=5)
+    try:
+        # Pool a connection to each worker, then break the first one's as a
+        # worker restart would
+        for _ in range(2):
+            await asyncio.to_thread(client.forward, pixels(5))
+        client._endpoints[0]._idle.queue[0].shutdown(socket.SHUT_RDWR)
+        assert await asyncio.to_thread(client.forward, pixels(5))
+        assert second.detector.batch_sizes == [1, 1]
+    finally:
+        client.close()
+        await first.stop()
+        await second.stop()
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from src.services.job_queue import (
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_QUEUED,
+    InferenceJobQueue,
+    QueueFullError,
+)
+
+
+class FakeImageProcessor:
+    """Processor stand-in whose jobs block until released."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.processed = []
+
+    async def process_image(self, image_data, query_id=None):
+        await self.release.wait()
+        if image_data == b"bad":
+            raise ValueError("cannot decode image")
+        self.processed.append(query_id)
+
+
+@pytest.mark.asyncio
+async def test_submit_returns_immediately_and_completes():
+    """Test a job is queued, processed under its query ID and completed."""
+    processor = FakeImageProcessor()
+    queue = InferenceJobQueue(processor, max_size=10, workers=1)
+    await queue.start()
+
+    job = queue.submit(b"image")
+    assert job.status == JOB_QUEUED
+    assert job.queue_depth == 1
+
+    processor.release.set()
+    finished = await queue.wait(job.query_id, timeout=1)
+
+    assert finished.status == JOB_COMPLETED
+    assert finished.completed_at is not None
+    assert processor.processed == [job.query_id]
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_queue_is_bounded():
+    """Test submissions beyond max_size are rejected."""
+    queue = InferenceJobQueue(FakeImageProcessor(), max_size=2, workers=1)
+
+    queue.submit(b"one")
+    queue.submit(b"two")
+    with pytest.raises(QueueFullError):
+        queue.submit(b"three")
+    assert queue.depth == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_jobs_report_an_error():
+    """Test processing errors are recorded on the job."""
+    processor = FakeImageProcessor()
+    processor.release.set()
+    queue = InferenceJobQueue(processor, max_size=10, workers=2)
+    await queue.start()
+
+    job = queue.submit(b"bad")
+    finished = await queue.wait(job.query_id, timeout=1)
+
+    assert finished.status == JOB_FAILED
+    assert finished.error
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_wait_times_out_for_pending_jobs():
+    """Test long-polling returns the current status after the timeout."""
+    processor = FakeImageProcessor()
+    queue = InferenceJobQueue(processor, max_size=10, workers=1)
+    await queue.start()
+
+    job = queue.submit(b"image")
+    status = await queue.wait(job.query_id, timeout=0.01)
+
+    assert status.status != JOB_COMPLETED
+    assert await queue.wait("unknown", timeout=0) is None
+
+    processor.release.set()
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_queued_jobs():
+    """Test shutdown finishes queued work before stopping workers."""
+    processor = FakeImageProcessor()
+    processor.release.set()
+    queue = InferenceJobQueue(processor, max_size=10, workers=2)
+    await queue.start()
+
+    jobs = [queue.submit(b"image") for _ in range(5)]
+    await queue.stop()
+
+    assert sorted(processor.processed) == sorted(job.query_id for job in jobs)
+    assert not queue.running
+
+
+@pytest.mark.asyncio
+async def test_finished_jobs_are_evicted_past_retention():
+    """Test job status tracking stays bounded."""
+    processor = FakeImageProcessor()
+    processor.release.set()
+    queue = InferenceJobQueue(processor, max_size=10, workers=1, retention=2)
+    await queue.start()
+
+    first = queue.submit(b"image")
+    await queue.wait(first.query_id, timeout=1)
+    for _ in range(2):
+        job = queue.submit(b"image")
+        await queue.wait(job.query_id, timeout=1)
+
+    assert queue.get(first.query_id) is None
+    assert queue.get(job.query_id).status == JOB_COMPLETED
+    await queue.stop()
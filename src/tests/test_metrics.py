@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+
+from src.utils.metrics import MetricsRegistry, timed
+
+
+def test_counter_sums_per_thread_shards():
+    """Test increments from many threads are all counted."""
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests.", ["route"])
+
+    def work():
+        child = counter.labels("/identify")
+        for _ in range(1000):
+            child.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.labels("/identify").value == 8000
+    assert 'requests_total{route="/identify"} 8000' in registry.render()
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test the exposition has cumulative buckets, count and sum."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", buckets=[0.1, 1.0])
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1"} 3' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert "latency_seconds_count 4" in lines
+    assert "latency_seconds_sum 6.05" in lines
+
+
+def test_gauges_track_in_progress_and_functions():
+    """Test in-flight gauges return to zero and function gauges are read on render."""
+    registry = MetricsRegistry()
+    gauge = registry.gauge("in_flight", "In flight.")
+    depth = {"value": 3}
+    registry.gauge("queue_depth", "Depth.", function=lambda: depth["value"])
+
+    with gauge.track_inprogress():
+        assert "in_flight 1" in registry.render()
+    depth["value"] = 7
+
+    output = registry.render()
+    assert "in_flight 0" in output
+    assert "queue_depth 7" in output
+
+
+def test_labels_are_validated_and_escaped():
+    """Test label arity is checked and values are escaped."""
+    registry = MetricsRegistry()
+    counter = registry.counter("errors_total", "Errors.", ["reason"])
+
+    with pytest.raises(ValueError):
+        counter.labels("a", "b")
+
+    counter.labels('bad "quote"').inc()
+    assert 'errors_total{reason="bad \\"quote\\""} 1' in registry.render()
+
+
+def test_registering_same_name_returns_existing_metric():
+    """Test modules can declare the same metric without double registration."""
+    registry = MetricsRegistry()
+    first = registry.counter("hits_total", "Hits.")
+    assert registry.counter("hits_total", "Hits.") is first
+    with pytest.raises(ValueError):
+        registry.gauge("hits_total", "Hits.")
+
+
+@pytest.mark.asyncio
+async def test_timed_records_duration_and_errors():
+    """Test the decorator times coroutines under their name and counts failures."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("op_seconds", "Op latency.", ["operation"])
+    errors = registry.counter("op_errors_total", "Op errors.", ["operation"])
+
+    @timed(histogram, errors)
+    async def get_product(fail=False):
+        if fail:
+            raise RuntimeError("boom")
+        return "product"
+
+    assert await get_product() == "product"
+    with pytest.raises(RuntimeError):
+        await get_product(fail=True)
+
+    _, count, _ = histogram.labels("get_product").snapshot()
+    assert count == 2
+    assert errors.labels("get_product").value == 1
@@ -0,0 +1,71 @@
+import json
+import os
+
+import pytest
+
+from src.models.bundle import (
+    MANIFEST_NAME,
+    REQUIRED_FILES,
+    BundleError,
+    load_manifest,
+    write_manifest,
+)
+
+
+@pytest.fixture
+def bundle_dir(tmp_path):
+    for name in REQUIRED_FILES:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(name.encode() * 10)
+    return str(tmp_path)
+
+
+def test_manifest_round_trip(bundle_dir):
+    written = write_manifest(bundle_dir, "2024.06.1", metadata={"vit": "vit-base"})
+
+    manifest = load_manifest(bundle_dir, verify_checksums=True)
+    assert manifest == written
+    assert manifest["version"] == "2024.06.1"
+    assert sorted(manifest["files"]) == sorted(REQUIRED_FILES)
+    assert not os.path.exists(os.path.join(bundle_dir, MANIFEST_NAME + ".tmp"))
+
+
+def test_missing_manifest_is_an_error(bundle_dir):
+    with pytest.raises(BundleError, match="No model bundle manifest"):
+        load_manifest(bundle_dir)
+
+
+def test_size_mismatch_is_always_detected(bundle_dir):
+    write_manifest(bundle_dir, "1")
+    with open(os.path.join(bundle_dir, REQUIRED_FILES[0]), "ab") as f:
+        f.write(b"x")
+
+    with pytest.raises(BundleError, match="bytes, expected"):
+        load_manifest(bundle_dir)
+
+
+def test_corruption_is_detected_only_when_verifying(bundle_dir):
+    write_manifest(bundle_dir, "1")
+    path = os.path.join(bundle_dir, REQUIRED_FILES[0])
+    data = bytearray(open(path, "rb").read())
+    data[0] ^= 0xFF
+    open(path, "wb").write(bytes(data))
+
+    load_manifest(bundle_dir)  # sizes still match
+    with pytest.raises(BundleError, match="checksum"):
+        load_manifest(bundle_dir, verify_checksums=True)
+
+
+def test_incomplete_or_unknown_bundles_are_rejected(bundle_dir):
+    os.remove(os.path.join(bundle_dir, REQUIRED_FILES[-1]))
+    write_manifest(bundle_dir, "1")
+    with pytest.raises(BundleError, match="does not list"):
+        load_manifest(bundle_dir)
+
+    path = os.path.join(bundle_dir, MANIFEST_NAME)
+    manifest = json.load(open(path))
+    manifest["format"] = 99
+    json.dump(manifest, open(path, "w"))
+    with pytest.raises(BundleError, match="not supported"):
+        load_manifest(bundle_dir)
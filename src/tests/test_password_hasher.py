@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from src.services.auth_service import AuthService
+from src.services.password_hasher import PasswordHasher, PasswordHasherBusy, hash_rounds
+from src.tests.fakes import local_repository
+
+
+@pytest.fixture
+def repository(tmp_path):
+    with local_repository(tmp_path) as repo:
+        yield repo
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify():
+    """Test hashes use the configured work factor and verify correctly."""
+    hasher = PasswordHasher(rounds=4)
+    hashed = await hasher.hash("correct horse")
+
+    assert hash_rounds(hashed) == 4
+    assert await hasher.verify("correct horse", hashed)
+    assert not await hasher.verify("wrong horse", hashed)
+    assert not hasher.needs_rehash(hashed)
+    assert PasswordHasher(rounds=5).needs_rehash(hashed)
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hashing_does_not_block_the_event_loop():
+    """Test other coroutines keep running while a password is hashed."""
+    hasher = PasswordHasher(rounds=10)
+    gaps = []
+
+    async def ticker(stop: asyncio.Event):
+        last = time.perf_counter()
+        while not stop.is_set():
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    stop = asyncio.Event()
+    task = asyncio.create_task(ticker(stop))
+    start = time.perf_counter()
+    await hasher.hash("password")
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await task
+
+    assert len(gaps) > 1
+    assert max(gaps) < elapsed / 2
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_sheds_work_beyond_the_pending_cap():
+    """Test operations beyond workers plus max_pending are rejected."""
+    hasher = PasswordHasher(rounds=10, workers=1, max_pending=1)
+    running = [asyncio.create_task(hasher.hash("password")) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert hasher.pending == 2
+
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.hash("password")
+
+    await asyncio.gather(*running)
+    assert hasher.pending == 0
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_login_upgrades_hashes_to_the_configured_work_factor(repository):
+    """Test a successful login rehashes a password stored with old rounds."""
+    old_service = AuthService(repository, hasher=PasswordHasher(rounds=4))
+    await old_service.create_user(
+        {"email": "user@example.com", "password": "password1"}
+    )
+
+    service = AuthService(repository, hasher=PasswordHasher(rounds=5))
+    assert await service.authenticate_user("user@example.com", "wrong") is None
+    user = await repository.get_user_by_email("user@example.com")
+    assert hash_rounds(user.hashed_password) == 4
+
+    assert await service.authenticate_user("user@example.com", "password1") is not None
+    user = await repository.get_user_by_email("user@example.com")
+    assert hash_rounds(user.hashed_password) == 5
+
+
+@pytest.mark.asyncio
+async def test_busy_hasher_returns_503(repository):
+    """Test an overloaded hasher surfaces as 503 rather than a failed login."""
+    service = AuthService(repository, hasher=PasswordHasher(rounds=4))
+    await service.create_user({"email": "user@example.com", "password": "password1"})
+    service.hasher.max_pending = -service.hasher.workers
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.authenticate_user("user@example.com", "password1")
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"]
@@ -0,0 +1,112 @@
+import pytest
+
+from src.services.rate_limiter import (
+    InMemoryRateLimitBackend,
+    RateLimiter,
+    SharedStoreRateLimitBackend,
+)
+from src.tests.fakes import FakeClock, FakeKeyValueStore
+
+
+class BrokenBackend:
+    async def consume(self, key, cost, rate, capacity):
+        raise ConnectionError("store unavailable")
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_allows_burst_then_refills():
+    """Test the bucket allows a full burst, denies, then refills over time."""
+    clock = FakeClock()
+    limiter = RateLimiter(InMemoryRateLimitBackend(clock=clock), requests_per_minute=3)
+
+    results = [await limiter.hit("1.2.3.4") for _ in range(4)]
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert results[-1].retry_after == pytest.approx(20.0)
+
+    # One token per 20 seconds at 3 requests per minute
+    clock.now += 20
+    assert (await limiter.hit("1.2.3.4")).allowed
+    assert not (await limiter.hit("1.2.3.4")).allowed
+
+    # Other clients have their own bucket
+    assert (await limiter.hit("5.6.7.8")).allowed
+
+
+@pytest.mark.asyncio
+async def test_idle_buckets_expire_lazily():
+    """Test buckets that would be full again are dropped on later requests."""
+    clock = FakeClock()
+    backend = InMemoryRateLimitBackend(clock=clock)
+    limiter = RateLimiter(backend, requests_per_minute=60)
+
+    for i in range(100):
+        await limiter.hit(f"10.0.0.{i}")
+    assert len(backend) == 100
+
+    clock.now += 61
+    await limiter.hit("10.0.1.1")
+    assert len(backend) == 1
+
+
+@pytest.mark.asyncio
+async def test_cost_charges_multiple_tokens():
+    """Test a request can consume several tokens at once."""
+    limiter = RateLimiter(
+        InMemoryRateLimitBackend(clock=FakeClock()), requests_per_minute=5
+    )
+
+    assert (await limiter.hit("client", cost=4)).remaining == 1
+    assert not (await limiter.hit("client", cost=2)).allowed
+    assert (await limiter.hit("client", cost=1)).allowed
+
+
+@pytest.mark.asyncio
+async def test_shared_store_limit_is_consistent_across_workers():
+    """Test two limiters sharing one store enforce a single combined limit."""
+    clock = FakeClock(now=600.0)  # start of a window
+    store = FakeKeyValueStore(clock=clock)
+    worker_a = RateLimiter(
+        SharedStoreRateLimitBackend(store, clock=clock), requests_per_minute=4
+    )
+    worker_b = RateLimiter(
+        SharedStoreRateLimitBackend(store, clock=clock), requests_per_minute=4
+    )
+
+    allowed = 0
+    for i in range(6):
+        worker = worker_a if i % 2 else worker_b
+        allowed += (await worker.hit("1.2.3.4")).allowed
+    assert allowed == 4
+
+    # Rejected requests are refunded, so they do not count against the window
+    assert store.values["ratelimit:1.2.3.4:10"] == 4
+
+
+@pytest.mark.asyncio
+async def test_shared_store_sliding_window_weights_previous_window():
+    """Test the previous window's count decays as the current window advances."""
+    clock = FakeClock(now=600.0)
+    store = FakeKeyValueStore(clock=clock)
+    limiter = RateLimiter(
+        SharedStoreRateLimitBackend(store, clock=clock), requests_per_minute=4
+    )
+
+    for _ in range(4):
+        assert (await limiter.hit("client")).allowed
+
+    # Halfway through the next window half of the previous count still applies
+    clock.now = 690.0
+    results = [await limiter.hit("client") for _ in range(3)]
+    assert [r.allowed for r in results] == [True, True, False]
+    assert results[-1].retry_after == pytest.approx(30.0)
+
+    # Counters expire from the store on their own
+    clock.now = 900.0
+    assert await store.get("ratelimit:client:10") is None
+
+
+@pytest.mark.asyncio
+async def test_backend_errors_fail_open():
+    """Test an unavailable backend does not block requests."""
+    limiter = RateLimiter(BrokenBackend(), requests_per_minute=1)
+    assert (await limiter.hit("client")).allowed
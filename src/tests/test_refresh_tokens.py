@@ -0,0 +1,123 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+
+from src.services.auth_service import AuthService
+from src.services.password_hasher import PasswordHasher
+from src.services.token_cache import TokenCache
+from src.tests.fakes import local_repository
+
+
+@pytest.fixture
+def repository(tmp_path):
+    with local_repository(tmp_path) as repo:
+        yield repo
+
+
+@pytest.fixture
+def service(repository):
+    return AuthService(repository, hasher=PasswordHasher(rounds=4), tokens=TokenCache())
+
+
+@pytest_asyncio.fixture
+async def user(service):
+    return await service.create_user(
+        {"email": "a@example.com", "password": "password1"}
+    )
+
+
+async def assert_refused(service, token):
+    with pytest.raises(HTTPException) as exc_info:
+        await service.rotate_refresh_token(token)
+    assert exc_info.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_the_token(service, repository, user):
+    """Test a refresh returns the user and a new token for the same family."""
+    first = await service.create_refresh_token(user)
+    family_id = first.split(".")[0]
+    stored = await repository.get_refresh_token(family_id)
+    assert first.split(".")[1] not in stored.token_digest
+
+    refreshed_user, second = await service.rotate_refresh_token(first)
+    assert refreshed_user.email == "a@example.com"
+    assert second.split(".")[0] == family_id
+    assert second != first
+
+    _, third = await service.rotate_refresh_token(second)
+    assert (await repository.get_refresh_token(family_id)).generation == 2
+
+
+@pytest.mark.asyncio
+async def test_refresh_skips_password_hashing(service, user, monkeypatch):
+    """Test refreshing never touches bcrypt or the email scan."""
+    token = await service.create_refresh_token(user)
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("refresh must not hash or scan users")
+
+    monkeypatch.setattr(service.hasher, "verify", fail)
+    monkeypatch.setattr(service.repository, "get_user_by_email", fail)
+    await service.rotate_refresh_token(token)
+
+
+@pytest.mark.asyncio
+async def test_reuse_revokes_the_family(service, user):
+    """Test replaying a rotated token locks out the whole family."""
+    first = await service.create_refresh_token(user)
+    _, second = await service.rotate_refresh_token(first)
+
+    await assert_refused(service, first)
+    # The legitimate holder is logged out too
+    await assert_refused(service, second)
+
+    # Other logins of the same user are unaffected
+    other = await service.create_refresh_token(user)
+    await service.rotate_refresh_token(other)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_rotate_once(service, repository, user, monkeypatch):
+    """Test two requests racing with the same token cannot both get a new one."""
+    token = await service.create_refresh_token(user)
+    get_user = repository.get_user
+
+    async def slow_get_user(user_id):
+        # Let the other request run, as a network round trip would
+        await asyncio.sleep(0.01)
+        return await get_user(user_id)
+
+    monkeypatch.setattr(repository, "get_user", slow_get_user)
+
+    results = await asyncio.gather(
+        service.rotate_refresh_token(token),
+        service.rotate_refresh_token(token),
+        return_exceptions=True,
+    )
+
+    assert sum(not isinstance(result, Exception) for result in results) == 1
+    # The loser looks like a replay, so the family is locked out
+    family = await repository.get_refresh_token(token.split(".")[0])
+    assert family.generation == 1
+    assert family.revoked
+
+
+@pytest.mark.asyncio
+async def test_invalid_expired_and_inactive_are_refused(service, repository, user):
+    """Test malformed, unknown, expired and deactivated refreshes fail."""
+    await assert_refused(service, "garbage")
+    await assert_refused(service, "missing.secret")
+
+    token = await service.create_refresh_token(user)
+    family = await repository.get_refresh_token(token.split(".")[0])
+    family.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    await repository.update_refresh_token(family.id, family)
+    await assert_refused(service, token)
+
+    token = await service.create_refresh_token(user)
+    await service.deactivate_user("a@example.com")
+    await assert_refused(service, token)
@@ -0,0 +1,376 @@
+import hashlib
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+import numpy as np
+import pytest
+
+from src.database.models import (
+    ApiKey,
+    BoundingBox,
+    Category,
+    DetectionResponse,
+    Product,
+    RefreshToken,
+    SearchResponse,
+    User,
+)
+from src.tests.fakes import FakeDatabase, FakeStorage, local_repository
+from src.utils.config import Settings
+
+
+@pytest.fixture(params=["local", "firebase"])
+def repository(request, tmp_path):
+    """Run every contract test against each storage backend."""
+    if request.param == "local":
+        with local_repository(tmp_path) as repo:
+            yield repo
+    else:
+        pytest.importorskip("firebase_admin")
+        from src.database.repository import FirebaseRepository
+
+        yield FirebaseRepository(db=FakeDatabase(), storage=FakeStorage())
+
+
+def assert_same_instant(actual: datetime, expected: datetime):
+    """Backends may store timestamps at millisecond precision."""
+    assert abs(actual - expected) < timedelta(milliseconds=1)
+
+
+def make_user(email: str = "user@example.com") -> User:
+    return User(id=str(uuid.uuid4()), email=email, hashed_password="hashed")
+
+
+def make_product(**overrides) -> Product:
+    fields: Dict[str, Any] = dict(
+        id=str(uuid.uuid4()),
+        brand="Test Brand",
+        name="Test Product",
+        category_id="tops",
+        price=99.99,
+        source_url="https://example.com",
+        image_url="https://example.com/image.jpg",
+    )
+    fields.update(overrides)
+    return Product(**fields)
+
+
+def make_search_result(with_detection: bool = True) -> SearchResponse:
+    results = []
+    if with_detection:
+        results.append(
+            DetectionResponse(
+                similarity_score=0.5,
+                bounding_box=BoundingBox(x1=0, y1=0, x2=10, y2=10),
+                confidence=0.9,
+            )
+        )
+    return SearchResponse(
+        query_id=str(uuid.uuid4()),
+        results=results,
+        processing_time=0.25,
+        created_at=datetime.now(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_user_round_trip(repository):
+    """Test creating, reading and updating users."""
+    user = make_user()
+    assert await repository.create_user(user) == user.id
+
+    fetched = await repository.get_user(user.id)
+    assert fetched.email == user.email
+    assert_same_instant(fetched.created_at, user.created_at)
+
+    by_email = await repository.get_user_by_email(user.email)
+    assert by_email.id == user.id
+    assert await repository.get_user_by_email("missing@example.com") is None
+
+    user.is_active = False
+    assert await repository.update_user(user.id, user)
+    assert (await repository.get_user(user.id)).is_active is False
+
+
+@pytest.mark.asyncio
+async def test_api_key_round_trip(repository):
+    """Test API key records are stored and updated under their digest."""
+    digest = hashlib.sha256(b"gr_secret").hexdigest()
+    expires_at = datetime.utcnow() + timedelta(days=30)
+    api_key = ApiKey(
+        id=digest,
+        user_id="user-1",
+        email="service@example.com",
+        prefix="gr_secret",
+        requests_per_minute=600,
+        expires_at=expires_at,
+    )
+    assert await repository.create_api_key(api_key) == digest
+
+    fetched = await repository.get_api_key(digest)
+    assert fetched.email == "service@example.com"
+    assert fetched.requests_per_minute == 600
+    assert_same_instant(fetched.expires_at, expires_at)
+    assert await repository.get_api_key("missing") is None
+
+    fetched.revoked = True
+    assert await repository.update_api_key(digest, fetched)
+    assert (await repository.get_api_key(digest)).revoked is True
+
+    listed = await repository.list_user_api_keys(api_key.user_id)
+    assert [record.id for record in listed] == [digest]
+    assert listed[0].revoked is True
+    assert await repository.list_user_api_keys("someone-else") == []
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_round_trip(repository):
+    """Test refresh token families are stored and rotated by ID."""
+    expires_at = datetime.utcnow() + timedelta(days=7)
+    family = RefreshToken(
+        id="family-1", user_id="user-1", token_digest="a" * 64, expires_at=expires_at
+    )
+    assert await repository.create_refresh_token(family) == "family-1"
+
+    fetched = await repository.get_refresh_token("family-1")
+    assert fetched.token_digest == "a" * 64
+    assert_same_instant(fetched.expires_at, expires_at)
+    assert await repository.get_refresh_token("missing") is None
+
+    fetched.token_digest = "b" * 64
+    fetched.generation += 1
+    assert await repository.update_refresh_token("family-1", fetched)
+    rotated = await repository.get_refresh_token("family-1")
+    assert (rotated.token_digest, rotated.generation) == ("b" * 64, 1)
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_transaction(repository):
+    """Test a transaction writes what the update returns, and only that."""
+    family = RefreshToken(
+        id="family-1",
+        user_id="user-1",
+        token_digest="a" * 64,
+        expires_at=datetime.utcnow() + timedelta(days=7),
+    )
+    await repository.create_refresh_token(family)
+
+    def bump(current):
+        current.generation += 1
+        return current
+
+    written = await repository.transact_refresh_token("family-1", bump)
+    assert written.generation == 1
+    assert (await repository.get_refresh_token("family-1")).generation == 1
+
+    # Returning None leaves the record untouched
+    assert (
+        await repository.transact_refresh_token("family-1", lambda current: None)
+        is None
+    )
+    assert (await repository.get_refresh_token("family-1")).generation == 1
+
+    seen = []
+    assert await repository.transact_refresh_token("missing", seen.append) is None
+    assert seen == [None]
+    assert await repository.get_refresh_token("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_missing_records_return_none(repository):
+    """Test lookups of unknown ids."""
+    assert await repository.get_user("missing") is None
+    assert await repository.get_product("missing") is None
+    assert await repository.get_category("missing") is None
+    assert await repository.get_search_result("missing") is None
+    assert await repository.get_embedding("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_product_round_trip_and_search(repository):
+    """Test product storage and attribute filtering."""
+    shirt = make_product(category_id="tops")
+    shoe = make_product(category_id="shoes", price=120.0)
+    await repository.create_product(shirt)
+    await repository.create_product(shoe)
+
+    fetched = await repository.get_product(shirt.id)
+    assert fetched.name == shirt.name
+    assert fetched.price == shirt.price
+
+    shoe.price = 80.0
+    assert await repository.update_product(shoe.id, shoe)
+    assert (await repository.get_product(shoe.id)).price == 80.0
+
+    tops = await repository.search_products({"category_id": "tops"})
+    assert [product.id for product in tops] == [shirt.id]
+    assert len(await repository.search_products({})) == 2
+    assert len(await repository.search_products({}, limit=1)) == 1
+
+
+@pytest.mark.asyncio
+async def test_category_round_trip(repository):
+    """Test category storage."""
+    category = Category(id=str(uuid.uuid4()), name="Test Category", level=1)
+    assert await repository.create_category(category) == category.id
+    assert (await repository.get_category(category.id)).name == "Test Category"
+
+
+@pytest.mark.asyncio
+async def test_search_result_round_trip(repository):
+    """Test single and batched search result writes."""
+    single = make_search_result()
+    assert await repository.save_search_result(single) == single.query_id
+
+    batch = [make_search_result(), make_search_result(with_detection=False)]
+    saved_ids = await repository.save_search_results(batch)
+    assert saved_ids == [result.query_id for result in batch]
+
+    fetched = await repository.get_search_result(single.query_id)
+    assert fetched.query_id == single.query_id
+    assert fetched.results[0].bounding_box.x2 == 10
+    assert_same_instant(fetched.created_at, single.created_at)
+
+    empty = await repository.get_search_result(batch[1].query_id)
+    assert empty.results == []
+
+
+@pytest.mark.asyncio
+async def test_embedding_round_trip(repository):
+    """Test embeddings come back as the float32 values that were stored."""
+    embedding = np.random.rand(768).astype(np.float32)
+    await repository.upload_embedding("product-1", embedding.tolist())
+
+    fetched = await repository.get_embedding("product-1")
+    assert len(fetched) == 768
+    np.testing.assert_allclose(fetched, embedding, rtol=1e-6)
+
+
+@pytest.mark.asyncio
+async def test_get_all_embeddings(repository):
+    """Test bulk embedding loads return ids aligned with matrix rows."""
+    ids, matrix = await repository.get_all_embeddings()
+    assert ids == [] and matrix.size == 0
+
+    vectors = {f"product-{i}": np.random.rand(8).astype(np.float32) for i in range(3)}
+    for product_id, vector in vectors.items():
+        await repository.upload_embedding(product_id, vector.tolist())
+
+    ids, matrix = await repository.get_all_embeddings()
+    assert sorted(ids) == sorted(vectors)
+    assert matrix.shape == (3, 8)
+    assert matrix.dtype == np.float32
+    for product_id, row in zip(ids, matrix):
+        np.testing.assert_allclose(row, vectors[product_id], rtol=1e-6)
+
+
+@pytest.mark.asyncio
+async def test_upload_image_is_content_addressed(repository):
+    """Test uploads are keyed by SHA-256 and deduplicated."""
+    content = b"\xff\xd8\xff\xe0" + b"jpeg bytes"
+    digest = hashlib.sha256(content).hexdigest()
+
+    first = await repository.upload_image(content, content_type="image/png")
+    second = await repository.upload_image(content)
+
+    assert first.id == second.id == digest
+    assert first.content_type == "image/jpeg"
+    assert first.size == len(content)
+    assert first.url == second.url
+    assert second.ref_count == 2
+    assert (await repository.get_upload(digest)).ref_count == 2
+
+
+@pytest.mark.asyncio
+async def test_upload_content_type_fallback(repository):
+    """Test unknown content keeps the caller's content type."""
+    upload = await repository.upload_image(b"not an image", content_type="text/plain")
+    assert upload.content_type == "text/plain"
+
+    png = await repository.upload_image(b"\x89PNG\r\n\x1a\n" + b"png bytes")
+    assert png.content_type == "image/png"
+
+
+@pytest.mark.asyncio
+async def test_release_image_deletes_last_reference(repository):
+    """Test reference counting drives cleanup."""
+    upload = await repository.upload_image(b"GIF89a" + b"gif bytes")
+    await repository.upload_image(b"GIF89a" + b"gif bytes")
+
+    assert await repository.release_image(upload.id)
+    assert (await repository.get_upload(upload.id)).ref_count == 1
+
+    assert await repository.release_image(upload.id)
+    assert await repository.get_upload(upload.id) is None
+    assert not await repository.release_image(upload.id)
+
+    # Re-uploading released content stores it again
+    again = await repository.upload_image(b"GIF89a" + b"gif bytes")
+    assert again.ref_count == 1
+
+
+@pytest.mark.asyncio
+async def test_status_checks(repository):
+    """Test connection and storage checks report healthy."""
+    assert (await repository.check_connection())["status"] == "connected"
+    assert (await repository.check_storage())["status"] == "healthy"
+
+
+@pytest.mark.asyncio
+async def test_firebase_connection_check_is_read_only():
+    """Test the health probe does not write to the database."""
+    pytest.importorskip("firebase_admin")
+    from src.database.repository import FirebaseRepository
+
+    db = FakeDatabase()
+    writes = []
+    db.write = lambda keys, value: writes.append(keys)
+    repository = FirebaseRepository(db=db, storage=FakeStorage())
+
+    assert (await repository.check_connection())["status"] == "connected"
+    assert writes == []
+
+
+@pytest.mark.asyncio
+async def test_firebase_upload_skips_known_content():
+    """Test the manifest lookup avoids re-sending known bytes to Storage."""
+    pytest.importorskip("firebase_admin")
+    from src.database.repository import FirebaseRepository
+
+    storage = FakeStorage()
+    repository = FirebaseRepository(db=FakeDatabase(), storage=storage)
+
+    for _ in range(3):
+        upload = await repository.upload_image(b"\xff\xd8\xff\xe0" + b"jpeg bytes")
+
+    assert storage.bucket().uploads == 1
+    assert storage.bucket().content_types[upload.path] == "image/jpeg"
+
+
+@pytest.mark.asyncio
+async def test_local_file_io_runs_off_the_event_loop(tmp_path, monkeypatch):
+    """Test the local backend reads and writes files in worker threads."""
+    threads = set()
+    for name in ("save", "load"):
+        original = getattr(np, name)
+
+        def record(*args, _original=original, **kwargs):
+            threads.add(threading.get_ident())
+            return _original(*args, **kwargs)
+
+        monkeypatch.setattr(np, name, record)
+
+    with local_repository(tmp_path) as repository:
+        await repository.upload_embedding("product-1", [0.5, 1.0])
+        await repository.get_embedding("product-1")
+        await repository.get_all_embeddings()
+
+    assert threads and threading.get_ident() not in threads
+
+
+def test_storage_backend_name_is_normalized():
+    """Test the backend name matches however it is spelled in the environment."""
+    assert Settings(STORAGE_BACKEND=" Local ").STORAGE_BACKEND == "local"
+    assert Settings(STORAGE_BACKEND="FIREBASE").STORAGE_BACKEND == "firebase"
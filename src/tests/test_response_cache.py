@@ -0,0 +1,59 @@
+from src.services.response_cache import ResponseCache, etag_matches, make_etag
+
+
+def test_put_returns_stable_strong_etag():
+    """Test identical bodies get the same strong ETag."""
+    cache = ResponseCache(max_entries=10, max_bytes=1024)
+
+    entry = cache.put("a", b'{"query_id":"a"}')
+
+    assert entry.etag == make_etag(b'{"query_id":"a"}')
+    assert entry.etag.startswith('"') and not entry.etag.startswith("W/")
+    assert cache.get("a") == entry
+    assert cache.stats()["hits"] == 1
+
+
+def test_lru_evicts_by_count_and_size():
+    """Test least recently used entries go first when either bound is hit."""
+    cache = ResponseCache(max_entries=2, max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    cache.get("a")
+    cache.put("c", b"1234")
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert len(cache) == 2
+
+    cache.put("d", b"12345678")
+    assert len(cache) == 1
+    assert cache.size_bytes == 8
+
+    # Bodies larger than the whole budget are not cached
+    entry = cache.put("e", b"x" * 11)
+    assert entry.body == b"x" * 11
+    assert cache.get("e") is None
+
+
+def test_replacing_entry_keeps_size_accurate():
+    """Test re-putting a key does not double count its bytes."""
+    cache = ResponseCache(max_entries=10, max_bytes=100)
+    cache.put("a", b"12345")
+    cache.put("a", b"123")
+    assert cache.size_bytes == 3
+
+    cache.invalidate("a")
+    assert cache.size_bytes == 0
+    assert cache.get("a") is None
+
+
+def test_etag_matches():
+    """Test If-None-Match lists, wildcards and weak validators."""
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"xyz", "abc"', etag)
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"xyz"', etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches("", etag)
@@ -0,0 +1,210 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.services.scheduler import FairScheduler, Principal, current_principal
+
+
+@pytest.fixture
+def executor():
+    pool = ThreadPoolExecutor(max_workers=1)
+    yield pool
+    pool.shutdown(wait=True)
+
+
+def work(log: list, name: str, seconds: float):
+    time.sleep(seconds)
+    log.append(name)
+    return name
+
+
+async def submit(scheduler, principal, log, seconds, count):
+    async def one():
+        current_principal.set(principal)
+        return await scheduler.run(work, log, principal.tenant, seconds)
+
+    return [asyncio.create_task(one()) for _ in range(count)]
+
+
+async def blocker(scheduler):
+    """Occupy the single worker so later calls queue up behind it."""
+    release = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    task = asyncio.create_task(
+        scheduler.run(
+            lambda: asyncio.run_coroutine_threadsafe(release.wait(), loop).result()
+        )
+    )
+    await asyncio.sleep(0.01)
+    return release, task
+
+
+async def drain(scheduler):
+    """Wait for calls that were already running when their callers gave up."""
+    while scheduler.running:
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_interleaves_tenants_instead_of_first_come_first_served(executor):
+    """Test a tenant's burst does not hold back another tenant's calls."""
+    scheduler = FairScheduler(
+        executor, workers=1, quantum=0.01, role_weights={"user": 1.0}
+    )
+    log = []
+    release, first = await blocker(scheduler)
+
+    tasks = await submit(scheduler, Principal("a", "user"), log, 0.005, 6)
+    tasks += await submit(scheduler, Principal("b", "user"), log, 0.005, 2)
+    release.set()
+    await asyncio.gather(first, *tasks)
+
+    # b's two calls are served within the first few, not after all of a's
+    assert log.index("b") <= 2
+    assert log.count("b") == 2
+
+
+@pytest.mark.asyncio
+async def test_shares_compute_time_not_request_count(executor):
+    """Test a tenant making heavy calls gets proportionally fewer of them."""
+    scheduler = FairScheduler(
+        executor,
+        workers=1,
+        quantum=0.02,
+        role_weights={"user": 1.0},
+        initial_estimate=0.0,
+    )
+    log = []
+    release, first = await blocker(scheduler)
+    heavy = await submit(scheduler, Principal("heavy", "user"), log, 0.04, 10)
+    light = await submit(scheduler, Principal("light", "user"), log, 0.01, 40)
+    release.set()
+
+    await asyncio.sleep(0.6)
+    served = list(log)
+    for task in heavy + light:
+        task.cancel()
+    await asyncio.gather(first, *heavy, *light, return_exceptions=True)
+    await drain(scheduler)
+
+    heavy_time = served.count("heavy") * 0.04
+    light_time = served.count("light") * 0.01
+    assert served.count("light") > served.count("heavy")
+    assert 0.5 < heavy_time / light_time < 2.0
+
+
+@pytest.mark.asyncio
+async def test_role_weights_scale_the_share(executor):
+    """Test a tenant with twice the weight gets about twice the compute."""
+    scheduler = FairScheduler(
+        executor,
+        workers=1,
+        quantum=0.01,
+        role_weights={"admin": 2.0, "user": 1.0},
+        initial_estimate=0.0,
+    )
+    log = []
+    release, first = await blocker(scheduler)
+    admin = await submit(scheduler, Principal("root", "admin"), log, 0.01, 40)
+    user = await submit(scheduler, Principal("u", "user"), log, 0.01, 40)
+    release.set()
+
+    await asyncio.sleep(0.4)
+    served = list(log)
+    for task in admin + user:
+        task.cancel()
+    await asyncio.gather(first, *admin, *user, return_exceptions=True)
+    await drain(scheduler)
+
+    ratio = served.count("root") / max(1, served.count("u"))
+    assert 1.4 < ratio < 3.0
+
+
+@pytest.mark.asyncio
+async def test_higher_priority_roles_go_first(executor):
+    """Test queued calls from a higher priority class are served first."""
+    scheduler = FairScheduler(
+        executor,
+        workers=1,
+        role_priorities={"user": 0, "service": 1},
+        max_starvation=10.0,
+    )
+    log = []
+    release, first = await blocker(scheduler)
+    batch = await submit(scheduler, Principal("indexer", "service"), log, 0.001, 3)
+    interactive = await submit(scheduler, Principal("u", "user"), log, 0.001, 3)
+    release.set()
+    await asyncio.gather(first, *batch, *interactive)
+
+    assert log == ["u"] * 3 + ["indexer"] * 3
+
+
+@pytest.mark.asyncio
+async def test_starved_low_priority_calls_are_eventually_served(executor):
+    """Test the starvation guard lets old low-priority calls through."""
+    scheduler = FairScheduler(
+        executor,
+        workers=1,
+        role_priorities={"user": 0, "service": 1},
+        max_starvation=0.05,
+    )
+    log = []
+    release, first = await blocker(scheduler)
+    batch = await submit(scheduler, Principal("indexer", "service"), log, 0.001, 1)
+    interactive = await submit(scheduler, Principal("u", "user"), log, 0.02, 20)
+    release.set()
+    await asyncio.gather(first, *batch, *interactive)
+
+    assert log.index("indexer") < len(log) - 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_calls_are_skipped(executor):
+    """Test a caller that gives up does not consume a worker."""
+    scheduler = FairScheduler(executor, workers=1)
+    log = []
+    release, first = await blocker(scheduler)
+    tasks = await submit(scheduler, Principal("a", "user"), log, 0.001, 3)
+    tasks[1].cancel()
+    release.set()
+    results = await asyncio.gather(first, *tasks, return_exceptions=True)
+
+    assert isinstance(results[2], asyncio.CancelledError)
+    assert log == ["a", "a"]
+    assert scheduler.running == 0
+    assert scheduler.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_and_idle_tenants_are_forgotten(executor):
+    """Test exceptions reach the caller and finished tenants are dropped."""
+    scheduler = FairScheduler(executor, workers=2)
+
+    def boom():
+        raise ValueError("bad image")
+
+    with pytest.raises(ValueError):
+        await scheduler.run(boom)
+    assert await scheduler.run(lambda x: x * 2, 21) == 42
+
+    assert scheduler.stats()["running"] == 0
+    assert scheduler.stats()["tenants"] == 0
+
+
+@pytest.mark.asyncio
+async def test_idle_tenants_are_removed_even_in_debt(executor):
+    """Test tenants that overran their estimate are dropped once idle."""
+    scheduler = FairScheduler(
+        executor, workers=1, quantum=0.001, initial_estimate=0.001, smoothing=0.0
+    )
+    log = []
+
+    # Each call costs far more than the estimate charged at dispatch
+    tasks = await submit(scheduler, Principal("a", "user"), log, 0.02, 3)
+    tasks += await submit(scheduler, Principal("b", "service"), log, 0.02, 1)
+    await asyncio.gather(*tasks)
+
+    assert scheduler.stats() == {"running": 0, "queued": 0, "workers": 1, "tenants": 0}
+    assert scheduler._rings == {}
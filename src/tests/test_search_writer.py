@@ -0,0 +1,133 @@
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Dict, List
+
+import pytest
+
+from src.api.schemas import SearchResponse
+from src.services.search_writer import SearchResultWriter
+
+
+class FakeSearchRepository:
+    """In-memory stand-in recording search result writes."""
+
+    def __init__(self, failures: int = 0):
+        self.saved: Dict[str, SearchResponse] = {}
+        self.batches: List[List[SearchResponse]] = []
+        self.failures = failures
+
+    async def save_search_result(self, search_result):
+        self.saved[search_result.query_id] = search_result
+        return search_result.query_id
+
+    async def save_search_results(self, search_results):
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        self.batches.append(len(search_results))
+        for search_result in search_results:
+            self.saved[search_result.query_id] = search_result
+        return [search_result.query_id for search_result in search_results]
+
+
+def make_result() -> SearchResponse:
+    return SearchResponse(
+        query_id=str(uuid.uuid4()),
+        results=[],
+        processing_time=0.1,
+        created_at=datetime.now(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_enqueue_without_running_writer_saves_directly():
+    """Test that a stopped writer falls back to a synchronous save."""
+    repository = FakeSearchRepository()
+    writer = SearchResultWriter(repository)
+
+    result = make_result()
+    await writer.enqueue(result)
+
+    assert result.query_id in repository.saved
+    assert writer.pending_count == 0
+
+
+@pytest.mark.asyncio
+async def test_pending_results_are_readable_and_flushed_on_stop():
+    """Test read-through of pending results and flush on shutdown."""
+    repository = FakeSearchRepository()
+    writer = SearchResultWriter(repository, batch_size=3, flush_interval=60)
+    await writer.start()
+
+    results = [make_result() for _ in range(2)]
+    for result in results:
+        await writer.enqueue(result)
+
+    # Below the batch size nothing has been written yet
+    assert repository.saved == {}
+    assert writer.get(results[0].query_id) is results[0]
+
+    await writer.stop()
+
+    assert set(repository.saved) == {result.query_id for result in results}
+    assert writer.get(results[0].query_id) is None
+    assert not writer.running
+
+
+@pytest.mark.asyncio
+async def test_results_are_written_in_batches():
+    """Test that a full batch triggers a write of at most batch_size results."""
+    repository = FakeSearchRepository()
+    writer = SearchResultWriter(repository, batch_size=4, flush_interval=60)
+    await writer.start()
+
+    for _ in range(10):
+        await writer.enqueue(make_result())
+    await writer.stop()
+
+    assert len(repository.saved) == 10
+    assert all(size <= 4 for size in repository.batches)
+
+
+@pytest.mark.asyncio
+async def test_failed_batches_are_retried():
+    """Test retry with backoff after transient write failures."""
+    repository = FakeSearchRepository(failures=2)
+    writer = SearchResultWriter(
+        repository, batch_size=1, flush_interval=60, retry_backoff=0.001
+    )
+    await writer.start()
+
+    result = make_result()
+    await writer.enqueue(result)
+    await writer.stop()
+
+    assert result.query_id in repository.saved
+
+
+@pytest.mark.asyncio
+async def test_enqueue_waits_when_buffer_is_full():
+    """Test that the pending buffer never grows past max_pending."""
+    repository = FakeSearchRepository(failures=1)
+    writer = SearchResultWriter(
+        repository,
+        batch_size=2,
+        max_pending=2,
+        flush_interval=60,
+        retry_backoff=0.05,
+    )
+    await writer.start()
+
+    await writer.enqueue(make_result())
+    await writer.enqueue(make_result())
+    blocked = asyncio.create_task(writer.enqueue(make_result()))
+    await asyncio.sleep(0.01)
+
+    assert not blocked.done()
+    assert writer.pending_count == 2
+
+    await asyncio.wait_for(blocked, timeout=1)
+    await writer.stop()
+
+    assert len(repository.saved) == 3
@@ -0,0 +1,174 @@
+import json
+import threading
+
+import pytest
+from cryptography.fernet import Fernet
+
+from src.tests.fakes import FakeClock
+from src.utils import secret as secret_module
+from src.utils.secret import (
+    EncryptedDiskCache,
+    EnvSecretProvider,
+    FileSecretProvider,
+    SecretManagerProvider,
+    SecretProvider,
+    SecretStore,
+    get_secret,
+)
+
+PAYLOAD = json.dumps({"type": "service_account", "project_id": "test"})
+
+
+class CountingProvider(SecretProvider):
+    def __init__(self, payload: str = PAYLOAD):
+        self.payload = payload
+        self.calls = 0
+        self.fail = False
+
+    def fetch(self, project_id, secret_id, version="latest"):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("provider unavailable")
+        return self.payload
+
+
+def test_memory_cache_honours_ttl():
+    """Test secrets are fetched once per TTL."""
+    provider, clock = CountingProvider(), FakeClock()
+    store = SecretStore(provider, ttl=60, clock=clock)
+
+    for _ in range(3):
+        assert store.get("project", "secret") == PAYLOAD
+    assert provider.calls == 1
+
+    clock.now = 61
+    store.get("project", "secret")
+    assert provider.calls == 2
+
+
+def test_disk_cache_survives_restarts_encrypted(tmp_path):
+    """Test a new store reads the encrypted disk cache instead of the provider."""
+    key = Fernet.generate_key().decode()
+    provider = CountingProvider()
+    SecretStore(provider, disk_cache=EncryptedDiskCache(str(tmp_path), key)).get(
+        "project", "firebase-service-account"
+    )
+
+    files = list(tmp_path.iterdir())
+    assert len(files) == 1
+    assert "firebase" not in files[0].name
+    assert b"service_account" not in files[0].read_bytes()
+
+    restarted = SecretStore(provider, disk_cache=EncryptedDiskCache(str(tmp_path), key))
+    assert restarted.get("project", "firebase-service-account") == PAYLOAD
+    assert provider.calls == 1
+
+    # A different key cannot read the cache and falls back to the provider
+    other_key = Fernet.generate_key().decode()
+    rekeyed = SecretStore(
+        provider, disk_cache=EncryptedDiskCache(str(tmp_path), other_key)
+    )
+    assert rekeyed.get("project", "firebase-service-account") == PAYLOAD
+    assert provider.calls == 2
+
+
+def test_stale_value_is_served_when_the_provider_fails():
+    """Test a provider outage serves the last known secret."""
+    provider, clock = CountingProvider(), FakeClock()
+    store = SecretStore(provider, ttl=60, clock=clock)
+    store.get("project", "secret")
+
+    provider.fail = True
+    clock.now = 120
+    assert store.get("project", "secret") == PAYLOAD
+
+    with pytest.raises(ConnectionError):
+        store.get("project", "never-fetched")
+
+
+def test_slow_fetch_only_blocks_its_own_secret():
+    """Test a slow fetch of one secret does not hold up other secrets."""
+    fetching, release = threading.Event(), threading.Event()
+
+    class SlowProvider(CountingProvider):
+        def fetch(self, project_id, secret_id, version="latest"):
+            if secret_id == "slow":
+                fetching.set()
+                release.wait(5)
+            return super().fetch(project_id, secret_id, version)
+
+    provider = SlowProvider()
+    store = SecretStore(provider, ttl=60, clock=FakeClock())
+    slow = [
+        threading.Thread(target=store.get, args=("project", "slow")) for _ in range(2)
+    ]
+    for thread in slow:
+        thread.start()
+    try:
+        assert fetching.wait(5)
+        assert store.get("project", "fast") == PAYLOAD
+        assert provider.calls == 1
+    finally:
+        release.set()
+        for thread in slow:
+            thread.join()
+    # The two callers of the slow secret shared one fetch
+    assert provider.calls == 2
+
+
+def test_secret_manager_client_is_created_once():
+    """Test the Secret Manager client is shared across fetches."""
+    created = []
+
+    class FakeClient:
+        def __init__(self):
+            created.append(self)
+
+        def secret_version_path(self, project_id, secret_id, version):
+            return f"projects/{project_id}/secrets/{secret_id}/versions/{version}"
+
+        def access_secret_version(self, name):
+            class Payload:
+                data = name.encode("UTF-8")
+
+            class Response:
+                payload = Payload()
+
+            return Response()
+
+    provider = SecretManagerProvider(client_factory=FakeClient)
+    assert provider.fetch("p", "a") == "projects/p/secrets/a/versions/latest"
+    provider.fetch("p", "b")
+    assert len(created) == 1
+
+
+def test_env_and_file_providers(tmp_path, monkeypatch):
+    """Test the offline providers read variables and mounted files."""
+    monkeypatch.setenv("APP_SECRET_FIREBASE_SERVICE_ACCOUNT", PAYLOAD)
+    assert EnvSecretProvider().fetch("p", "firebase-service-account") == PAYLOAD
+    with pytest.raises(KeyError):
+        EnvSecretProvider().fetch("p", "missing")
+
+    (tmp_path / "firebase-service-account").write_text(PAYLOAD)
+    assert (
+        FileSecretProvider(str(tmp_path)).fetch("p", "firebase-service-account")
+        == PAYLOAD
+    )
+    with pytest.raises(KeyError):
+        FileSecretProvider(str(tmp_path)).fetch("p", "missing")
+
+
+def test_get_secret_parses_the_payload(monkeypatch):
+    """Test get_secret returns the parsed JSON through the shared store."""
+    provider = CountingProvider()
+    monkeypatch.setattr(secret_module, "_store", SecretStore(provider))
+
+    assert get_secret("project", "secret")["type"] == "service_account"
+    get_secret("project", "secret")
+    assert provider.calls == 1
+
+    monkeypatch.setattr(
+        secret_module, "_store", SecretStore(CountingProvider("not json"))
+    )
+    with pytest.raises(ValueError):
+        get_secret("project", "secret")
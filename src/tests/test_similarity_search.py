@@ -0,0 +1,209 @@
+import asyncio
+from typing import List
+
+import numpy as np
+import pytest
+import pytest_asyncio
+
+from src.database.local_repository import LocalRepository
+from src.database.models import Product
+from src.models.similarity_search import SimilaritySearch
+
+
+class CountingRepository(LocalRepository):
+    """Local repository that records which products are fetched."""
+
+    def __init__(self, root_dir: str):
+        super().__init__(root_dir)
+        self.product_reads: List[str] = []
+        self.searches = 0
+
+    async def get_product(self, product_id):
+        self.product_reads.append(product_id)
+        return await super().get_product(product_id)
+
+    async def search_products(self, query, limit=10):
+        self.searches += 1
+        return await super().search_products(query, limit)
+
+
+@pytest_asyncio.fixture
+async def catalog(tmp_path):
+    repository = CountingRepository(str(tmp_path / "storage"))
+    rng = np.random.default_rng(0)
+    embeddings = {}
+    for i in range(50):
+        product = Product(
+            id=f"product-{i}",
+            brand="Brand",
+            name=f"Product {i}",
+            category_id="tops",
+            price=10.0,
+            source_url="https://example.com",
+            image_url="https://example.com/image.jpg",
+        )
+        await repository.create_product(product)
+        embeddings[product.id] = rng.random(768, dtype=np.float32)
+        await repository.upload_embedding(product.id, embeddings[product.id].tolist())
+    yield repository, embeddings
+    repository.close()
+
+
+def exact_ranking(embeddings, query):
+    scores = {
+        pid: float(np.dot(vec, query) / (np.linalg.norm(vec) * np.linalg.norm(query)))
+        for pid, vec in embeddings.items()
+    }
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_search_returns_top_k_in_rank_order(catalog):
+    """Test results match an exact brute-force ranking."""
+    repository, embeddings = catalog
+    search = SimilaritySearch(repository)
+    query = np.random.default_rng(1).random(768, dtype=np.float32)
+
+    results = await search.search(query.tolist(), top_k=5)
+
+    assert [r["product"].id for r in results] == exact_ranking(embeddings, query)[:5]
+    scores = [r["similarity"] for r in results]
+    assert scores == sorted(scores, reverse=True)
+    assert all(0 <= score <= 1 for score in scores)
+
+
+@pytest.mark.asyncio
+async def test_search_hydrates_only_top_k(catalog):
+    """Test DB reads depend on k rather than catalog size."""
+    repository, _ = catalog
+    search = SimilaritySearch(repository)
+    query = np.random.default_rng(2).random(768, dtype=np.float32).tolist()
+
+    results = await search.search(query, top_k=3)
+
+    assert repository.searches == 0
+    assert sorted(repository.product_reads) == sorted(r["product"].id for r in results)
+
+    # Repeated queries are served from the product cache
+    await search.search(query, top_k=3)
+    assert len(repository.product_reads) == 3
+
+
+@pytest.mark.asyncio
+async def test_search_many_matches_individual_searches(catalog):
+    """Test batched queries rank like single queries and share hydration."""
+    repository, embeddings = catalog
+    search = SimilaritySearch(repository)
+    rng = np.random.default_rng(3)
+    queries = [rng.random(768, dtype=np.float32) for _ in range(4)]
+    queries.append(queries[0])  # duplicate query in the same batch
+
+    batched = await search.search_many([q.tolist() for q in queries], top_k=3)
+
+    assert len(batched) == len(queries)
+    for query, results in zip(queries, batched):
+        assert [r["product"].id for r in results] == exact_ranking(embeddings, query)[
+            :3
+        ]
+    expected_reads = {r["product"].id for results in batched for r in results}
+    assert sorted(repository.product_reads) == sorted(expected_reads)
+
+    single = await search.search(queries[1].tolist(), top_k=3)
+    assert [r["similarity"] for r in single] == pytest.approx(
+        [r["similarity"] for r in batched[1]]
+    )
+
+
+@pytest.mark.asyncio
+async def test_saved_embeddings_are_searchable(catalog):
+    """Test new embeddings join the loaded index."""
+    repository, _ = catalog
+    search = SimilaritySearch(repository)
+    await search.search(np.ones(768).tolist(), top_k=1)
+
+    target = np.zeros(768, dtype=np.float32)
+    target[0] = 1.0
+    await repository.create_product(
+        Product(
+            id="new-product",
+            brand="Brand",
+            name="New",
+            category_id="tops",
+            price=1.0,
+            source_url="https://example.com",
+            image_url="https://example.com/image.jpg",
+        )
+    )
+    await search.save_product_embedding("new-product", target.tolist())
+
+    results = await search.search(target.tolist(), top_k=1)
+    assert results[0]["product"].id == "new-product"
+    assert results[0]["similarity"] == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_search_empty_catalog(tmp_path):
+    """Test searching before any embeddings exist."""
+    repository = LocalRepository(str(tmp_path / "empty"))
+    search = SimilaritySearch(repository)
+
+    assert await search.search(np.random.rand(768).tolist()) == []
+    repository.close()
+
+
+@pytest.mark.asyncio
+async def test_index_picks_up_external_changes_on_refresh(catalog):
+    """Test embeddings written by another process appear after a refresh."""
+    repository, _ = catalog
+    search = SimilaritySearch(repository, refresh_interval=0.05)
+    await search.start()
+    first_refresh = search.last_refresh
+    assert first_refresh is not None
+
+    target = np.zeros(768, dtype=np.float32)
+    target[1] = 1.0
+    await repository.create_product(
+        Product(
+            id="external-product",
+            brand="Brand",
+            name="External",
+            category_id="tops",
+            price=1.0,
+            source_url="https://example.com",
+            image_url="https://example.com/image.jpg",
+        )
+    )
+    # Written straight to the repository, bypassing this index
+    await repository.upload_embedding("external-product", target.tolist())
+
+    for _ in range(100):
+        if search.last_refresh != first_refresh:
+            break
+        await asyncio.sleep(0.01)
+    await search.stop()
+
+    results = await search.search(target.tolist(), top_k=1)
+    assert results[0]["product"].id == "external-product"
+
+
+@pytest.mark.asyncio
+async def test_index_grows_and_replaces_in_place(catalog):
+    """Test appends keep ids and rows aligned and replacing reuses the row."""
+    repository, embeddings = catalog
+    search = SimilaritySearch(repository, refresh_interval=0)
+    await search.refresh_index()
+
+    rng = np.random.default_rng(3)
+    added = {f"added-{i}": rng.random(768, dtype=np.float32) for i in range(70)}
+    for product_id, vector in added.items():
+        search._add_to_index(product_id, vector.tolist())
+    replacement = rng.random(768, dtype=np.float32)
+    search._add_to_index("product-0", replacement.tolist())
+
+    expected = {**embeddings, **added, "product-0": replacement}
+    assert len(search._index_ids) == len(expected)
+    assert search._index_matrix.shape == (len(expected), 768)
+    assert search._index_buffer.shape[0] >= len(expected)
+    for product_id, vector in expected.items():
+        row = search._index_matrix[search._index_rows[product_id]]
+        np.testing.assert_allclose(row, vector / np.linalg.norm(vector), rtol=1e-5)
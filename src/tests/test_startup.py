@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+import types
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from src.models.lazy_detector import LazyFashionDetector
+
+ROOT = Path(__file__).resolve().parents[2]
+HEAVY_MODULES = ("torch", "torchvision", "transformers")
+# Cumulative import time of src.main for an auth-only worker
+IMPORT_BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", "3.0"))
+
+
+def import_profile(role: str, storage_dir: Path) -> Dict[str, float]:
+    """Import src.main under ``-X importtime``; cumulative seconds per module."""
+    env = dict(
+        os.environ,
+        APP_PROCESS_ROLE=role,
+        APP_STORAGE_BACKEND="local",
+        APP_LOCAL_STORAGE_DIR=str(storage_dir),
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative) / 1e6
+    return modules
+
+
+def test_auth_role_never_imports_the_ml_stack(tmp_path):
+    """Test an auth-only worker starts without the inference code."""
+    modules = import_profile("auth", tmp_path)
+
+    assert "src.api.auth" in modules
+    assert "src.api.endpoints" not in modules
+    for name in HEAVY_MODULES + ("PIL", "src.models.fashion_detector"):
+        assert name not in modules
+    assert modules["src.main"] < IMPORT_BUDGET_SECONDS
+
+
+def test_full_role_defers_model_imports(tmp_path):
+    """Test serving inference does not import the model stack at import time."""
+    modules = import_profile("all", tmp_path)
+
+    assert "src.api.endpoints" in modules
+    for name in HEAVY_MODULES + ("src.models.fashion_detector",):
+        assert name not in modules
+
+
+def test_lazy_detector_loads_once_on_first_use(monkeypatch):
+    """Test the detector is built once, on first use, even under concurrency."""
+    built = []
+
+    class FakeDetector:
+        def __init__(self, device=None):
+            built.append(device)
+
+        def forward(self, image_data):
+            return [image_data]
+
+        def check_status(self):
+            return {"status": "healthy"}
+
+    module = types.ModuleType("src.models.fashion_detector")
+    module.FashionDetector = FakeDetector
+    monkeypatch.setitem(sys.modules, "src.models.fashion_detector", module)
+
+    detector = LazyFashionDetector(device="cpu")
+    assert not detector.loaded
+    assert built == []
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: detector.forward(b"x"), range(8)))
+    assert results == [[b"x"]] * 8
+    assert built == ["cpu"]
+    assert detector.check_status() == {"status": "healthy"}
+    assert detector.load_seconds is not None
+
+    with pytest.raises(AttributeError):
+        detector._private
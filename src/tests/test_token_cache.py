@@ -0,0 +1,139 @@
+import pytest
+from fastapi import HTTPException
+
+from src.services import auth_service as auth_module
+from src.services.auth_service import AuthService
+from src.services.password_hasher import PasswordHasher
+from src.services.token_cache import TokenCache
+from src.tests.fakes import FakeClock, local_repository
+
+
+@pytest.fixture
+def repository(tmp_path):
+    with local_repository(tmp_path) as repo:
+        yield repo
+
+
+@pytest.fixture
+def service(repository):
+    return AuthService(repository, hasher=PasswordHasher(rounds=4), tokens=TokenCache())
+
+
+def test_entries_live_until_the_token_expires():
+    """Test cached claims are dropped once the token's exp passes."""
+    clock = FakeClock(now=1000.0)
+    cache = TokenCache(clock=clock)
+    cache.put("token", {"sub": "a@example.com", "exp": 1060})
+
+    assert cache.get("token").claims["sub"] == "a@example.com"
+    clock.now = 1060
+    assert cache.get("token") is None
+    assert len(cache) == 0
+
+    cache.put("expired", {"sub": "a@example.com", "exp": 1000})
+    assert cache.get("expired") is None
+
+
+def test_cache_is_bounded():
+    """Test the least recently used token is evicted at capacity."""
+    cache = TokenCache(max_entries=2, clock=FakeClock(now=1000.0))
+    cache.put("a", {"sub": "a", "exp": 2000})
+    cache.put("b", {"sub": "b", "exp": 2000})
+    cache.get("a")
+    cache.put("c", {"sub": "c", "exp": 2000})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_revoking_a_user_refuses_tokens_issued_before():
+    """Test user revocation evicts cached tokens and refuses older ones."""
+    clock = FakeClock(now=1000.0)
+    cache = TokenCache(clock=clock)
+    old_claims = {"sub": "a@example.com", "exp": 2000, "iat": 990}
+    cache.put("old", old_claims)
+    cache.put("other", {"sub": "b@example.com", "exp": 2000, "iat": 990})
+
+    assert cache.revoke_user("a@example.com") == 1
+    assert cache.get("old") is None
+    assert cache.get("other") is not None
+    assert cache.is_revoked("old", old_claims)
+    assert not cache.is_revoked(
+        "new", {"sub": "a@example.com", "exp": 2000, "iat": 1001}
+    )
+
+
+def test_revoked_tokens_are_forgotten_after_expiry():
+    """Test revocation records do not outlive the tokens they refer to."""
+    clock = FakeClock(now=1000.0)
+    cache = TokenCache(max_token_lifetime=60, clock=clock)
+    cache.revoke_token("token", expires_at=1010)
+    cache.revoke_user("a@example.com")
+    assert cache.stats()["revoked_tokens"] == 1
+
+    clock.now = 1100
+    cache.revoke_token("another", expires_at=1200)
+    assert cache.stats()["revoked_tokens"] == 1
+    assert cache.stats()["revoked_users"] == 0
+
+
+@pytest.mark.asyncio
+async def test_repeated_verification_skips_decoding(service, monkeypatch):
+    """Test a token is decoded once and then served from the cache."""
+    token = service.create_access_token({"sub": "a@example.com", "role": "user"})
+    calls = []
+    decode = auth_module.jwt.decode
+    monkeypatch.setattr(
+        auth_module.jwt, "decode", lambda *a, **kw: calls.append(1) or decode(*a, **kw)
+    )
+
+    for _ in range(5):
+        assert service.verify_token(token)["sub"] == "a@example.com"
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_token_user_is_looked_up_once(service, repository, monkeypatch):
+    """Test resolving the same token repeatedly hits the repository once."""
+    await service.create_user({"email": "a@example.com", "password": "password1"})
+    token = service.create_access_token({"sub": "a@example.com", "role": "user"})
+    lookups = []
+    get_user = repository.get_user_by_email
+
+    async def counting_get_user(email):
+        lookups.append(email)
+        return await get_user(email)
+
+    monkeypatch.setattr(repository, "get_user_by_email", counting_get_user)
+    for _ in range(5):
+        user = await service.get_token_user(token)
+        assert user.email == "a@example.com"
+    assert lookups == ["a@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_deactivation_revokes_tokens_and_blocks_login(service):
+    """Test a deactivated user's token is refused and they cannot log in."""
+    await service.create_user({"email": "a@example.com", "password": "password1"})
+    token = service.create_access_token({"sub": "a@example.com", "role": "user"})
+    assert await service.get_token_user(token) is not None
+
+    assert await service.deactivate_user("a@example.com")
+    with pytest.raises(HTTPException) as exc_info:
+        service.verify_token(token)
+    assert exc_info.value.status_code == 401
+    assert await service.authenticate_user("a@example.com", "password1") is None
+    assert not await service.deactivate_user("missing@example.com")
+
+
+@pytest.mark.asyncio
+async def test_revoke_single_token(service):
+    """Test revoking one token leaves the user's other tokens valid."""
+    first = service.create_access_token({"sub": "a@example.com", "role": "user"})
+    second = service.create_access_token({"sub": "a@example.com", "role": "admin"})
+    service.revoke_token(first)
+
+    with pytest.raises(HTTPException):
+        service.verify_token(first)
+    assert service.verify_token(second)["role"] == "admin"
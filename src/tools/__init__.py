@@ -0,0 +1,3 @@
+"""
+Tools package containing benchmarks and profiling entry points.
+"""
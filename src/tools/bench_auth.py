@@ -0,0 +1,171 @@
+"""
+Benchmark login throughput next to a concurrent identify-style load.
+
+Compares verifying passwords inline on the event loop (the old
+AuthService behaviour) with the offloaded PasswordHasher. The identify
+load stands in for /identify: each request does a little work on the
+loop and waits for a model call on the inference executor.
+
+Usage:
+    python -m src.tools.bench_auth --logins 200 --rounds 12
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List
+
+import bcrypt
+
+from src.services.password_hasher import PasswordHasher
+
+Verify = Callable[[str, str], Awaitable[bool]]
+
+
+async def legacy_verify(password: str, hashed_password: str) -> bool:
+    """Old path: bcrypt runs on the event loop."""
+    return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    return {
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+async def login_load(
+    verify: Verify, hashed: str, logins: int, concurrency: int
+) -> List[float]:
+    latencies: List[float] = []
+    remaining = iter(range(logins))
+
+    async def client():
+        for _ in remaining:
+            start = time.perf_counter()
+            await verify("password", hashed)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies
+
+
+async def identify_load(
+    model: ThreadPoolExecutor, model_ms: float, concurrency: int, stop: asyncio.Event
+) -> List[float]:
+    latencies: List[float] = []
+    loop = asyncio.get_running_loop()
+
+    async def client():
+        while not stop.is_set():
+            start = time.perf_counter()
+            await loop.run_in_executor(model, time.sleep, model_ms / 1000)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies
+
+
+async def scenario(
+    verify: Verify,
+    hashed: str,
+    logins: int,
+    login_concurrency: int,
+    identify_concurrency: int,
+    model_ms: float,
+) -> Dict[str, Dict[str, float]]:
+    model = ThreadPoolExecutor(max_workers=identify_concurrency)
+    stop = asyncio.Event()
+    identify = asyncio.create_task(
+        identify_load(model, model_ms, identify_concurrency, stop)
+    )
+    await asyncio.sleep(0.05)  # let the identify load reach a steady state
+
+    start = time.perf_counter()
+    login_latencies = await login_load(verify, hashed, logins, login_concurrency)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    identify_latencies = await identify
+    model.shutdown()
+    return {
+        "login": summarize(login_latencies, elapsed),
+        "identify": summarize(identify_latencies, elapsed),
+    }
+
+
+async def run(
+    logins: int,
+    rounds: int,
+    workers: int,
+    login_concurrency: int,
+    identify_concurrency: int,
+    model_ms: float,
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    hasher = PasswordHasher(rounds=rounds, workers=workers, max_pending=logins)
+    hashed = await hasher.hash("password")
+    args = (hashed, logins, login_concurrency, identify_concurrency, model_ms)
+    try:
+        return {
+            "inline": await scenario(legacy_verify, *args),
+            "offloaded": await scenario(hasher.verify, *args),
+        }
+    finally:
+        hasher.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt work factor")
+    parser.add_argument("--workers", type=int, default=2, help="password hash threads")
+    parser.add_argument("--login-concurrency", type=int, default=16)
+    parser.add_argument("--identify-concurrency", type=int, default=4)
+    parser.add_argument(
+        "--model-ms", type=float, default=20.0, help="simulated model call"
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(
+        run(
+            args.logins,
+            args.rounds,
+            args.workers,
+            args.login_concurrency,
+            args.identify_concurrency,
+            args.model_ms,
+        )
+    )
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for name, scenario_results in results.items():
+        print(f"[{name}]")
+        for load, metrics in scenario_results.items():
+            line = ", ".join(f"{key}={value:,.1f}" for key, value in metrics.items())
+            print(f"  {load:10s} {line}")
+
+    inline, offloaded = results["inline"]["identify"], results["offloaded"]["identify"]
+    if offloaded["p99_ms"]:
+        print(
+            f"  identify p99 improvement: x{inline['p99_ms'] / offloaded['p99_ms']:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
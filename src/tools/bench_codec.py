@@ -0,0 +1,144 @@
+"""
+Benchmark the repository record codec against the ISO/pydantic path.
+
+Usage:
+    python -m src.tools.bench_codec --records 50000
+"""
+
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Sequence, Type
+
+from pydantic import BaseModel
+
+from src.database.codec import get_codec
+from src.database.models import Attribute, Product, User
+
+
+def make_products(count: int) -> List[Product]:
+    return [
+        Product(
+            id=str(uuid.uuid4()),
+            brand=f"Brand {i % 50}",
+            name=f"Product {i}",
+            category_id=f"category-{i % 20}",
+            price=10.0 + i % 500,
+            source_url=f"https://example.com/products/{i}",
+            image_url=f"https://example.com/images/{i}.jpg",
+            attributes=[
+                Attribute(id=f"color-{i}", name="color", type="color", value="red"),
+                Attribute(
+                    id=f"material-{i}", name="material", type="material", value="cotton"
+                ),
+            ],
+        )
+        for i in range(count)
+    ]
+
+
+def make_users(count: int) -> List[User]:
+    return [
+        User(
+            id=str(uuid.uuid4()),
+            email=f"user{i}@example.com",
+            hashed_password="$2b$12$" + "x" * 53,
+        )
+        for i in range(count)
+    ]
+
+
+# Current repository path: model_dump + isoformat, fromisoformat + validation
+def legacy_encode(record: BaseModel) -> bytes:
+    record_dict = record.model_dump()
+    record_dict["created_at"] = record_dict["created_at"].isoformat()
+    record_dict["updated_at"] = record_dict["updated_at"].isoformat()
+    return json.dumps(record_dict).encode("utf-8")
+
+
+def legacy_decoder(model_cls: Type[BaseModel]) -> Callable[[bytes], BaseModel]:
+    def legacy_decode(data: bytes) -> BaseModel:
+        record_data = json.loads(data)
+        record_data["created_at"] = datetime.fromisoformat(record_data["created_at"])
+        record_data["updated_at"] = datetime.fromisoformat(record_data["updated_at"])
+        return model_cls(**record_data)
+
+    return legacy_decode
+
+
+def measure(func: Callable, items: Sequence, repeat: int) -> float:
+    """Return the best records-per-second over ``repeat`` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return len(items) / best
+
+
+def bench_model(
+    records: Sequence[BaseModel], repeat: int
+) -> Dict[str, Dict[str, float]]:
+    model_cls = type(records[0])
+    codec = get_codec(model_cls)
+    legacy_decode = legacy_decoder(model_cls)
+
+    legacy_blobs = [legacy_encode(record) for record in records]
+    codec_blobs = [codec.encode(record) for record in records]
+
+    return {
+        "legacy": {
+            "encode_rps": measure(legacy_encode, records, repeat),
+            "decode_rps": measure(legacy_decode, legacy_blobs, repeat),
+            "bytes_per_record": sum(map(len, legacy_blobs)) / len(records),
+        },
+        "codec": {
+            "encode_rps": measure(codec.encode, records, repeat),
+            "decode_rps": measure(codec.decode, codec_blobs, repeat),
+            "bytes_per_record": sum(map(len, codec_blobs)) / len(records),
+        },
+        "codec_validated": {
+            "decode_rps": measure(
+                lambda blob: codec.decode(blob, trusted=False), codec_blobs, repeat
+            ),
+        },
+    }
+
+
+def run(records: int, repeat: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    return {
+        "product": bench_model(make_products(records), repeat),
+        "user": bench_model(make_users(records), repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.records, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for model_name, model_results in results.items():
+        print(f"[{model_name}]")
+        for name, metrics in model_results.items():
+            line = ", ".join(f"{key}={value:,.0f}" for key, value in metrics.items())
+            print(f"  {name:16s} {line}")
+
+        legacy, codec = model_results["legacy"], model_results["codec"]
+        print(
+            f"  speedup: encode x{codec['encode_rps'] / legacy['encode_rps']:.2f}, "
+            f"decode x{codec['decode_rps'] / legacy['decode_rps']:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
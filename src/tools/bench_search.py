@@ -0,0 +1,298 @@
+"""
+Benchmark SimilaritySearch on synthetic clustered catalogs.
+
+Each catalog is a set of 768-dimensional vectors drawn around random
+cluster centres, served from an in-memory repository stand-in. For every
+catalog size the benchmark measures index build time, single-query latency
+percentiles, single and batched throughput, index memory and recall@k
+against exact ground truth.
+
+Pass ``--baseline`` with an earlier ``--output`` file to fail (exit code 1)
+when a size regresses by more than ``--threshold``.
+
+Usage:
+    python -m src.tools.bench_search --sizes 10000,100000,1000000 --output search.json
+    python -m src.tools.bench_search --sizes 10000 --baseline search.json --threshold 0.15
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.database.models import Product
+from src.models.similarity_search import SimilaritySearch
+
+EMBEDDING_DIM = 768
+
+# Metrics compared against a baseline, and whether higher is better
+REGRESSION_METRICS = {
+    "build_seconds": False,
+    "p50_ms": False,
+    "p99_ms": False,
+    "qps": True,
+    "batch_qps": True,
+    "recall_at_k": True,
+}
+
+
+class CatalogRepository:
+    """Repository stand-in holding a synthetic catalog in memory.
+
+    Implements only what SimilaritySearch reads: the embedding matrix and
+    products by id.
+    """
+
+    def __init__(self, embeddings: np.ndarray):
+        self.embeddings = embeddings
+        self.product_ids = [f"product-{i}" for i in range(embeddings.shape[0])]
+
+    async def get_all_embeddings(self) -> Tuple[List[str], np.ndarray]:
+        return list(self.product_ids), self.embeddings
+
+    async def get_product(self, product_id: str) -> Optional[Product]:
+        index = int(product_id.rsplit("-", 1)[1])
+        return Product(
+            id=product_id,
+            brand=f"Brand {index % 50}",
+            name=f"Product {index}",
+            category_id=f"category-{index % 20}",
+            price=10.0 + index % 500,
+            source_url=f"https://example.com/products/{index}",
+            image_url=f"https://example.com/images/{index}.jpg",
+        )
+
+
+def make_catalog(
+    size: int,
+    dim: int = EMBEDDING_DIM,
+    clusters: int = 256,
+    spread: float = 0.35,
+    seed: int = 0,
+    chunk: int = 65536,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Clustered float32 vectors and the cluster centres they were drawn around."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim), dtype=np.float32)
+    vectors = np.empty((size, dim), dtype=np.float32)
+    # Fill in chunks so 1M x 768 never needs a float64 temporary
+    for start in range(0, size, chunk):
+        stop = min(size, start + chunk)
+        assignment = rng.integers(0, clusters, stop - start)
+        noise = rng.standard_normal((stop - start, dim), dtype=np.float32)
+        vectors[start:stop] = centres[assignment] + spread * noise
+    return vectors, centres
+
+
+def make_queries(
+    catalog: np.ndarray, count: int, noise: float = 0.2, seed: int = 1
+) -> np.ndarray:
+    """Queries near random catalog items, like a new photo of a known product."""
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, catalog.shape[0], count)
+    jitter = rng.standard_normal((count, catalog.shape[1]), dtype=np.float32)
+    return catalog[picks] + noise * jitter
+
+
+def exact_top_k(
+    catalog: np.ndarray, queries: np.ndarray, k: int, chunk: int = 65536
+) -> np.ndarray:
+    """Indices of the exact top-k cosine neighbours of each query, best first."""
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    best_scores = np.full((queries.shape[0], 0), -np.inf, dtype=np.float32)
+    best_ids = np.empty((queries.shape[0], 0), dtype=np.int64)
+    for start in range(0, catalog.shape[0], chunk):
+        block = catalog[start : start + chunk]
+        block = block / np.linalg.norm(block, axis=1, keepdims=True)
+        scores = np.concatenate([best_scores, queries @ block.T], axis=1)
+        block_ids = np.arange(start, start + block.shape[0])
+        ids = np.concatenate(
+            [best_ids, np.broadcast_to(block_ids, (queries.shape[0], block.shape[0]))],
+            axis=1,
+        )
+        keep = np.argpartition(-scores, min(k, scores.shape[1]) - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, keep, axis=1)
+        best_ids = np.take_along_axis(ids, keep, axis=1)
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    return np.take_along_axis(best_ids, order, axis=1)
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    values = np.asarray(latencies) * 1000
+    return {
+        "p50_ms": float(np.percentile(values, 50)),
+        "p90_ms": float(np.percentile(values, 90)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "mean_ms": float(values.mean()),
+    }
+
+
+async def bench_size(
+    size: int, queries: int, top_k: int, batch_size: int, clusters: int, seed: int
+) -> Dict[str, Any]:
+    catalog, _ = make_catalog(size, clusters=clusters, seed=seed)
+    query_vectors = make_queries(catalog, queries, seed=seed + 1)
+    truth = exact_top_k(catalog, query_vectors, top_k)
+
+    search = SimilaritySearch(CatalogRepository(catalog))  # type: ignore[arg-type]
+    start = time.perf_counter()
+    await search.refresh_index()
+    build_seconds = time.perf_counter() - start
+
+    query_lists = query_vectors.tolist()
+    # One untimed query so first-call costs do not land in the percentiles
+    await search.search(query_lists[0], top_k=top_k)
+
+    latencies, found = [], []
+    start = time.perf_counter()
+    for query in query_lists:
+        query_start = time.perf_counter()
+        results = await search.search(query, top_k=top_k)
+        latencies.append(time.perf_counter() - query_start)
+        found.append([int(r["product"].id.rsplit("-", 1)[1]) for r in results])
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for offset in range(0, len(query_lists), batch_size):
+        await search.search_many(query_lists[offset : offset + batch_size], top_k=top_k)
+    batch_seconds = time.perf_counter() - start
+
+    recall = np.mean(
+        [
+            len(set(ids) & set(expected.tolist())) / top_k
+            for ids, expected in zip(found, truth)
+        ]
+    )
+    return {
+        "catalog_size": size,
+        "build_seconds": build_seconds,
+        **latency_summary(latencies),
+        "qps": len(query_lists) / single_seconds,
+        "batch_qps": len(query_lists) / batch_seconds,
+        "recall_at_k": float(recall),
+        "index_mb": search._index_matrix.nbytes / (1 << 20),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+async def run(
+    sizes: List[int],
+    queries: int,
+    top_k: int,
+    batch_size: int,
+    clusters: int,
+    seed: int,
+) -> Dict[str, Any]:
+    results = []
+    for size in sizes:
+        results.append(
+            await bench_size(size, queries, top_k, batch_size, clusters, seed)
+        )
+    return {
+        "config": {
+            "dim": EMBEDDING_DIM,
+            "queries": queries,
+            "top_k": top_k,
+            "batch_size": batch_size,
+            "clusters": clusters,
+            "seed": seed,
+        },
+        "timestamp": time.time(),
+        "results": results,
+    }
+
+
+def find_regressions(
+    results: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """Metrics that are worse than the baseline by more than ``threshold``.
+
+    Compared per catalog size; sizes missing from the baseline are skipped.
+    """
+    previous = {entry["catalog_size"]: entry for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in results["results"]:
+        before = previous.get(entry["catalog_size"])
+        if before is None:
+            continue
+        for metric, higher_is_better in REGRESSION_METRICS.items():
+            old, new = before.get(metric), entry.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(
+                    f"{entry['catalog_size']}: {metric} {old:,.3f} -> {new:,.3f} ({change:+.1%})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default="10000,100000,1000000",
+        help="Comma-separated catalog sizes (1M vectors need ~7 GB of memory)",
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument(
+        "--batch-size", type=int, default=16, help="queries per search_many"
+    )
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument("--baseline", help="Earlier JSON results to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Allowed relative regression against the baseline (default 10%%)",
+    )
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    results = asyncio.run(
+        run(sizes, args.queries, args.top_k, args.batch_size, args.clusters, args.seed)
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    regressions: List[str] = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.threshold)
+        results["regressions"] = regressions
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for entry in results["results"]:
+            print(f"[{entry['catalog_size']:,} vectors]")
+            for key, value in entry.items():
+                if key != "catalog_size":
+                    print(f"  {key:14s} {value:,.3f}")
+        if args.baseline:
+            print("regressions: " + ("none" if not regressions else ""))
+            for line in regressions:
+                print(f"  {line}")
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,447 @@
+"""
+Load-test /identify, /search/{id} and /auth/login against an in-process app.
+
+The app runs in this process with the local storage backend (SQLite and a
+temporary directory) in place of Firebase, and with a stub model in place of
+FashionDetector. Requests go through httpx's ASGI transport, so there is no
+network or server process, and production services are never touched.
+
+Two stub models are available:
+    stub    fixed detections and random embeddings after ``--model-ms`` of sleep
+    random  a tiny random-weight projection of the decoded pixels, i.e. real
+            decode and compute work on the inference threads
+
+The report covers requests per second, latency percentiles and error rates
+per endpoint, plus event-loop lag. Lag is sampled on the same loop that runs
+both the app and the clients.
+
+Usage:
+    python -m src.tools.loadtest --duration 20 --concurrency 32
+    python -m src.tools.loadtest --mix identify=6,search=3,login=1 --image-sizes 320,640,1280 --json
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+EMBEDDING_DIM = 768
+PASSWORD = "loadtest-password"
+
+
+class StubDetector:
+    """Stands in for FashionDetector without torch.
+
+    ``random`` mode decodes each image, downsamples it and projects the
+    pixels through fixed random weights, so the inference threads do real
+    (if small) work. ``stub`` mode only sleeps for ``model_ms``.
+    """
+
+    def __init__(self, mode: str = "stub", model_ms: float = 10.0, seed: int = 0):
+        self.mode = mode
+        self.model_ms = model_ms
+        rng = np.random.default_rng(seed)
+        self._weights = rng.standard_normal(
+            (EMBEDDING_DIM, 32 * 32 * 3), dtype=np.float32
+        )
+        self._weights /= np.sqrt(self._weights.shape[1])
+        self._rng = np.random.default_rng(seed + 1)
+
+    def load(self) -> "StubDetector":
+        return self
+
+    def check_status(self) -> Dict[str, Any]:
+        return {"status": "healthy", "details": {"model": f"loadtest-{self.mode}"}}
+
+    def forward(self, image_data) -> List[Dict[str, Any]]:
+        self._work()
+        width, height = self._size(image_data)
+        return [
+            {"box": [0.0, 0.0, width / 2, height / 2], "confidence": 0.91},
+            {"box": [width / 4, height / 4, width, height], "confidence": 0.74},
+        ]
+
+    def forward_batch(self, images) -> List[List[Dict[str, Any]]]:
+        return [self.forward(image) for image in images]
+
+    def get_embeddings(self, image_data) -> List[float]:
+        self._work()
+        if self.mode == "random":
+            pixels = self._load(image_data).resize((32, 32))
+            x = np.asarray(pixels, dtype=np.float32).reshape(-1) / 255.0
+            return np.tanh(self._weights @ (x - 0.5)).tolist()
+        return self._rng.standard_normal(EMBEDDING_DIM).tolist()
+
+    def get_embeddings_batch(self, images) -> List[List[float]]:
+        return [self.get_embeddings(image) for image in images]
+
+    def _work(self) -> None:
+        if self.model_ms > 0:
+            time.sleep(self.model_ms / 1000)
+
+    @staticmethod
+    def _load(image_data) -> Image.Image:
+        if isinstance(image_data, np.ndarray):
+            return Image.fromarray(image_data).convert("RGB")
+        return Image.open(io.BytesIO(image_data)).convert("RGB")
+
+    def _size(self, image_data) -> Tuple[int, int]:
+        if self.mode == "random":
+            return self._load(image_data).size
+        # Only the header is parsed
+        return Image.open(io.BytesIO(image_data)).size
+
+
+def make_images(sizes: List[int], per_size: int, seed: int) -> List[Tuple[int, bytes]]:
+    """JPEG uploads of the given edge lengths: gradients plus noise."""
+    rng = np.random.default_rng(seed)
+    images = []
+    for size in sizes:
+        for _ in range(per_size):
+            ramp = np.linspace(0, 255, size, dtype=np.float32)
+            base = (ramp[None, :, None] + ramp[:, None, None] * rng.random(3)) / 2
+            noise = rng.normal(0, 12, (size, size, 3))
+            pixels = np.clip(base + noise, 0, 255).astype(np.uint8)
+            buffer = io.BytesIO()
+            Image.fromarray(pixels).save(buffer, format="JPEG", quality=85)
+            images.append((size, buffer.getvalue()))
+    return images
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ("identify", "search", "login"):
+            raise ValueError(f"Unknown operation in mix: {name}")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50_ms": 0.0, "p90_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ms = np.asarray(values) * 1000
+    return {
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p90_ms": float(np.percentile(ms, 90)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a sleeping task."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+
+class LoadTest:
+    def __init__(
+        self,
+        client,
+        users: List[Dict[str, Any]],
+        images: List[Tuple[int, bytes]],
+        mix: Dict[str, float],
+        seed: int,
+    ):
+        self.client = client
+        self.users = users
+        self.images = images
+        self.operations = list(mix)
+        self.weights = [mix[name] for name in self.operations]
+        self.random = random.Random(seed)
+        self.query_ids: List[str] = []
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    async def run(self, concurrency: int, duration: float) -> float:
+        deadline = time.perf_counter() + duration
+        start = time.perf_counter()
+        await asyncio.gather(*(self._client(deadline) for _ in range(concurrency)))
+        return time.perf_counter() - start
+
+    async def _client(self, deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            operation = self.random.choices(self.operations, self.weights)[0]
+            if operation == "search" and not self.query_ids:
+                operation = "identify"
+            user = self.random.choice(self.users)
+            name, request = getattr(self, f"_{operation}")(user)
+
+            start = time.perf_counter()
+            try:
+                response = await request
+                outcome = str(response.status_code)
+            except Exception as e:
+                response, outcome = None, type(e).__name__
+            self.latencies[name].append(time.perf_counter() - start)
+            self.statuses[name][outcome] += 1
+            # In-process requests that fail fast (429, 503) never suspend, so
+            # without this a client could hold the loop the way no network
+            # client can
+            await asyncio.sleep(0)
+
+            if (
+                name.startswith("identify")
+                and response is not None
+                and response.status_code == 200
+            ):
+                self.query_ids.append(response.json()["query_id"])
+                # Keep the pool bounded; recent results exercise the cache
+                del self.query_ids[:-1000]
+
+    def _identify(self, user: Dict[str, str]):
+        size, image = self.random.choice(self.images)
+        request = self.client.post(
+            "/api/v1/identify",
+            files={"file": ("load.jpg", image, "image/jpeg")},
+            headers=user["headers"],
+        )
+        return f"identify@{size}", request
+
+    def _search(self, user: Dict[str, str]):
+        query_id = self.random.choice(self.query_ids)
+        return "search", self.client.get(
+            f"/api/v1/search/{query_id}", headers=user["headers"]
+        )
+
+    def _login(self, user: Dict[str, str]):
+        request = self.client.post(
+            "/api/v1/auth/login", data={"username": user["email"], "password": PASSWORD}
+        )
+        return "login", request
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        endpoints = {}
+        total = errors = 0
+        for name in sorted(self.latencies):
+            statuses = dict(self.statuses[name])
+            count = sum(statuses.values())
+            failed = sum(
+                n for status, n in statuses.items() if not status.startswith(("2", "3"))
+            )
+            total += count
+            errors += failed
+            endpoints[name] = {
+                "requests": count,
+                "rps": count / elapsed,
+                "error_rate": failed / count if count else 0.0,
+                **percentiles(self.latencies[name]),
+                "statuses": statuses,
+            }
+        return {
+            "elapsed_seconds": elapsed,
+            "requests": total,
+            "rps": total / elapsed if elapsed else 0.0,
+            "error_rate": errors / total if total else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+def configure_environment(args: argparse.Namespace) -> str:
+    """Point settings at throwaway local storage before the app is imported."""
+    storage_dir = tempfile.mkdtemp(prefix="loadtest-")
+    os.environ["APP_STORAGE_BACKEND"] = "local"
+    os.environ["APP_LOCAL_STORAGE_DIR"] = storage_dir
+    os.environ["APP_PROCESS_ROLE"] = "all"
+    os.environ["APP_INFERENCE_MODE"] = "local"
+    os.environ["APP_LOG_LEVEL"] = args.log_level
+    if not args.keep_rate_limits:
+        os.environ["APP_MAX_REQUESTS_PER_MINUTE"] = str(10**9)
+    if args.bcrypt_rounds is not None:
+        os.environ["APP_BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    return storage_dir
+
+
+async def seed_catalog(repository, count: int, seed: int) -> None:
+    """Products with random embeddings, so searches have something to rank."""
+    from src.database.models import Product
+
+    rng = np.random.default_rng(seed)
+    for i in range(count):
+        product_id = f"loadtest-{i}"
+        await repository.create_product(
+            Product(
+                id=product_id,
+                brand=f"Brand {i % 20}",
+                name=f"Product {i}",
+                category_id=f"category-{i % 10}",
+                price=10.0 + i % 200,
+                source_url=f"https://example.com/products/{i}",
+                image_url=f"https://example.com/images/{i}.jpg",
+            )
+        )
+        await repository.upload_embedding(
+            product_id, rng.standard_normal(EMBEDDING_DIM).tolist()
+        )
+
+
+async def create_users(client, count: int) -> List[Dict[str, Any]]:
+    users = []
+    for i in range(count):
+        email = f"loadtest-{i}@example.com"
+        response = await client.post(
+            "/api/v1/auth/register", json={"email": email, "password": PASSWORD}
+        )
+        response.raise_for_status()
+        response = await client.post(
+            "/api/v1/auth/login", data={"username": email, "password": PASSWORD}
+        )
+        response.raise_for_status()
+        token = response.json()["access_token"]
+        users.append({"email": email, "headers": {"Authorization": f"Bearer {token}"}})
+    return users
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+
+    from src.api import endpoints
+    from src.main import app
+
+    # Swap the model before startup loads it
+    stub = StubDetector(args.model, args.model_ms, args.seed)
+    endpoints.detector = stub
+    endpoints.image_processor.fashion_detector = stub  # type: ignore[assignment]
+
+    await seed_catalog(endpoints.repository, args.catalog, args.seed)
+    images = make_images(args.image_sizes, per_size=4, seed=args.seed)
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://loadtest", timeout=args.timeout
+        ) as client:
+            users = await create_users(client, args.users)
+            load = LoadTest(client, users, images, parse_mix(args.mix), args.seed)
+
+            if args.warmup > 0:
+                await load.run(min(args.concurrency, 4), args.warmup)
+                load = LoadTest(client, users, images, parse_mix(args.mix), args.seed)
+
+            monitor = LoopLagMonitor()
+            monitor.start()
+            elapsed = await load.run(args.concurrency, args.duration)
+            await monitor.stop()
+
+    results = load.report(elapsed)
+    results["loop_lag"] = {
+        **percentiles(monitor.samples),
+        "samples": len(monitor.samples),
+    }
+    results["config"] = {
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "mix": parse_mix(args.mix),
+        "image_sizes": args.image_sizes,
+        "model": args.model,
+        "model_ms": args.model_ms,
+        "users": args.users,
+        "catalog": args.catalog,
+        "seed": args.seed,
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="seconds of measured load"
+    )
+    parser.add_argument(
+        "--warmup", type=float, default=1.0, help="seconds of unmeasured load first"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=16, help="concurrent clients"
+    )
+    parser.add_argument(
+        "--mix",
+        default="identify=6,search=3,login=1",
+        help="relative operation weights",
+    )
+    parser.add_argument(
+        "--image-sizes",
+        type=lambda value: [int(v) for v in value.split(",")],
+        default=[320, 640, 1280],
+        help="edge lengths of the uploaded JPEGs",
+    )
+    parser.add_argument("--model", choices=("stub", "random"), default="stub")
+    parser.add_argument(
+        "--model-ms", type=float, default=10.0, help="simulated model time per call"
+    )
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument(
+        "--catalog", type=int, default=2000, help="products in the search index"
+    )
+    parser.add_argument("--bcrypt-rounds", type=int, help="override APP_BCRYPT_ROUNDS")
+    parser.add_argument(
+        "--keep-rate-limits",
+        action="store_true",
+        help="Do not lift the per-client rate limit",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=60.0, help="per-request timeout"
+    )
+    parser.add_argument(
+        "--log-level",
+        default="WARNING",
+        help="app log level; per-request INFO logs skew results",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{results['requests']:,} requests in {results['elapsed_seconds']:.1f}s: "
+        f"{results['rps']:,.1f} rps, {results['error_rate']:.2%} errors"
+    )
+    for name, metrics in results["endpoints"].items():
+        statuses = " ".join(
+            f"{status}={n}" for status, n in sorted(metrics["statuses"].items())
+        )
+        print(
+            f"  {name:16s} rps={metrics['rps']:8,.1f} p50={metrics['p50_ms']:8.1f}ms "
+            f"p99={metrics['p99_ms']:8.1f}ms errors={metrics['error_rate']:6.2%}  {statuses}"
+        )
+    lag = results["loop_lag"]
+    print(
+        f"  event loop lag   p50={lag['p50_ms']:.1f}ms p99={lag['p99_ms']:.1f}ms "
+        f"max={lag['max_ms']:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
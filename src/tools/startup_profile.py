@@ -0,0 +1,205 @@
+"""
+Profile a cold start of the API, phase by phase.
+
+Boots the app the way uvicorn does (imports, Firebase init, lifespan
+startup) with timers around each phase, then warms the models up with one
+health probe. Prints a phase breakdown with the peak RSS after each phase.
+Run it in a fresh process: anything already imported is not measured.
+
+Usage:
+    python -m src.tools.startup_profile
+    python -m src.tools.startup_profile --json --output startup.jsonl
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+START = time.perf_counter()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+class StartupProfiler:
+    """Nested phase timers. A phase started inside another is its child."""
+
+    def __init__(self):
+        self.phases: List[Dict[str, Any]] = []
+        self._stack: List[str] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        record: Dict[str, Any] = {
+            "name": name,
+            "parent": self._stack[-1] if self._stack else None,
+            "depth": len(self._stack),
+            "offset": time.perf_counter() - START,
+        }
+        self.phases.append(record)
+        self._stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {str(e)}"
+            raise
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            record["peak_rss_mb"] = peak_rss_mb()
+            self._stack.pop()
+
+    def wrap(self, owner: Any, attribute: str, name: Optional[str] = None) -> None:
+        """Time the first call to ``owner.attribute`` as a phase.
+
+        Later calls (e.g. ``load`` on an already loaded detector) are not
+        part of the cold start and are passed straight through.
+        """
+        original: Callable = getattr(owner, attribute)
+        phase_name = name or f"{getattr(owner, '__name__', owner)}.{attribute}"
+        called = False
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            nonlocal called
+            if called:
+                return original(*args, **kwargs)
+            called = True
+            with self.phase(phase_name):
+                return original(*args, **kwargs)
+
+        setattr(owner, attribute, timed)
+
+
+def _skip_model_load(*args, **kwargs) -> None:
+    return None
+
+
+def _skipped_status(*args, **kwargs) -> Dict[str, Any]:
+    return {"status": "skipped"}
+
+
+async def _boot(profiler: StartupProfiler, app, endpoints, warmup: bool) -> None:
+    async with app.router.lifespan_context(app):
+        if endpoints is not None and warmup:
+            with profiler.phase("model_warmup"):
+                # The first status check runs one forward pass of each model
+                loop = asyncio.get_running_loop()
+                status = await loop.run_in_executor(
+                    endpoints.inference_executor, endpoints.detector.check_status
+                )
+            if status.get("status") != "healthy":
+                print(f"Model warm-up reported: {status}", file=sys.stderr)
+
+
+def profile(load_models: bool = True, warmup: bool = True) -> Dict[str, Any]:
+    profiler = StartupProfiler()
+
+    with profiler.phase("total"):
+        with profiler.phase("import_framework"):
+            import fastapi  # noqa: F401
+
+        with profiler.phase("import_settings"):
+            from src.utils.config import settings
+
+        serve_inference = settings.PROCESS_ROLE == "all"
+        load_models = load_models and serve_inference
+        local_models = load_models and settings.INFERENCE_MODE.lower() == "local"
+
+        if settings.STORAGE_BACKEND == "firebase":
+            with profiler.phase("import_firebase"):
+                from src.utils import firebase_config
+            # src.main calls these at import time, so patch them first
+            profiler.wrap(firebase_config, "initialize_firebase", "initialize_firebase")
+            profiler.wrap(firebase_config, "get_secret", "secret_fetch")
+
+        with profiler.phase("import_auth_router"):
+            import src.api.auth  # noqa: F401
+
+        endpoints: Any = None
+        if serve_inference:
+            with profiler.phase("import_endpoints"):
+                from src.api import endpoints
+
+            detector = endpoints.detector
+            if not load_models:
+                detector.load = _skip_model_load
+                detector.check_status = _skipped_status
+            else:
+                profiler.wrap(detector, "load", "model_load")
+                if local_models:
+                    # Normally done inside model_load; split out so the
+                    # torch/transformers import shows up on its own
+                    with profiler.phase("import_torch"):
+                        from src.models import fashion_detector
+                    profiler.wrap(
+                        fashion_detector.FashionDetector,
+                        "__init__",
+                        "FashionDetector.__init__",
+                    )
+
+        with profiler.phase("import_main"):
+            from src.main import app
+
+        with profiler.phase("lifespan_startup"):
+            asyncio.run(_boot(profiler, app, endpoints, warmup and load_models))
+
+    return {
+        "timestamp": time.time(),
+        "python": sys.version.split()[0],
+        "process_role": settings.PROCESS_ROLE,
+        "storage_backend": settings.STORAGE_BACKEND,
+        "inference_mode": settings.INFERENCE_MODE,
+        "models_loaded": load_models,
+        "total_seconds": profiler.phases[0]["seconds"],
+        "peak_rss_mb": peak_rss_mb(),
+        "phases": profiler.phases,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--skip-models", action="store_true", help="Do not load or warm up the models"
+    )
+    parser.add_argument(
+        "--no-warmup", action="store_true", help="Skip the model warm-up"
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument(
+        "--output", help="Append the JSON result as one line to this file"
+    )
+    args = parser.parse_args()
+
+    results = profile(load_models=not args.skip_models, warmup=not args.no_warmup)
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(results) + "\n")
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    total = results["total_seconds"]
+    print(f"{'phase':40s} {'seconds':>9s} {'share':>7s} {'peak MB':>9s}")
+    for phase in results["phases"]:
+        name = "  " * phase["depth"] + phase["name"]
+        share = phase["seconds"] / total * 100 if total else 0.0
+        line = f"{name:40s} {phase['seconds']:9.3f} {share:6.1f}% {phase['peak_rss_mb']:9.1f}"
+        if "error" in phase:
+            line += f"  ({phase['error']})"
+        print(line)
+    print(f"peak RSS: {results['peak_rss_mb']:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
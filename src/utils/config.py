@@ -15,6 +15,7 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     PORT: int = 8000
     LOG_LEVEL: str = "INFO"
+    PROCESS_ROLE: str = "all"  # or "auth": serve /auth only, never load the ML stack
 
     # Authentication Settings
     SECRET_KEY: str = "your-secret-key-here"  # Change this in production
@@ -23,6 +24,13 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     PASSWORD_MIN_LENGTH: int = 8
     PASSWORD_MAX_LENGTH: int = 100
+    BCRYPT_ROUNDS: int = 12  # work factor; each step doubles hashing cost
+    PASSWORD_HASH_WORKERS: int = 2  # threads hashing or verifying passwords at once
+    PASSWORD_HASH_MAX_PENDING: int = 32  # waiting hash jobs before logins are shed
+    TOKEN_CACHE_SIZE: int = 10000  # verified tokens kept until they expire
+    API_KEY_CACHE_SIZE: int = 10000  # API key records kept in memory
+    API_KEY_CACHE_TTL: float = 60.0  # seconds before a cached key is re-read
+    API_KEY_ROTATION_GRACE: int = 86400  # seconds a rotated key keeps working
 
     # CORS Settings
     CORS_ORIGINS: List[str] = ["*"]
@@ -33,8 +41,19 @@ class Settings(BaseSettings):
     # Security Settings
     ALLOWED_HOSTS: List[str] = ["*"]
     MAX_REQUESTS_PER_MINUTE: int = 60
+    RATE_LIMIT_BACKEND: str = "memory"  # or "redis" to share limits across workers
+    RATE_LIMIT_STORE_URL: str = "redis://localhost:6379/0"
     ENABLE_HTTPS_REDIRECT: bool = False
 
+    # Secrets Settings
+    SECRETS_PROVIDER: str = "gcp"  # "gcp" (Secret Manager), "env" or "file"
+    SECRETS_DIR: str = "/run/secrets"  # one file per secret, for the file provider
+    SECRET_CACHE_TTL: float = 3600.0  # seconds a fetched secret is reused
+    SECRET_CACHE_DIR: Optional[str] = None  # encrypted on-disk cache for fast restarts
+    SECRET_CACHE_KEY: Optional[str] = (
+        None  # Fernet key; the disk cache is off without it
+    )
+
     # Firebase Settings
     FIREBASE_DATABASE_URL: str = "https://bubbleit-dev-default-rtdb.firebaseio.com"
     FIREBASE_STORAGE_BUCKET: str = "bubbleit-dev.firebasestorage.app"
@@ -42,11 +61,73 @@ class Settings(BaseSettings):
 
     # Model Settings
     MODEL_DEVICE: str = "cuda"  # or "cpu"
+    MODEL_BUNDLE_DIR: Optional[str] = None  # built by scripts/download_models.py
+    MODEL_BUNDLE_VERIFY: bool = False  # checksum every weight file at startup
     CONFIDENCE_THRESHOLD: float = 0.7
 
+    # Inference Settings
+    INFERENCE_WORKERS: int = 2  # concurrent model executions
+    JOB_QUEUE_MAX_SIZE: int = 100  # queued async /identify jobs
+    JOB_RETENTION: int = 10000  # finished job statuses kept for polling
+    JOB_MAX_WAIT: float = 30.0  # seconds, long-poll cap
+
+    # Inference Worker Settings (APP_INFERENCE_MODE=remote)
+    INFERENCE_MODE: str = (
+        "local"  # or "remote": models run in inference worker processes
+    )
+    INFERENCE_SOCKETS: List[str] = ["/tmp/gate-release-inference.sock"]
+    INFERENCE_RPC_TIMEOUT: float = 30.0  # seconds per model call
+    INFERENCE_BATCH_SIZE: int = 16  # images per batched model pass in a worker
+    INFERENCE_BATCH_WAIT: float = 0.005  # seconds a worker waits to fill a batch
+
+    # Inference Scheduling Settings (deficit round-robin across tenants)
+    SCHEDULER_QUANTUM: float = 0.05  # seconds of compute per unit weight per round
+    SCHEDULER_ROLE_WEIGHTS: Dict[str, float] = {
+        "admin": 2.0,
+        "user": 2.0,
+        "service": 1.0,
+    }
+    SCHEDULER_ROLE_PRIORITIES: Dict[str, int] = {
+        "admin": 0,
+        "user": 0,
+        "service": 1,
+    }  # lower runs first
+    SCHEDULER_MAX_STARVATION: float = (
+        5.0  # seconds before lower priorities are served anyway
+    )
+
+    # Admission Control Settings (synchronous inference endpoints)
+    ADMISSION_MAX_IN_FLIGHT: int = 4  # requests running the pipeline at once
+    ADMISSION_MAX_QUEUE: int = 16  # requests waiting for a slot
+    ADMISSION_MAX_WAIT: float = 5.0  # seconds, longest expected or actual wait
+
+    # Health Check Settings
+    HEALTH_CHECK_INTERVAL: float = 15.0  # seconds between background probes
+    HEALTH_CHECK_TIMEOUT: float = 5.0  # seconds per component check
+
+    # Similarity Search Settings
+    PRODUCT_CACHE_SIZE: int = 1024  # hydrated products kept in memory
+    SEARCH_INDEX_REFRESH_INTERVAL: float = 300.0  # seconds, 0 disables the reload
+
+    # Search Result Cache Settings
+    SEARCH_CACHE_SIZE: int = 1024  # serialized results kept in memory
+    SEARCH_CACHE_MAX_BYTES: int = 16 * 1024 * 1024  # 16MB
+    SEARCH_CACHE_MAX_AGE: int = 86400  # seconds, Cache-Control max-age
+
     # Storage Settings
+    STORAGE_BACKEND: str = "firebase"  # or "local"
+    LOCAL_STORAGE_DIR: str = "local_storage"
     UPLOAD_DIR: str = "uploads"
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
+    MAX_BATCH_IMAGES: int = 10  # images per /identify/batch request
+
+    # Search Result Persistence Settings
+    SEARCH_WRITE_BATCH_SIZE: int = 50
+    SEARCH_WRITE_MAX_PENDING: int = 1000
+    SEARCH_WRITE_FLUSH_INTERVAL: float = 0.5  # seconds
+    SEARCH_WRITE_MAX_RETRIES: int = 5
+    SEARCH_WRITE_RETRY_BACKOFF: float = 0.5  # seconds, doubled per attempt
+    SEARCH_WRITE_MAX_BACKOFF: float = 10.0  # seconds
 
     # Compression Settings
     GZIP_MIN_SIZE: int = 1000  # bytes
@@ -56,7 +137,12 @@ class Settings(BaseSettings):
     DEEPSEEK_API_KEY: Optional[str] = None
 
     @field_validator(
-        "CORS_ORIGINS", "CORS_METHODS", "CORS_HEADERS", "ALLOWED_HOSTS", mode="before"
+        "CORS_ORIGINS",
+        "CORS_METHODS",
+        "CORS_HEADERS",
+        "ALLOWED_HOSTS",
+        "INFERENCE_SOCKETS",
+        mode="before",
     )
     @classmethod
     def parse_list(cls, v):
@@ -69,6 +155,14 @@ class Settings(BaseSettings):
                 return [x.strip() for x in v.split(",")]
         return v
 
+    @field_validator("STORAGE_BACKEND", mode="before")
+    @classmethod
+    def normalize_backend(cls, v):
+        # Compared by name across the app, so accept "Firebase", " local ", ...
+        if isinstance(v, str):
+            return v.strip().lower()
+        return v
+
     @field_validator("FIREBASE_SERVICE_ACCOUNT", mode="before")
     @classmethod
     def parse_service_account(cls, v):
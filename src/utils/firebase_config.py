@@ -25,15 +25,21 @@ def initialize_firebase():
             return False
 
         try:
-            # Get service account from Secret Manager
-            service_account_info = get_secret(
-                project_id=project_id, secret_id="firebase-service-account"
-            )
+            if settings.FIREBASE_SERVICE_ACCOUNT:
+                # Provided directly, e.g. offline or in CI
+                service_account_info = settings.FIREBASE_SERVICE_ACCOUNT
+                source = "settings"
+            else:
+                # Cached by the secret store, so restarts rarely reach the provider
+                service_account_info = get_secret(
+                    project_id=project_id, secret_id="firebase-service-account"
+                )
+                source = f"the {settings.SECRETS_PROVIDER} secrets provider"
 
             cred = credentials.Certificate(service_account_info)
-            logger.info("Using credentials from Secret Manager")
+            logger.info(f"Using credentials from {source}")
         except Exception as e:
-            logger.error(f"Error creating credentials from Secret Manager: {e}")
+            logger.error(f"Error creating Firebase credentials: {e}")
             return False
 
         # Initialize the app
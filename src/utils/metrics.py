@@ -0,0 +1,452 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Updates are lock-free: every metric child keeps one shard per thread and a
+thread only ever writes its own shard, so the hot path is a thread-local
+lookup and a few list increments. Shards are summed when metrics are
+collected, which happens once per scrape.
+"""
+
+import functools
+import inspect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import (
+    Callable,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class _Sharded:
+    """Per-thread list of floats, summed on read."""
+
+    def __init__(self, width: int):
+        self._width = width
+        self._local = threading.local()
+        self._shards: List[List[float]] = []
+
+    def _shard(self) -> List[float]:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = [0.0] * self._width
+            self._local.shard = shard
+            # list.append is atomic, so no lock is needed to register it
+            self._shards.append(shard)
+            return shard
+
+    def _totals(self) -> List[float]:
+        totals = [0.0] * self._width
+        for shard in list(self._shards):
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+
+class CounterChild(_Sharded):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._shard()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._totals()[0]
+
+
+class GaugeChild(_Sharded):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._shard()[0] += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._shard()[0] -= amount
+
+    @contextmanager
+    def track_inprogress(self) -> Iterator[None]:
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+    @property
+    def value(self) -> float:
+        return self._totals()[0]
+
+
+class HistogramChild(_Sharded):
+    def __init__(self, buckets: Sequence[float]):
+        # Slots: one per bucket, one for +Inf, then count and sum
+        super().__init__(len(buckets) + 3)
+        self._buckets = buckets
+
+    def observe(self, value: float) -> None:
+        shard = self._shard()
+        shard[bisect_left(self._buckets, value)] += 1
+        shard[-2] += 1
+        shard[-1] += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """Cumulative bucket counts (including +Inf), count and sum."""
+        totals = self._totals()
+        cumulative, running = [], 0.0
+        for count in totals[:-2]:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-2], totals[-1]
+
+
+ChildT = TypeVar("ChildT", bound=_Sharded)
+MetricT = TypeVar("MetricT", bound="Metric")
+
+
+class Metric(ABC, Generic[ChildT]):
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], ChildT] = {}
+
+    def labels(self, *values: str) -> ChildT:
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name} expects labels {self.labelnames}, got {values}"
+                )
+            # setdefault keeps the first child if two threads race here
+            child = self._children.setdefault(key, self._new_child())
+        return child
+
+    @abstractmethod
+    def _new_child(self) -> ChildT:
+        """A fresh child holding one label combination's values."""
+
+    def _default(self) -> ChildT:
+        return self.labels()
+
+    def collect(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for key, child in sorted(list(self._children.items())):
+            lines.extend(self._samples(_format_labels(self.labelnames, key), child))
+        return lines
+
+    def _samples(self, labels: str, child) -> List[str]:
+        return [f"{self.name}{labels} {_format_value(child.value)}"]
+
+
+class Counter(Metric[CounterChild]):
+    type_name = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+
+class Gauge(Metric[GaugeChild]):
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        function: Optional[Callable[[], float]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def track_inprogress(self):
+        return self._default().track_inprogress()
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the gauge's value from ``function`` at collection time."""
+        self.function = function
+
+    def collect(self) -> List[str]:
+        if self.function is None:
+            return super().collect()
+        try:
+            value = float(self.function())
+        except Exception:
+            value = math.nan
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {_format_value(value)}",
+        ]
+
+
+class Histogram(Metric[HistogramChild]):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def _samples(self, labels: str, child: HistogramChild) -> List[str]:
+        cumulative, count, total = child.snapshot()
+        lines = []
+        bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+        for bound, value in zip(bounds, cumulative):
+            bucket_labels = _join_labels(labels, f'le="{bound}"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {_format_value(value)}")
+        lines.append(f"{self.name}_count{labels} {_format_value(count)}")
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: MetricT) -> MetricT:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric {metric.name} already registered")
+                return cast(MetricT, existing)
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        function: Optional[Callable[[], float]] = None,
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, function))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _join_labels(labels: str, extra: str) -> str:
+    if not labels:
+        return "{" + extra + "}"
+    return labels[:-1] + "," + extra + "}"
+
+
+def timed(histogram: Histogram, errors: Optional[Counter] = None):
+    """Decorator recording a function's duration labelled with its name.
+
+    Works for both coroutines and plain functions.
+    """
+
+    def decorator(func):
+        child = histogram.labels(func.__name__)
+        error_child = errors.labels(func.__name__) if errors is not None else None
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    if error_child is not None:
+                        error_child.inc()
+                    raise
+                finally:
+                    child.observe(time.perf_counter() - start)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                if error_child is not None:
+                    error_child.inc()
+                raise
+            finally:
+                child.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+REGISTRY = MetricsRegistry()
+
+# Image pipeline
+PIPELINE_STAGE_SECONDS = REGISTRY.histogram(
+    "pipeline_stage_seconds",
+    "Time spent in each image pipeline stage.",
+    ["stage"],
+)
+PIPELINE_SECONDS = REGISTRY.histogram(
+    "pipeline_seconds",
+    "End-to-end image processing time.",
+    ["mode"],
+)
+PIPELINE_IMAGES = REGISTRY.counter(
+    "pipeline_images_total",
+    "Images processed, by outcome.",
+    ["mode", "outcome"],
+)
+PIPELINE_IN_FLIGHT = REGISTRY.gauge(
+    "pipeline_in_flight",
+    "Image processing calls currently running.",
+    ["mode"],
+)
+
+# Repository
+REPOSITORY_OPERATION_SECONDS = REGISTRY.histogram(
+    "repository_operation_seconds",
+    "Repository call latency.",
+    ["operation"],
+)
+REPOSITORY_ERRORS = REGISTRY.counter(
+    "repository_errors_total",
+    "Repository calls that raised.",
+    ["operation"],
+)
+
+# Caches
+CACHE_REQUESTS = REGISTRY.counter(
+    "cache_requests_total",
+    "Cache lookups, by cache and result (hit or miss).",
+    ["cache", "result"],
+)
+
+
+def cache_hit_ratio(cache: str) -> float:
+    """Lifetime hit ratio of a cache from its lookup counters."""
+    hits = CACHE_REQUESTS.labels(cache, "hit").value
+    misses = CACHE_REQUESTS.labels(cache, "miss").value
+    total = hits + misses
+    return hits / total if total else 0.0
+
+
+PRODUCT_CACHE_HIT_RATIO = REGISTRY.gauge(
+    "product_cache_hit_ratio",
+    "Share of product hydrations served from the in-memory cache.",
+    function=lambda: cache_hit_ratio("products"),
+)
+SEARCH_CACHE_HIT_RATIO = REGISTRY.gauge(
+    "search_cache_hit_ratio",
+    "Share of search result reads served from the response cache.",
+    function=lambda: cache_hit_ratio("search_results"),
+)
+
+repository_operation = timed(REPOSITORY_OPERATION_SECONDS, REPOSITORY_ERRORS)
@@ -0,0 +1,35 @@
+from typing import Optional
+
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+
+
+def detect_content_type(data: bytes, fallback: Optional[str] = None) -> str:
+    """Detect an image MIME type from its magic bytes.
+
+    Args:
+        data: file content (only the first few bytes are inspected)
+        fallback: type to use when the content is not recognised
+
+    Returns:
+        str: the detected MIME type
+    """
+    header = data[:32]
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if header.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    if header.startswith(b"BM"):
+        return "image/bmp"
+    if header.startswith((b"II*\x00", b"MM\x00*")):
+        return "image/tiff"
+    if header[4:8] == b"ftyp":
+        brand = header[8:12]
+        if brand in (b"avif", b"avis"):
+            return "image/avif"
+        if brand in (b"heic", b"heix", b"hevc", b"hevx", b"mif1", b"msf1"):
+            return "image/heic"
+    return fallback or DEFAULT_CONTENT_TYPE
@@ -1,19 +1,253 @@
-import json
+import hashlib
 import logging
-from typing import Any, Dict
-
-import google.cloud.secretmanager as secretmanager
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from src.utils.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+class SecretProvider(ABC):
+    """Source of raw secret payloads."""
+
+    @abstractmethod
+    def fetch(self, project_id: str, secret_id: str, version: str = "latest") -> str:
+        """Return the secret payload as text."""
+
+
+class SecretManagerProvider(SecretProvider):
+    """Google Secret Manager with one client for the whole process.
+
+    Creating a client sets up a gRPC channel and credentials, which costs
+    far more than the lookup itself, so it is built once and reused.
+    """
+
+    def __init__(self, client_factory: Optional[Callable[[], Any]] = None):
+        self._client_factory = client_factory
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    def _create_client(self):
+        if self._client_factory is not None:
+            return self._client_factory()
+        # Imported lazily: the env and file providers do not need the SDK
+        import google.cloud.secretmanager as secretmanager
+
+        return secretmanager.SecretManagerServiceClient()
+
+    def fetch(self, project_id: str, secret_id: str, version: str = "latest") -> str:
+        name = self.client.secret_version_path(project_id, secret_id, version)
+        logger.info(
+            f"Attempting to access secret: {secret_id} from project: {project_id}"
+        )
+        response = self.client.access_secret_version(name=name)
+        return response.payload.data.decode("UTF-8")
+
+
+class EnvSecretProvider(SecretProvider):
+    """Secrets from environment variables, e.g. ``APP_SECRET_FIREBASE_SERVICE_ACCOUNT``."""
+
+    def __init__(self, prefix: str = "APP_SECRET_"):
+        self.prefix = prefix
+
+    def variable(self, secret_id: str) -> str:
+        return self.prefix + secret_id.upper().replace("-", "_")
+
+    def fetch(self, project_id: str, secret_id: str, version: str = "latest") -> str:
+        name = self.variable(secret_id)
+        value = os.environ.get(name)
+        if value is None:
+            raise KeyError(f"Secret {secret_id} not set; expected {name}")
+        return value
+
+
+class FileSecretProvider(SecretProvider):
+    """Secrets from one file per secret, as mounted by Docker or Kubernetes."""
+
+    def __init__(self, directory: str = settings.SECRETS_DIR):
+        self.directory = Path(directory)
+
+    def fetch(self, project_id: str, secret_id: str, version: str = "latest") -> str:
+        path = self.directory / secret_id
+        if not path.is_file():
+            raise KeyError(f"Secret {secret_id} not found at {path}")
+        return path.read_text(encoding="utf-8")
+
+
+class EncryptedDiskCache:
+    """Secrets encrypted with Fernet on local disk, so restarts skip the fetch."""
+
+    def __init__(self, directory: str, key: str):
+        # Imported lazily: only needed when the disk cache is enabled
+        from cryptography.fernet import Fernet
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._fernet = Fernet(key.encode("utf-8") if isinstance(key, str) else key)
+
+    def _path(self, cache_key: str) -> Path:
+        # File names must not reveal which secrets are cached
+        return self.directory / hashlib.sha256(cache_key.encode("utf-8")).hexdigest()
+
+    def load(self, cache_key: str, max_age: Optional[float]) -> Optional[str]:
+        from cryptography.fernet import InvalidToken
+
+        path = self._path(cache_key)
+        try:
+            token = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            ttl = int(max_age) if max_age is not None else None
+            return self._fernet.decrypt(token, ttl=ttl).decode("utf-8")
+        except InvalidToken:
+            # Expired, corrupted or written with another key
+            return None
+
+    def store(self, cache_key: str, payload: str) -> None:
+        path = self._path(cache_key)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(self._fernet.encrypt(payload.encode("utf-8")))
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, path)
+
+
+class SecretStore:
+    """Caching front for a secret provider.
+
+    Secrets are kept in memory for ``ttl`` seconds and, with a disk cache,
+    encrypted on disk for the same time. If the provider fails, the last
+    known value is served instead, however old it is.
+    """
+
+    def __init__(
+        self,
+        provider: SecretProvider,
+        ttl: float = settings.SECRET_CACHE_TTL,
+        disk_cache: Optional[EncryptedDiskCache] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.provider = provider
+        self.ttl = ttl
+        self.disk_cache = disk_cache
+        self.clock = clock
+        self._memory: Dict[str, Tuple[str, float]] = {}
+        self._fetch_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, project_id: str, secret_id: str, version: str = "latest") -> str:
+        cache_key = f"{project_id}/{secret_id}/{version}"
+        cached = self._memory.get(cache_key)
+        if cached is not None and self.clock() - cached[1] < self.ttl:
+            return cached[0]
+
+        # One fetch per secret at a time; callers of the same secret wait for
+        # its result, other secrets are fetched in parallel
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault(cache_key, threading.Lock())
+        with fetch_lock:
+            cached = self._memory.get(cache_key)
+            if cached is not None and self.clock() - cached[1] < self.ttl:
+                return cached[0]
+
+            payload = self._load_from_disk(cache_key, self.ttl)
+            if payload is None:
+                try:
+                    payload = self.provider.fetch(project_id, secret_id, version)
+                except Exception as e:
+                    stale = (
+                        cached[0]
+                        if cached is not None
+                        else self._load_from_disk(cache_key, None)
+                    )
+                    if stale is None:
+                        raise
+                    logger.warning(
+                        f"Serving cached secret {secret_id} after fetch error: {e}"
+                    )
+                    return stale
+                self._save_to_disk(cache_key, payload)
+
+            self._memory[cache_key] = (payload, self.clock())
+            return payload
+
+    def invalidate(
+        self, project_id: str, secret_id: str, version: str = "latest"
+    ) -> None:
+        self._memory.pop(f"{project_id}/{secret_id}/{version}", None)
+
+    def _load_from_disk(
+        self, cache_key: str, max_age: Optional[float]
+    ) -> Optional[str]:
+        if self.disk_cache is None:
+            return None
+        try:
+            return self.disk_cache.load(cache_key, max_age)
+        except Exception as e:
+            logger.warning(f"Could not read secret cache: {e}")
+            return None
+
+    def _save_to_disk(self, cache_key: str, payload: str) -> None:
+        if self.disk_cache is None:
+            return
+        try:
+            self.disk_cache.store(cache_key, payload)
+        except Exception as e:
+            logger.warning(f"Could not write secret cache: {e}")
+
+
+def create_secret_store() -> SecretStore:
+    """Build the secret store for the configured provider."""
+    provider_name = settings.SECRETS_PROVIDER.lower()
+    if provider_name == "gcp":
+        provider: SecretProvider = SecretManagerProvider()
+    elif provider_name == "env":
+        provider = EnvSecretProvider()
+    elif provider_name == "file":
+        provider = FileSecretProvider(settings.SECRETS_DIR)
+    else:
+        raise ValueError(f"Unknown secrets provider: {settings.SECRETS_PROVIDER}")
+
+    disk_cache = None
+    if settings.SECRET_CACHE_DIR and settings.SECRET_CACHE_KEY:
+        disk_cache = EncryptedDiskCache(
+            settings.SECRET_CACHE_DIR, settings.SECRET_CACHE_KEY
+        )
+    return SecretStore(provider, disk_cache=disk_cache)
+
+
+_store: Optional[SecretStore] = None
+_store_lock = threading.Lock()
+
+
+def get_secret_store() -> SecretStore:
+    """Process-wide secret store, created on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_secret_store()
+    return _store
+
+
 def get_secret(
     project_id: str, secret_id: str, version: str = "latest"
 ) -> Dict[str, Any]:
     """
-    Retrieve a secret from Secret Manager.
+    Retrieve a secret from the configured secrets provider.
 
     Args:
         project_id: The GCP project ID
@@ -27,29 +261,15 @@ def get_secret(
         Exception: If there's an error accessing the secret
     """
     try:
-        # Create a Secret Manager client
-        client = secretmanager.SecretManagerServiceClient()
-
-        # Build the resource name of the secret version
-        name = client.secret_version_path(project_id, secret_id, version)
-
-        # Log the attempt
-        logger.info(
-            f"Attempting to access secret: {secret_id} from project: {project_id}"
-        )
-        # Access the secret version
-        response = client.access_secret_version(name=name)
-
-        raw_payload = response.payload.data.decode("UTF-8")
+        raw_payload = get_secret_store().get(project_id, secret_id, version)
 
         # Check if payload is empty
         if not raw_payload.strip():
             logger.error("Secret payload is empty")
             raise ValueError("Secret payload is empty")
         # Parse the secret payload
-        try:
-            secret_payload = settings.parse_service_account(raw_payload)
-        except json.JSONDecodeError as e:
+        secret_payload = settings.parse_service_account(raw_payload)
+        if secret_payload is None:
             raise ValueError("Invalid JSON secret payload")
 
         logger.info(f"Successfully retrieved secret: {secret_id}")